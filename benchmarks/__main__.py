@@ -0,0 +1,56 @@
+"""Run all benchmarks, optionally writing machine-readable results for `benchmarks.compare`.
+
+Run with `python -m benchmarks [--n N] [--only SUBSTRING] [--json PATH]`.
+"""
+import argparse
+import importlib
+from importlib.metadata import PackageNotFoundError, version
+import json
+import pkgutil
+import platform
+import sys
+import time
+from typing import Any
+
+import benchmarks
+from benchmarks._harness import report
+
+
+def _package_version() -> str:
+    try:
+        return version('pathlib-extensions')
+    except PackageNotFoundError:
+        return 'unknown'
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__)
+    parser.add_argument('--n', type=int, default=None, help="problem size passed to every module, e.g. number of files; defaults to each module's own")
+    parser.add_argument('--only', default=None, help='only run modules whose name contains this substring')
+    parser.add_argument('--json', default=None, help='path to write the results to')
+    args = parser.parse_args(argv)
+    names = sorted(m.name for m in pkgutil.iter_modules(benchmarks.__path__) if m.name.startswith('bench_'))
+    results: list[dict[str, Any]] = []
+    for name in names:
+        if args.only is not None and args.only not in name:
+            continue
+        module = importlib.import_module(f'benchmarks.{name}')
+        kwargs = {} if args.n is None else {'n': args.n}
+        for result in module.run(**kwargs):
+            result['module'] = name
+            results.append(result)
+    report(results)
+    if args.json is not None:
+        with open(args.json, 'w') as f:
+            json.dump({
+                'version': _package_version(),
+                'python': sys.version,
+                'platform': platform.platform(),
+                'timestamp': time.time(),
+                'results': results,
+            }, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
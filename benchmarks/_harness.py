@@ -0,0 +1,34 @@
+from pathlib import Path
+import statistics
+import timeit
+from typing import Any, Callable
+
+
+def measure(name: str, func: Callable[[], Any], number: int = 1, repeat: int = 5) -> dict[str, Any]:
+    """Time `func` with `timeit`, returning the best and mean seconds per call."""
+    timings = [t / number for t in timeit.repeat(func, number=number, repeat=repeat)]
+    return {'name': name, 'best': min(timings), 'mean': statistics.mean(timings), 'number': number, 'repeat': repeat}
+
+
+def report(results: list[dict[str, Any]]) -> None:
+    width = max(len(r['name']) for r in results)
+    for r in results:
+        print(f"{r['name']:<{width}}  best {r['best'] * 1e3:10.3f} ms  mean {r['mean'] * 1e3:10.3f} ms")
+
+
+def make_tree(root: Path, n_files: int, files_per_dir: int = 1000, suffix: str = '.txt') -> list[Path]:
+    """Create a synthetic tree of `n_files` empty files, spread over subdirectories of `files_per_dir` files each."""
+    files = []
+    for i in range(n_files):
+        d = root / f'{i // files_per_dir:04d}'
+        if i % files_per_dir == 0:
+            d.mkdir(parents=True)
+        p = d / f'{i}{suffix}'
+        p.touch()
+        files.append(p)
+    return files
+
+
+def long_multibyte_name(n_chars: int, suffix: str = '.txt') -> str:
+    """A filename mixing 1-, 2-, 3- and 4-byte UTF-8 characters."""
+    return ('aé日🌟' * (n_chars // 4 + 1))[:n_chars] + suffix
@@ -0,0 +1,55 @@
+"""Benchmarks for `pathlib_extensions.filesystem`.
+
+Run with `python -m benchmarks.bench_filesystem`.
+"""
+import random
+import re
+from typing import Any
+
+from benchmarks._harness import long_multibyte_name, measure, report
+from pathlib_extensions.filesystem import ReservedCharsProfile, replace_os_reserved_chars, sanitize_many, sanitize_paths, truncate_filename, truncate_filenames
+
+
+def _ignore(*args: Any) -> None:
+    pass
+
+
+def _regex_replace_os_reserved_chars(text: str, replacement: str = '_') -> str:
+    # the implementation prior to the translation tables
+    return re.sub(r'[\\/*?:"<>|]', replacement, text)
+
+
+_ASCII_ALPHABET = 'abcdefghijklmnopqrstuvwxyz ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_?:*/"<>|'
+
+
+def _synthetic_titles(n: int, alphabet: str = _ASCII_ALPHABET, seed: int = 0) -> list[str]:
+    rng = random.Random(seed)
+    return [''.join(rng.choices(alphabet, k=rng.randint(10, 120))) for _ in range(n)]
+
+
+def run(n: int = 100_000) -> list[dict[str, Any]]:
+    results = []
+    for label, alphabet in [('ascii', _ASCII_ALPHABET), ('multibyte', _ASCII_ALPHABET + 'éü日本語🌟')]:
+        titles = _synthetic_titles(n, alphabet)
+        assert [_regex_replace_os_reserved_chars(x) for x in titles] == list(sanitize_many(titles))
+        results += [
+            measure(f'replace_os_reserved_chars[regex,{label}] x{n}', lambda: [_regex_replace_os_reserved_chars(x) for x in titles]),
+            measure(f'replace_os_reserved_chars[translate,{label}] x{n}', lambda: [replace_os_reserved_chars(x) for x in titles]),
+            measure(f'sanitize_many[{label}] x{n}', lambda: list(sanitize_many(titles))),
+            measure(f'sanitize_many[{label},windows] x{n}', lambda: list(sanitize_many(titles, profile=ReservedCharsProfile.WINDOWS))),
+        ]
+    names = [long_multibyte_name(200 + i % 200) for i in range(n)]
+    results += [
+        measure(f'truncate_filename[multibyte] x{n}', lambda: [truncate_filename(x, on_truncate=_ignore) for x in names]),
+        measure(f'truncate_filenames[multibyte] x{n}', lambda: truncate_filenames(names, on_truncate=_ignore)),
+    ]
+    titles = _synthetic_titles(n) + names
+    results += [
+        measure(f'sanitize_paths[workers=1] x{len(titles)}', lambda: sanitize_paths(titles, 'out', workers=1), repeat=3),
+        measure(f'sanitize_paths[workers=cpu] x{len(titles)}', lambda: sanitize_paths(titles, 'out'), repeat=3),
+    ]
+    return results
+
+
+if __name__ == '__main__':
+    report(run())
@@ -0,0 +1,43 @@
+"""Import time of `pathlib_extensions`, as reported by `python -X importtime` in fresh interpreters.
+
+Run with `python -m benchmarks.bench_import`.
+"""
+import statistics
+import subprocess
+import sys
+from typing import Any
+
+from benchmarks._harness import report
+
+
+def _import_seconds(statement: str) -> float:
+    """Total time spent importing this package and its dependencies while running `statement` in a fresh interpreter."""
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], capture_output=True, text=True, check=True).stderr
+    total = 0
+    # lines look like `import time: self [us] | cumulative | name`, with the name indented by nesting level;
+    # the top-level imports of the package and its submodules are summed, as `import *` loads submodules separately
+    for line in stderr.splitlines():
+        _, _, fields = line.partition('import time:')
+        parts = fields.split('|')
+        if len(parts) == 3 and parts[2].startswith(' pathlib_extensions') and not parts[2].startswith('  '):
+            total += int(parts[1])
+    if not total:
+        raise RuntimeError(f'pathlib_extensions not found in the output of -X importtime: {statement}')
+    return total / 1e6
+
+
+def _measure(name: str, statement: str, repeat: int) -> dict[str, Any]:
+    timings = [_import_seconds(statement) for _ in range(repeat)]
+    return {'name': name, 'best': min(timings), 'mean': statistics.mean(timings), 'number': 1, 'repeat': repeat}
+
+
+def run(n: int = 0, repeat: int = 20) -> list[dict[str, Any]]:
+    """`n` is ignored, since import time does not depend on a problem size; `repeat` fresh interpreters are used per measurement."""
+    return [
+        _measure(statement, statement, repeat)
+        for statement in ['import pathlib_extensions', 'from pathlib_extensions import prepare_output_dir', 'from pathlib_extensions import *']
+    ]
+
+
+if __name__ == '__main__':
+    report(run())
@@ -0,0 +1,88 @@
+"""Memory and speed benchmarks for `pathlib_extensions.nullable`, against plain `pathlib.Path`.
+
+Run with `python -m benchmarks.bench_nullable`.
+"""
+from pathlib import Path
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks._harness import measure, report
+from pathlib_extensions.nullable import NullablePath
+from pathlib_extensions.nullable_array import NullablePathArray
+
+
+def _allocated_bytes(factory: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        objects = factory()
+        size, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del objects
+    return size
+
+
+def _join_deep(np: NullablePath, depth: int = 100) -> NullablePath:
+    for i in range(depth):
+        np = np / f'level{i}'
+    return np
+
+
+def run(n: int = 100_000) -> list[dict[str, Any]]:
+    strings = [f'data/{i % 100:02d}/sidecar_{i}.tar.gz' for i in range(n)]
+    paths = [Path(s) for s in strings]
+    nullables = [NullablePath(p) for p in paths]
+    nulls = [NullablePath() for _ in range(n)]
+    results: list[dict[str, Any]] = []
+    factories: list[tuple[str, Callable[[], Any]]] = [
+        ('Path', lambda: [Path(s) for s in strings]),
+        ('NullablePath', lambda: [NullablePath(s) for s in strings]),
+        ('NullablePath[null]', lambda: [NullablePath() for _ in strings]),
+    ]
+    for label, factory in factories:
+        result = measure(f'construct {label} x{n}', factory)
+        result['bytes_per_object'] = _allocated_bytes(factory) / n
+        results.append(result)
+    for attr in ['name', 'stem', 'suffix', 'parent']:
+        results += [
+            measure(f'{attr} Path x{n}', lambda: [getattr(p, attr) for p in paths]),
+            measure(f'{attr} NullablePath x{n}', lambda: [getattr(p, attr) for p in nullables]),
+            measure(f'{attr} NullablePath[null] x{n}', lambda: [getattr(p, attr) for p in nulls]),
+        ]
+    results += [
+        measure(f'parents Path x{n}', lambda: [p.parents[0] for p in paths]),
+        measure(f'parents NullablePath x{n}', lambda: [p.parents[0] for p in nullables]),
+    ]
+    # deep chains: every repeat builds new objects, so cached parents are not reused across repeats
+    deep = '/'.join(f'level{i}' for i in range(100))
+    results += [
+        measure(f'deep parents Path x{n // 100}', lambda: [len(Path(deep).parents) for _ in range(n // 100)]),
+        measure(f'deep parents NullablePath x{n // 100}', lambda: [len(NullablePath(deep).parents) for _ in range(n // 100)]),
+        measure(f'deep truediv NullablePath x{n // 100}', lambda: [_join_deep(NullablePath('root')) for _ in range(n // 100)]),
+        measure(f'exists NullablePath x{n // 100}', lambda: [p.exists() for p in nullables[:n // 100]]),
+    ]
+    # columnar: one in ten paths is null
+    optional = [None if i % 10 == 0 else s for i, s in enumerate(strings)]
+    array = NullablePathArray(optional)
+    listed = [NullablePath(s) for s in optional]
+    for label, factory in [('list[NullablePath]', lambda: [NullablePath(s) for s in optional]), ('NullablePathArray', lambda: NullablePathArray(optional))]:
+        result = measure(f'construct {label} x{n}', factory)
+        result['bytes_per_object'] = _allocated_bytes(factory) / n
+        results.append(result)
+    results += [
+        measure(f'truediv list[NullablePath] x{n}', lambda: [p / 'out.json' for p in listed]),
+        measure(f'truediv NullablePathArray x{n}', lambda: array / 'out.json'),
+        measure(f'with_suffix list[NullablePath] x{n}', lambda: [p.with_suffix('.zip') for p in listed]),
+        measure(f'with_suffix NullablePathArray x{n}', lambda: array.with_suffix('.zip')),
+        measure(f'suffix list[NullablePath] x{n}', lambda: [p.suffix for p in listed]),
+        measure(f'suffixes NullablePathArray x{n}', lambda: array.suffixes),
+    ]
+    return results
+
+
+if __name__ == '__main__':
+    results = run()
+    report(results)
+    for r in results:
+        if 'bytes_per_object' in r:
+            print(f"{r['name']}: {r['bytes_per_object']:.0f} bytes/object")
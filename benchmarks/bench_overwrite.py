@@ -0,0 +1,48 @@
+"""Benchmarks for `pathlib_extensions.overwrite` and `pathlib_extensions.atomic`.
+
+Run with `python -m benchmarks.bench_overwrite`.
+"""
+from pathlib import Path
+import tempfile
+from typing import Any
+
+from benchmarks._harness import make_tree, measure, report
+from pathlib_extensions.atomic import atomic_write
+from pathlib_extensions.overwrite import (
+    OverwriteMode, RenameIndex, overwrite_existing_path, overwrite_existing_paths, overwrite_if_hash_differs, overwrite_if_size_differs,
+)
+
+
+def _atomic_writes(files: list[Path], data: bytes) -> None:
+    for p in files:
+        with atomic_write(p) as f:
+            f.write(data)
+
+
+def _renames(directory: Path, n: int) -> None:
+    index = RenameIndex(directory)
+    for _ in range(n):
+        index.claim('0.txt')
+
+
+def run(n: int = 10_000) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        files = make_tree(root / 'tree', n, files_per_dir=n)
+        source = root / 'source.txt'
+        source.touch()
+        mapping = dict.fromkeys(files, source)
+        small = files[:max(n // 10, 1)]
+        return [
+            measure(f'overwrite_existing_path x{n}', lambda: [overwrite_existing_path(p, OverwriteMode.ALWAYS) for p in files]),
+            measure(f'overwrite_existing_paths x{n}', lambda: overwrite_existing_paths(files, OverwriteMode.ALWAYS)),
+            measure(f'overwrite_existing_paths[size] x{n}', lambda: overwrite_existing_paths(mapping, OverwriteMode.ALWAYS, overwrite_if_size_differs)),
+            measure(f'overwrite_existing_paths[hash] x{n}', lambda: overwrite_existing_paths(mapping, OverwriteMode.ALWAYS, overwrite_if_hash_differs)),
+            # every repeat claims new names, so later repeats run against more siblings
+            measure(f'RenameIndex.claim x{len(small)}', lambda: _renames(files[0].parent, len(small)), repeat=3),
+            measure(f'atomic_write x{len(small)}', lambda: _atomic_writes(small, b'x' * 4096), repeat=3),
+        ]
+
+
+if __name__ == '__main__':
+    report(run())
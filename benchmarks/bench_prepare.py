@@ -0,0 +1,57 @@
+"""Benchmarks for `pathlib_extensions.prepare` and the modules built on it, over a synthetic tree of `n` files.
+
+Run with `python -m benchmarks.bench_prepare`.
+"""
+import asyncio
+from pathlib import Path
+import tempfile
+from typing import Any
+
+from benchmarks._harness import make_tree, measure, report
+from pathlib_extensions import aio
+from pathlib_extensions.cache import StatCache
+from pathlib_extensions.manifest import InputManifest, prepare_changed_inputs
+from pathlib_extensions.prepare import (
+    prepare_input_dir, prepare_input_file, prepare_input_files, prepare_output_dir, prepare_output_file, prepare_output_files,
+)
+from pathlib_extensions.walk import walk_input_files
+
+
+def _prepare_as_completed(files: list[Path]) -> None:
+    async def main() -> None:
+        async for _ in aio.prepare_as_completed(prepare_input_file, files):
+            pass
+
+    asyncio.run(main())
+
+
+def _with_stat_cache(files: list[Path]) -> None:
+    with StatCache():
+        for p in files:
+            prepare_output_dir(p.parent)
+
+
+def run(n: int = 10_000) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        files = make_tree(root / 'tree', n)
+        new_files = [root / 'out' / p.parent.name / p.name for p in files]
+        with InputManifest(root / 'manifest.sqlite') as manifest:
+            prepare_changed_inputs(root / 'tree', manifest)
+            return [
+                measure(f'prepare_input_dir x{n}', lambda: [prepare_input_dir(p.parent) for p in files]),
+                measure(f'prepare_input_file x{n}', lambda: [prepare_input_file(p, check_suffix='.txt') for p in files]),
+                measure(f'prepare_input_files x{n}', lambda: prepare_input_files(files, check_suffix='.txt')),
+                measure(f'aio.prepare_as_completed x{n}', lambda: _prepare_as_completed(files)),
+                measure(f'prepare_output_dir x{n}', lambda: [prepare_output_dir(p.parent) for p in files]),
+                measure(f'prepare_output_dir[StatCache] x{n}', lambda: _with_stat_cache(files)),
+                measure(f'prepare_output_file[existing] x{n}', lambda: [prepare_output_file(p) for p in files]),
+                measure(f'prepare_output_file[new] x{n}', lambda: [prepare_output_file(p) for p in new_files]),
+                measure(f'prepare_output_files[new] x{n}', lambda: prepare_output_files(new_files)),
+                measure(f'walk_input_files x{n}', lambda: list(walk_input_files(root / 'tree', check_suffix='.txt'))),
+                measure(f'prepare_changed_inputs[unchanged] x{n}', lambda: prepare_changed_inputs(root / 'tree', manifest)),
+            ]
+
+
+if __name__ == '__main__':
+    report(run())
@@ -0,0 +1,34 @@
+"""Benchmarks for `pathlib_extensions.transfer`, against `shutil.copytree`, over a synthetic tree of `n` files.
+
+Run with `python -m benchmarks.bench_transfer`.
+"""
+import itertools
+import os
+from pathlib import Path
+import shutil
+import tempfile
+from typing import Any
+
+from benchmarks._harness import make_tree, measure, report
+from pathlib_extensions.transfer import copy_tree
+
+
+def run(n: int = 2_000, file_size: int = 64 << 10) -> list[dict[str, Any]]:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        data = os.urandom(file_size)
+        for p in make_tree(root / 'src', n):
+            p.write_bytes(data)
+        # a fresh destination per repeat, so that nothing is skipped
+        counter = itertools.count()
+        results = [
+            measure(f'shutil.copytree x{n}', lambda: shutil.copytree(root / 'src', root / f'shutil{next(counter)}')),
+            measure(f'copy_tree x{n}', lambda: copy_tree(root / 'src', root / f'copy{next(counter)}')),
+        ]
+        copy_tree(root / 'src', root / 'resumed')
+        results.append(measure(f'copy_tree[resume, nothing to copy] x{n}', lambda: copy_tree(root / 'src', root / 'resumed')))
+    return results
+
+
+if __name__ == '__main__':
+    report(run())
@@ -0,0 +1,36 @@
+"""Compare two result files written by `python -m benchmarks --json`.
+
+Run with `python -m benchmarks.compare BASELINE CANDIDATE [--threshold 0.1]`. Exits with status 1 if any benchmark
+present in both files is slower in the candidate by more than the threshold, comparing best times.
+"""
+import argparse
+import json
+import sys
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.compare', description=__doc__)
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=0.1, help='maximum tolerated relative slowdown')
+    args = parser.parse_args(argv)
+    with open(args.baseline) as f:
+        baseline = {r['name']: r for r in json.load(f)['results']}
+    with open(args.candidate) as f:
+        candidate = {r['name']: r for r in json.load(f)['results']}
+    regressed = False
+    for name, new in candidate.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        change = new['best'] / old['best'] - 1
+        flag = ''
+        if change > args.threshold:
+            flag = '  REGRESSION'
+            regressed = True
+        print(f"{name}: {old['best'] * 1e3:.3f} ms -> {new['best'] * 1e3:.3f} ms ({change:+.1%}){flag}")
+    return 1 if regressed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,4 +1,70 @@
-from pathlib_extensions.filesystem import *
-from pathlib_extensions.nullable import *
-from pathlib_extensions.overwrite import *
-from pathlib_extensions.prepare import *
+from importlib import import_module
+
+# not imported from `typing`, which alone costs more to import than the rest of this module; mypy recognises the name
+TYPE_CHECKING = False
+
+# public names of each submodule, imported on first access so that importing the package stays cheap.
+# Must match the `__all__` of each submodule. `aio` is left out, since its names clash with those of `prepare`.
+_SUBMODULE_EXPORTS: dict[str, tuple[str, ...]] = {
+    'atomic': ('atomic_write',),
+    'cas': ('LinkMode', 'ContentStore'),
+    'cache': ('CacheInfo', 'StatCache', 'clear_known_dirs'),
+    'capacity': ('InsufficientSpaceError', 'CapacityBudget', 'capacity_budget', 'clear_capacity_budgets'),
+    'dirfd': ('DirHandle',),
+    'filesystem': ('ReservedCharsProfile', 'replace_os_reserved_chars', 'sanitize_many', 'sanitize_paths', 'truncate_filename', 'truncate_filenames'),
+    'instrument': ('ProfileStats', 'profile'),
+    'manifest': ('ManifestEntry', 'InputManifest', 'prepare_changed_inputs'),
+    'nullable': ('NullablePath',),
+    'nullable_array': ('NullablePathArray',),
+    'overwrite': (
+        'OverwriteMode', 'OverwritePolicy', 'RenameIndex', 'user_confirms_overwrite', 'user_confirms_overwrite_all', 'overwrite_existing_path',
+        'overwrite_existing_paths', 'overwrite_if_older', 'overwrite_if_size_differs', 'overwrite_if_hash_differs', 'rename_existing_path',
+    ),
+    'prepare': (
+        'NotAFileError', 'SuffixError', 'prepare_input_dir', 'prepare_input_file', 'prepare_output_dir', 'prepare_output_file',
+        'prepare_input_files', 'prepare_output_files', 'ensure_dirs', 'open_input',
+    ),
+    'sharding': ('ShardedLayout',),
+    'transfer': ('copy_tree', 'move_tree'),
+    'walk': ('walk_input_files',),
+    'watch': ('watch_inputs', 'awatch_inputs'),
+}
+_NAME_TO_SUBMODULE = {name: module for module, names in _SUBMODULE_EXPORTS.items() for name in names}
+__all__ = list(_NAME_TO_SUBMODULE)
+
+if TYPE_CHECKING:
+    from typing import Any
+
+    from pathlib_extensions.atomic import *
+    from pathlib_extensions.cache import *
+    from pathlib_extensions.capacity import *
+    from pathlib_extensions.cas import *
+    from pathlib_extensions.dirfd import *
+    from pathlib_extensions.filesystem import *
+    from pathlib_extensions.instrument import *
+    from pathlib_extensions.manifest import *
+    from pathlib_extensions.nullable import *
+    from pathlib_extensions.nullable_array import *
+    from pathlib_extensions.overwrite import *
+    from pathlib_extensions.prepare import *
+    from pathlib_extensions.sharding import *
+    from pathlib_extensions.transfer import *
+    from pathlib_extensions.walk import *
+    from pathlib_extensions.watch import *
+
+
+def __getattr__(name: str) -> 'Any':
+    if name in _SUBMODULE_EXPORTS:
+        # submodules were attributes of the package when it imported them eagerly; importing sets the attribute
+        return import_module(f'{__name__}.{name}')
+    module = _NAME_TO_SUBMODULE.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    value = getattr(import_module(f'{__name__}.{module}'), name)
+    # cached on the package, so that this hook runs once per name
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *__all__, *_SUBMODULE_EXPORTS})
@@ -0,0 +1,163 @@
+import asyncio
+from concurrent.futures import Executor
+from contextvars import copy_context
+from functools import partial
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Iterable
+
+from pathlib_extensions import prepare
+
+__all__ = ['prepare_input_dir', 'prepare_input_file', 'prepare_output_dir', 'prepare_output_file', 'prepare_as_completed']
+
+
+async def _run_in_executor(func: Callable[[], Path], executor: Executor | None, limiter: asyncio.Semaphore | None) -> Path:
+    loop = asyncio.get_running_loop()
+    # unlike `asyncio.to_thread`, `run_in_executor` does not carry over the context, e.g. the active `StatCache`
+    func = partial(copy_context().run, func)
+    if limiter is None:
+        return await loop.run_in_executor(executor, func)
+    async with limiter:
+        return await loop.run_in_executor(executor, func)
+
+
+async def prepare_input_dir(p: str | Path, *, executor: Executor | None = None, limiter: asyncio.Semaphore | None = None) -> Path:
+    """Awaitable version of `prepare.prepare_input_dir`.
+
+    Args:
+        p (str | Path): The target directory path.
+        executor (Union[Executor, None], optional): Executor to run the syscalls on. Defaults to None for the loop's default executor.
+        limiter (Union[asyncio.Semaphore, None], optional): Semaphore limiting how many calls run at once. Defaults to None.
+
+    Returns:
+        Path: The verified directory path.
+    """
+    return await _run_in_executor(partial(prepare.prepare_input_dir, p), executor, limiter)
+
+
+async def prepare_input_file(
+    p: str | Path,
+    check_suffix: str | None = None,
+    with_suffix: str | None = None,
+    *,
+    executor: Executor | None = None,
+    limiter: asyncio.Semaphore | None = None,
+) -> Path:
+    """Awaitable version of `prepare.prepare_input_file`.
+
+    Args:
+        p (str | Path): The target file path.
+        check_suffix (Union[str, None], optional): Expected suffix for the file. Defaults to None.
+        with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+        executor (Union[Executor, None], optional): Executor to run the syscalls on. Defaults to None for the loop's default executor.
+        limiter (Union[asyncio.Semaphore, None], optional): Semaphore limiting how many calls run at once. Defaults to None.
+
+    Returns:
+        Path: The verified file path.
+    """
+    return await _run_in_executor(partial(prepare.prepare_input_file, p, check_suffix, with_suffix), executor, limiter)
+
+
+async def prepare_output_dir(
+    p: str | Path,
+    create: bool = True,
+    *,
+    expected_bytes: int = 0,
+    expected_files: int = 0,
+    executor: Executor | None = None,
+    limiter: asyncio.Semaphore | None = None,
+) -> Path:
+    """Awaitable version of `prepare.prepare_output_dir`.
+
+    Args:
+        p (str | Path): The target directory path.
+        create (bool, optional): Whether to create the directory if it doesn't exist. Defaults to True.
+        expected_bytes (int, optional): Bytes expected to be written to the filesystem. Defaults to 0.
+        expected_files (int, optional): Files expected to be created on the filesystem. Defaults to 0.
+        executor (Union[Executor, None], optional): Executor to run the syscalls on. Defaults to None for the loop's default executor.
+        limiter (Union[asyncio.Semaphore, None], optional): Semaphore limiting how many calls run at once. Defaults to None.
+
+    Returns:
+        Path: The verified or created directory path.
+    """
+    return await _run_in_executor(partial(prepare.prepare_output_dir, p, create, expected_bytes=expected_bytes, expected_files=expected_files), executor, limiter)
+
+
+async def prepare_output_file(
+    p: str | Path,
+    check_suffix: str | None = None,
+    with_suffix: str | None = None,
+    create: bool = True,
+    *,
+    executor: Executor | None = None,
+    limiter: asyncio.Semaphore | None = None,
+) -> Path:
+    """Awaitable version of `prepare.prepare_output_file`.
+
+    Args:
+        p (str | Path): The target file path.
+        check_suffix (Union[str, None], optional): Expected suffix for the file. Defaults to None.
+        with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+        create (bool, optional): Whether to create the directory if it doesn't exist. Defaults to True.
+        executor (Union[Executor, None], optional): Executor to run the syscalls on. Defaults to None for the loop's default executor.
+        limiter (Union[asyncio.Semaphore, None], optional): Semaphore limiting how many calls run at once. Defaults to None.
+
+    Returns:
+        Path: The verified or updated file path.
+    """
+    return await _run_in_executor(partial(prepare.prepare_output_file, p, check_suffix, with_suffix, create), executor, limiter)
+
+
+async def prepare_as_completed(
+    func: Callable[..., Path],
+    paths: Iterable[str | Path],
+    *,
+    max_concurrency: int = 64,
+    executor: Executor | None = None,
+    return_exceptions: bool = False,
+    **kwargs: Any,
+) -> AsyncIterator[tuple[str | Path, Path | Exception]]:
+    """Validate many paths with a blocking `prepare` function, yielding results as they complete.
+
+    Paths are consumed lazily, so at most `max_concurrency` of them are pending at any time.
+
+    Args:
+        func (Callable[..., Path]): One of the blocking functions in `prepare`, e.g. `prepare.prepare_input_file`.
+        paths (Iterable[str | Path]): The target paths.
+        max_concurrency (int, optional): Maximum number of pending calls. Defaults to 64.
+        executor (Union[Executor, None], optional): Executor to run the syscalls on. Defaults to None for the loop's default executor.
+        return_exceptions (bool, optional): Whether to yield the exception of a failing path in place of its result,
+            rather than raising it. Defaults to False.
+        **kwargs: Keyword arguments passed on to `func`, e.g. `check_suffix`.
+
+    Yields:
+        tuple[str | Path, Path | Exception]: The input path and its result (or exception), in completion order.
+    """
+    if max_concurrency < 1:
+        raise ValueError(f'max_concurrency must be positive: {max_concurrency}')
+    loop = asyncio.get_running_loop()
+    it = iter(paths)
+    pending: dict[asyncio.Future[Path], str | Path] = {}
+
+    def submit() -> None:
+        for p in it:
+            pending[loop.run_in_executor(executor, partial(copy_context().run, func, p, **kwargs))] = p
+            if len(pending) >= max_concurrency:
+                break
+
+    try:
+        submit()
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for fut in done:
+                p = pending.pop(fut)
+                try:
+                    result: Path | Exception = fut.result()
+                except (OSError, prepare.SuffixError, ValueError) as e:
+                    if not return_exceptions:
+                        raise
+                    result = e
+                yield p, result
+            submit()
+    finally:
+        for fut in pending:
+            fut.cancel()
@@ -0,0 +1,101 @@
+from contextlib import contextmanager
+import os
+from pathlib import Path
+import secrets
+import stat
+from typing import IO, Any, Iterator
+
+from pathlib_extensions.cache import _invalidate, _uncached_stat
+from pathlib_extensions.overwrite import OverwriteMode, overwrite_existing_path
+from pathlib_extensions.prepare import prepare_output_file
+
+__all__ = ['atomic_write']
+_WRITE_MODES = ('w', 'wt', 'wb')
+
+
+def _fsync_dir(p: Path) -> None:
+    fd = os.open(p, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(
+    path: str | Path,
+    mode: str = 'wb',
+    overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+    check_suffix: str | None = None,
+    with_suffix: str | None = None,
+    buffering: int = -1,
+    encoding: str | None = None,
+    newline: str | None = None,
+    fsync_dir: bool = False,
+) -> Iterator[IO[Any]]:
+    """Write to the target file path atomically.
+
+    The target path is checked with `prepare_output_file`. Data is written to a temporary file in the same
+    directory, which is fsync-ed and renamed over the target path only if the block exits without an exception.
+    Otherwise, the temporary file is removed and the target path is left untouched. A replaced target keeps its
+    permission bits; a new one gets the default permissions of the umask.
+
+    In buffered binary mode, writes larger than the buffer bypass it, so writing a `memoryview` of a large buffer
+    does not copy it. With `buffering=0`, the raw file is returned, whose `write` may write fewer bytes than given.
+
+    Args:
+        path (str | Path): The target file path.
+        mode (str, optional): One of 'w', 'wt' and 'wb'. Defaults to 'wb'.
+        overwrite_mode (OverwriteMode, optional): How to handle an existing target path. Defaults to always.
+        check_suffix (Union[str, None], optional): Expected suffix for the file. Defaults to None.
+        with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+        buffering (int, optional): Passed on to `open`. Defaults to -1.
+        encoding (Union[str, None], optional): Passed on to `open` in text mode. Defaults to None.
+        newline (Union[str, None], optional): Passed on to `open` in text mode. Defaults to None.
+        fsync_dir (bool, optional): Whether to also fsync the directory after the rename, so that the rename itself
+            survives a power loss. Defaults to False.
+
+    Yields:
+        IO: The file object of the temporary file.
+
+    Raises:
+        FileExistsError: If the target path exists and the overwrite mode decides against overwriting it.
+        ValueError: If `mode` is not a write mode, or if `overwrite_mode` is rename.
+        Same exceptions as `prepare_output_file`.
+    """
+    if mode not in _WRITE_MODES:
+        raise ValueError(f'mode must be one of {_WRITE_MODES}: {mode}')
+    if overwrite_mode == OverwriteMode.RENAME:
+        # the final path would not be known to the caller; call `rename_existing_path` first instead
+        raise ValueError('Rename mode is not supported by atomic_write')
+    path = prepare_output_file(path, check_suffix, with_suffix)
+    # bypassing the active cache, since a stale negative entry would let e.g. NEVER replace an existing file
+    st = _uncached_stat(path)
+    if st is not None and not overwrite_existing_path(path, overwrite_mode):
+        raise FileExistsError(path)
+    tmp = path.with_name(f'.{path.name}.{secrets.token_hex(4)}.tmp')
+    # unlike mkstemp, permissions follow the umask as for a regular open
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        try:
+            if st is not None:
+                # otherwise e.g. a 0600 file would become 0644 with the usual umask
+                if hasattr(os, 'fchmod'):
+                    os.fchmod(fd, stat.S_IMODE(st.st_mode))
+                else:
+                    os.chmod(tmp, stat.S_IMODE(st.st_mode))
+            f = os.fdopen(fd, mode, buffering=buffering, encoding=encoding, newline=newline)
+        except BaseException:
+            os.close(fd)
+            raise
+        with f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _invalidate(path)
+    if fsync_dir:
+        _fsync_dir(path.parent)
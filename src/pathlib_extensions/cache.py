@@ -0,0 +1,246 @@
+import errno
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextvars import ContextVar, Token
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from pathlib_extensions import instrument
+from pathlib_extensions.instrument import _timed
+
+__all__ = ['CacheInfo', 'StatCache', 'clear_known_dirs']
+# errors for which `Path.exists()` and friends return False instead of raising
+_IGNORED_ERRNOS = (errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP)
+# cache key operations: None for stat, otherwise an `os.access` mode (any combination of F_OK, R_OK, W_OK and X_OK)
+_OPS: tuple[int | None, ...] = (None, *range(8))
+_MISSING = object()
+# absolute paths of the directories this process has created or found to exist, so that each is created at most once.
+# Only a hint: directories removed by other means are found to be missing when used, and forgotten.
+# Changes and iteration hold the lock, so that `_forget_dir` never sees the set change size; membership tests don't.
+_known_dirs: set[str] = set()
+_known_dirs_lock = threading.Lock()
+
+
+def _reset_known_dirs_lock() -> None:
+    global _known_dirs_lock
+    _known_dirs_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    # a lock held by another thread when forking would never be released in the child
+    os.register_at_fork(after_in_child=_reset_known_dirs_lock)
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class StatCache:
+    """TTL-bounded LRU cache of `os.stat` and `os.access` results.
+
+    The cache is opt-in: while used as a context manager, it is consulted by the functions in `prepare` and by
+    `NullablePath.exists/is_file/is_dir`. Activation is per context, i.e. per thread and per asyncio task, and carries
+    over to the worker threads of this library's batch functions and async helpers, so that concurrent threads and
+    tasks may each use their own cache. The same cache may be active in several contexts at once. Entries are invalidated whenever this library creates a directory.
+    Results may be stale by up to `ttl` seconds with respect to changes made by other processes.
+
+    Args:
+        ttl (float, optional): Seconds before an entry expires. Defaults to 60.
+        maxsize (int, optional): Maximum number of entries before the least recently used ones are evicted. Defaults to 65536.
+    """
+
+    def __init__(self, ttl: float = 60.0, maxsize: int = 65536) -> None:
+        if ttl <= 0:
+            raise ValueError(f'ttl must be positive: {ttl}')
+        if maxsize < 1:
+            raise ValueError(f'maxsize must be positive: {maxsize}')
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple[str, int | None], tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _get(self, key: tuple[str, int | None]) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if time.monotonic() < expires_at:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return _MISSING
+
+    def _put(self, key: tuple[str, int | None], value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def stat(self, p: str | Path) -> os.stat_result | None:
+        """Stat the target path following symlinks. Returns None where `Path.exists()` would return False."""
+        key = (os.fspath(p), None)
+        value = self._get(key)
+        if value is _MISSING:
+            value = _uncached_stat(p)
+            self._put(key, value)
+        return value
+
+    def access(self, p: str | Path, mode: int) -> bool:
+        """Cached version of `os.access`."""
+        key = (os.fspath(p), mode)
+        value = self._get(key)
+        if value is _MISSING:
+            value = _uncached_access(p, mode)
+            self._put(key, value)
+        return value
+
+    def invalidate(self, p: str | Path) -> None:
+        """Drop all entries of the target path and its ancestors."""
+        p = Path(p)
+        with self._lock:
+            for x in (p, *p.parents):
+                s = os.fspath(x)
+                for op in _OPS:
+                    self._entries.pop((s, op), None)
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = 0
+
+    def cache_info(self) -> CacheInfo:
+        """Report hit/miss counters in the same format as `functools.lru_cache`."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self.maxsize, len(self._entries))
+
+    def __enter__(self) -> 'StatCache':
+        token = _active.set(self)
+        # kept per context rather than on the instance, since the same cache may be entered in several contexts at once
+        _tokens.set((*_tokens.get(), token))
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        *tokens, token = _tokens.get()
+        _tokens.set(tuple(tokens))
+        _active.reset(token)
+
+
+_active: ContextVar[StatCache | None] = ContextVar('_active_stat_cache', default=None)
+# tokens restoring the previously active cache, innermost last
+_tokens: ContextVar[tuple[Token[StatCache | None], ...]] = ContextVar('_stat_cache_tokens', default=())
+
+
+def _uncached_stat(p: str | Path) -> os.stat_result | None:
+    try:
+        # checked inline rather than in `_timed`, since this is the hottest call when profiling is disabled
+        if instrument._active is None:
+            return os.stat(p)
+        return _timed('stat', os.stat, p)
+    except OSError as e:
+        if e.errno in _IGNORED_ERRNOS:
+            return None
+        raise
+    except ValueError:
+        return None
+
+
+def _uncached_access(p: str | Path, mode: int) -> bool:
+    if instrument._active is None:
+        return os.access(p, mode)
+    return _timed('access', os.access, p, mode)
+
+
+def _stat(p: str | Path) -> os.stat_result | None:
+    """Stat the target path following symlinks, consulting the active cache if any."""
+    cache = _active.get()
+    if cache is None:
+        return _uncached_stat(p)
+    return cache.stat(p)
+
+
+def _access(p: str | Path, mode: int) -> bool:
+    """`os.access`, consulting the active cache if any."""
+    cache = _active.get()
+    if cache is None:
+        return _uncached_access(p, mode)
+    return cache.access(p, mode)
+
+
+def _invalidate(p: str | Path) -> None:
+    """Must be called after this library creates the target path."""
+    cache = _active.get()
+    if cache is not None:
+        cache.invalidate(p)
+
+
+def _exists(p: Path) -> bool:
+    """`Path.exists`, bypassing the active cache."""
+    return _timed('exists', p.exists)
+
+
+def _dir_key(p: Path) -> str:
+    # joined rather than `abspath`, which collapses '..' lexically, so that a key names the same directory as the path
+    # does for the kernel, e.g. for 'link/../x'
+    return os.fspath(p) if p.is_absolute() else os.path.join(os.getcwd(), p)
+
+
+def _is_known_dir(p: Path) -> bool:
+    return _dir_key(p) in _known_dirs
+
+
+def _add_known_dir(p: Path) -> None:
+    key = _dir_key(p)
+    with _known_dirs_lock:
+        _known_dirs.add(key)
+
+
+def _forget_dir(p: Path) -> None:
+    """Must be called after this library removes or renames the target path, which may be a directory."""
+    key = _dir_key(p)
+    prefix = os.path.join(key, '')
+    with _known_dirs_lock:
+        _known_dirs.difference_update([x for x in _known_dirs if x == key or x.startswith(prefix)])
+
+
+def _mkdir(p: Path) -> None:
+    """Create the target directory and its missing parents, unless this process has done so before and it still exists."""
+    key = _dir_key(p)
+    if key in _known_dirs:
+        # only a hint, since the directory may have been removed by other means since
+        if _access(p, os.F_OK):
+            return
+        _forget_dir(p)
+    _timed('mkdir', p.mkdir, parents=True, exist_ok=True)
+    _invalidate(p)
+    # all ancestors exist as well
+    x = Path(key)
+    with _known_dirs_lock:
+        _known_dirs.update([key, *map(os.fspath, x.parents)])
+
+
+def clear_known_dirs() -> None:
+    """Forget the directories this process has created or found to exist, and the names taken in them as indexed by
+    `rename_existing_path`.
+
+    Directories removed by other means are forgotten when found to be missing, so this is only needed for files
+    removed by other means, or to release memory.
+    """
+    with _known_dirs_lock:
+        _known_dirs.clear()
+    # not imported here, since `overwrite` imports this module; if not imported yet, it has no index to clear
+    overwrite = sys.modules.get('pathlib_extensions.overwrite')
+    if overwrite is not None:
+        overwrite._rename_index.cache_clear()
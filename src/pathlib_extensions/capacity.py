@@ -0,0 +1,219 @@
+from contextlib import contextmanager
+import errno
+import os
+from pathlib import Path
+import threading
+import time
+from typing import Iterator
+
+from pathlib_extensions.cache import _stat
+from pathlib_extensions.instrument import _timed, instrumented
+
+__all__ = ['InsufficientSpaceError', 'CapacityBudget', 'capacity_budget', 'clear_capacity_budgets']
+# device id -> budget of the filesystem, shared by all threads of this process
+_budgets: dict[int, 'CapacityBudget'] = {}
+_budgets_lock = threading.Lock()
+
+
+class InsufficientSpaceError(OSError):
+    """Raised when a filesystem lacks the free space or inodes for the expected output."""
+
+
+def _existing_ancestor(p: Path) -> tuple[Path, os.stat_result]:
+    """The path itself or its nearest existing parent, whose filesystem a new path would be created on."""
+    for q in (p, *p.absolute().parents):
+        st = _stat(q)
+        if st is not None:
+            return q, st
+    raise FileNotFoundError(p)
+
+
+def _free(p: Path) -> tuple[int, int | None]:
+    """Bytes and inodes available to unprivileged users, with None for filesystems without an inode limit."""
+    if not hasattr(os, 'statvfs'):
+        import shutil
+
+        return _timed('disk_usage', shutil.disk_usage, p).free, None
+    st = _timed('statvfs', os.statvfs, p)
+    # e.g. btrfs reports no inode counts, since it allocates inodes dynamically
+    return st.f_bavail * st.f_frsize, st.f_favail if st.f_files else None
+
+
+class CapacityBudget:
+    """Free space and inodes of one filesystem, against which writers reserve capacity before writing.
+
+    The free capacity is read with `os.statvfs` when the budget is created, and read again by `check` and `reserve`
+    once it is older than `max_age`, or by `refresh`. Reservations are counted against it under a lock, so that
+    concurrent writers of a large batch fail fast, or wait for each other with `block`, before any of them runs out of
+    space midway. Reservations are per process; data written by other processes, and data written under reservations
+    since released, is accounted for by the next read.
+
+    Writers should reserve what they are about to write, and release it once written, since the written data is then
+    counted as used by the next read. Until then, the budget errs on the safe side by counting it twice.
+
+    Use `capacity_budget` to share one budget per filesystem.
+
+    Args:
+        p (str | Path): A path on the filesystem, or a path to be created on it.
+        max_age (Union[float, None], optional): Seconds after which the free capacity is read again. Defaults to 60.
+            None for reading it only on creation and by `refresh`.
+
+    Raises:
+        ValueError: If `max_age` is not positive.
+        FileNotFoundError: If neither the path nor any of its parents exist.
+    """
+
+    def __init__(self, p: str | Path, max_age: float | None = 60.0) -> None:
+        if max_age is not None and max_age <= 0:
+            raise ValueError(f'max_age must be positive: {max_age}')
+        self.path, st = _existing_ancestor(Path(p))
+        self.device = st.st_dev
+        self.max_age = max_age
+        self._condition = threading.Condition()
+        self.free_bytes, self.free_files = _free(self.path)
+        self._read_at = time.monotonic()
+        self.reserved_bytes = 0
+        self.reserved_files = 0
+
+    def __repr__(self) -> str:
+        return (
+            f'{self.__class__.__name__}({self.path}, free_bytes={self.free_bytes}, free_files={self.free_files}, '
+            f'reserved_bytes={self.reserved_bytes}, reserved_files={self.reserved_files})'
+        )
+
+    @property
+    def available_bytes(self) -> int:
+        """Free bytes not reserved."""
+        return self.free_bytes - self.reserved_bytes
+
+    @property
+    def available_files(self) -> int | None:
+        """Free inodes not reserved, or None if the filesystem has no inode limit."""
+        return None if self.free_files is None else self.free_files - self.reserved_files
+
+    def _fits(self, nbytes: int, nfiles: int, reserved_bytes: int, reserved_files: int) -> bool:
+        return nbytes + reserved_bytes <= self.free_bytes and (self.free_files is None or nfiles + reserved_files <= self.free_files)
+
+    def _error(self, nbytes: int, nfiles: int) -> InsufficientSpaceError:
+        return InsufficientSpaceError(
+            errno.ENOSPC,
+            f'{nbytes} bytes and {nfiles} files requested, {self.available_bytes} bytes and {self.available_files} files available',
+            str(self.path),
+        )
+
+    def _is_stale(self) -> bool:
+        return self.max_age is not None and time.monotonic() - self._read_at >= self.max_age
+
+    def check(self, nbytes: int = 0, nfiles: int = 0) -> None:
+        """Check that the capacity is currently available, without reserving it.
+
+        Raises:
+            InsufficientSpaceError: If the capacity is not available.
+        """
+        if self._is_stale():
+            self.refresh()
+        with self._condition:
+            if not self._fits(nbytes, nfiles, self.reserved_bytes, self.reserved_files):
+                raise self._error(nbytes, nfiles)
+
+    def reserve(self, nbytes: int = 0, nfiles: int = 0, block: bool = False, timeout: float | None = None) -> None:
+        """Reserve capacity for writing, to be given back with `release` if it ends up unused.
+
+        Args:
+            nbytes (int, optional): Bytes to reserve. Defaults to 0.
+            nfiles (int, optional): Files, i.e. inodes, to reserve. Defaults to 0.
+            block (bool, optional): Whether to wait for other reservations to be released, rather than failing if the
+                capacity is currently reserved. Defaults to False.
+            timeout (Union[float, None], optional): Maximum seconds to wait if blocking. Defaults to None for no limit.
+
+        Raises:
+            ValueError: If a negative amount is requested.
+            InsufficientSpaceError: If the capacity is not available, without waiting if it exceeds the free capacity
+                even with no reservations, or after the timeout if blocking.
+        """
+        if nbytes < 0 or nfiles < 0:
+            raise ValueError(f'Cannot reserve negative capacity: {nbytes} bytes, {nfiles} files')
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if self._is_stale():
+                self.refresh()
+            with self._condition:
+                if self._fits(nbytes, nfiles, self.reserved_bytes, self.reserved_files):
+                    self.reserved_bytes += nbytes
+                    self.reserved_files += nfiles
+                    return
+                # would never fit, however long it waits
+                if not block or not self._fits(nbytes, nfiles, 0, 0):
+                    raise self._error(nbytes, nfiles)
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise self._error(nbytes, nfiles)
+                # woken up by releases, and at the latest when the free capacity is due to be read again
+                if self.max_age is not None:
+                    remaining = self.max_age if remaining is None else min(remaining, self.max_age)
+                self._condition.wait(remaining)
+
+    def release(self, nbytes: int = 0, nfiles: int = 0) -> None:
+        """Give back reserved capacity, e.g. after removing temporary files or abandoning a write, and wake up blocked
+        reservations.
+
+        Raises:
+            ValueError: If more than the reserved capacity is released.
+        """
+        with self._condition:
+            if nbytes > self.reserved_bytes or nfiles > self.reserved_files:
+                raise ValueError(f'Cannot release more than reserved: {nbytes} bytes, {nfiles} files')
+            self.reserved_bytes -= nbytes
+            self.reserved_files -= nfiles
+            self._condition.notify_all()
+
+    @contextmanager
+    def reserved(self, nbytes: int = 0, nfiles: int = 0, block: bool = False, timeout: float | None = None) -> Iterator[None]:
+        """Reserve capacity as per `reserve` for the duration of the block, e.g. for temporary files removed at its end."""
+        self.reserve(nbytes, nfiles, block, timeout)
+        try:
+            yield
+        finally:
+            self.release(nbytes, nfiles)
+
+    def refresh(self) -> None:
+        """Read the free capacity again, e.g. after writes by other processes, and wake up blocked reservations.
+
+        Capacity written since the last read is now counted as used, so reservations of completed writes should be
+        released first, to avoid counting them twice.
+        """
+        free_bytes, free_files = _free(self.path)
+        with self._condition:
+            self.free_bytes, self.free_files = free_bytes, free_files
+            self._read_at = time.monotonic()
+            self._condition.notify_all()
+
+
+@instrumented
+def capacity_budget(p: str | Path) -> CapacityBudget:
+    """The shared budget of the filesystem of the path, created on first use for each device id, with the default
+    `max_age`.
+
+    Args:
+        p (str | Path): A path on the filesystem, or a path to be created on it.
+
+    Returns:
+        CapacityBudget: The budget of the filesystem, shared by all threads of this process.
+
+    Raises:
+        FileNotFoundError: If neither the path nor any of its parents exist.
+    """
+    _, st = _existing_ancestor(Path(p))
+    budget = _budgets.get(st.st_dev)
+    if budget is None:
+        with _budgets_lock:
+            budget = _budgets.get(st.st_dev)
+            if budget is None:
+                budget = _budgets[st.st_dev] = CapacityBudget(p)
+    return budget
+
+
+def clear_capacity_budgets() -> None:
+    """Forget the shared budgets, so that the free capacity is read again on next use. Reservations are discarded."""
+    with _budgets_lock:
+        _budgets.clear()
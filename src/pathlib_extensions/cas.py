@@ -0,0 +1,291 @@
+from contextlib import contextmanager
+from enum import Enum
+import errno
+import hashlib
+import os
+from pathlib import Path
+import secrets
+import shutil
+import sqlite3
+import sys
+import threading
+from types import TracebackType
+from typing import Any, BinaryIO, Iterator
+
+from pathlib_extensions.cache import _invalidate, _stat
+from pathlib_extensions.instrument import _timed, instrumented
+from pathlib_extensions.overwrite import OverwriteMode, overwrite_existing_path, rename_existing_path
+from pathlib_extensions.prepare import prepare_output_dir, prepare_output_file
+
+__all__ = ['LinkMode', 'ContentStore']
+# `_IOW(0x94, 9, int)` from linux/fs.h: share the extents of the source file with the destination file
+_FICLONE = 0x40049409
+# errors for which a link mode is not supported between the store and the target, as opposed to a real failure
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EMLINK, errno.ENOSYS}
+_CHUNK_SIZE = 1 << 20
+
+
+class LinkMode(str, Enum):
+    # copy-on-write clone if the filesystem supports it, else a hardlink, else a copy
+    AUTO = "auto"
+    HARDLINK = "hardlink"
+    REFLINK = "reflink"
+    COPY = "copy"
+
+    @classmethod
+    def values(cls) -> tuple[str, ...]:
+        return tuple(mode.value for mode in cls)
+
+
+def _reflink(src: Path, dst: Path) -> None:
+    if sys.platform != 'linux':
+        raise OSError(errno.EOPNOTSUPP, 'Reflinks are only supported on Linux', str(dst))
+    import fcntl
+
+    with open(src, 'rb') as fsrc, open(dst, 'xb') as fdst:
+        try:
+            _timed('reflink', fcntl.ioctl, fdst.fileno(), _FICLONE, fsrc.fileno())
+        except BaseException:
+            os.unlink(dst)
+            raise
+
+
+def _link(src: Path, dst: Path, link_mode: LinkMode) -> None:
+    """Make `dst`, which must not exist, a hardlink, reflink or copy of `src` as per the link mode."""
+    if link_mode in (LinkMode.AUTO, LinkMode.REFLINK):
+        try:
+            return _reflink(src, dst)
+        except OSError as e:
+            if link_mode == LinkMode.REFLINK or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    if link_mode in (LinkMode.AUTO, LinkMode.HARDLINK):
+        try:
+            return _timed('link', os.link, src, dst)
+        except OSError as e:
+            if link_mode == LinkMode.HARDLINK or e.errno not in _UNSUPPORTED_ERRNOS:
+                raise
+    _timed('copy', shutil.copyfile, src, dst)
+
+
+class _HashingWriter:
+    """Binary file wrapper that hashes everything written to it."""
+
+    def __init__(self, f: BinaryIO, algorithm: str) -> None:
+        self._f = f
+        self._hash = hashlib.new(algorithm)
+        self.size = 0
+
+    def write(self, data: bytes | bytearray | memoryview) -> int:
+        self._hash.update(data)
+        self.size += len(data)
+        return self._f.write(data)
+
+    def writelines(self, lines: Any) -> None:
+        for line in lines:
+            self.write(line)
+
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+class ContentStore:
+    """Content-addressed store of output files, keeping one blob per distinct content.
+
+    Outputs are hashed in a streaming pass while being written, stored once under `root/objects`, and placed at their
+    target paths as a reflink, a hardlink or a copy. A persistent index at `root/index.sqlite` records the digest of
+    each placed target along with its size, modification time and inode, so that writing the same content to the same
+    target again is skipped without reading the target.
+
+    A hardlinked target shares its inode with the blob, so it must be replaced (as this class does) rather than
+    modified in place, which would also modify every other target of the same content. Reflinks and copies are
+    independent of the blob.
+
+    Args:
+        root (str | Path): The store directory. Created if it doesn't exist. Hardlinks and reflinks require the targets
+            to be on the same filesystem.
+        link_mode (LinkMode, optional): How targets are placed. Defaults to AUTO.
+        algorithm (str, optional): A `hashlib` algorithm. Defaults to 'sha256'.
+    """
+
+    def __init__(self, root: str | Path, link_mode: LinkMode = LinkMode.AUTO, algorithm: str = 'sha256') -> None:
+        self.root = prepare_output_dir(root)
+        self.link_mode = LinkMode(link_mode)
+        self.algorithm = algorithm
+        # fail early on unknown algorithms
+        hashlib.new(algorithm)
+        self._objects = prepare_output_dir(self.root / 'objects')
+        self._tmp = prepare_output_dir(self.root / 'tmp')
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.root / 'index.sqlite', check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS targets '
+            '(path TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL)'
+        )
+        self._conn.commit()
+
+    def blob_path(self, digest: str) -> Path:
+        """Path of the blob of the given hex digest, which may not exist."""
+        return self._objects / digest[:2] / digest[2:]
+
+    def _tmp_path(self) -> Path:
+        return self._tmp / secrets.token_hex(8)
+
+    def _store(self, tmp: Path, digest: str) -> None:
+        """Move a fully written temporary file into the store, unless a blob of the same digest already exists."""
+        blob = self.blob_path(digest)
+        try:
+            if _stat(blob) is None:
+                prepare_output_dir(blob.parent)
+                try:
+                    # unlike a rename, a link never replaces a blob stored concurrently, which targets may link to
+                    _timed('link', os.link, tmp, blob)
+                except FileExistsError:
+                    pass
+                _invalidate(blob)
+        finally:
+            os.unlink(tmp)
+
+    @contextmanager
+    def _writer(self) -> Iterator[_HashingWriter]:
+        tmp = self._tmp_path()
+        try:
+            with open(tmp, 'xb') as f:
+                writer = _HashingWriter(f, self.algorithm)
+                yield writer
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        self._store(tmp, writer.hexdigest())
+
+    @instrumented
+    def put(self, data: bytes | bytearray | memoryview) -> str:
+        """Store the content. Returns its hex digest."""
+        with self._writer() as w:
+            w.write(data)
+        return w.hexdigest()
+
+    @instrumented
+    def put_file(self, p: str | Path) -> str:
+        """Store a copy of the content of the file, reading it in chunks. Returns its hex digest."""
+        with open(p, 'rb') as f, self._writer() as w:
+            while chunk := f.read(_CHUNK_SIZE):
+                w.write(chunk)
+        return w.hexdigest()
+
+    def _has_digest(self, p: Path, digest: str) -> bool:
+        """Whether the index records the target as placed with the digest, and the target was not modified since."""
+        with self._lock:
+            row = self._conn.execute('SELECT digest, size, mtime_ns, inode FROM targets WHERE path = ?', (os.path.abspath(p),)).fetchone()
+        if row is None or row[0] != digest:
+            return False
+        st = _stat(p)
+        return st is not None and (row[1], row[2], row[3]) == (st.st_size, st.st_mtime_ns, st.st_ino)
+
+    def _record(self, p: Path, digest: str) -> None:
+        st = os.stat(p)
+        with self._lock, self._conn:
+            self._conn.execute('INSERT OR REPLACE INTO targets VALUES (?, ?, ?, ?, ?)', (os.path.abspath(p), digest, st.st_size, st.st_mtime_ns, st.st_ino))
+
+    @instrumented
+    def place(
+        self,
+        digest: str,
+        path: str | Path,
+        overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+        check_suffix: str | None = None,
+        with_suffix: str | None = None,
+    ) -> Path:
+        """Place the stored content of the digest at the target path.
+
+        The target path is checked with `prepare_output_file`. If the index shows that the target already has this
+        content, nothing is written and the overwrite mode is not consulted. Otherwise, an existing target is handled
+        as per the overwrite mode, and replaced atomically.
+
+        Args:
+            digest (str): The hex digest of stored content.
+            path (str | Path): The target file path.
+            overwrite_mode (OverwriteMode, optional): How to handle an existing target path. Defaults to always.
+            check_suffix (Union[str, None], optional): Expected suffix for the file. Defaults to None.
+            with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+
+        Returns:
+            Path: The target path, or the new path claimed for it in rename mode.
+
+        Raises:
+            KeyError: If no content of the digest is stored.
+            FileExistsError: If the target path exists and the overwrite mode decides against overwriting it.
+            Same exceptions as `prepare_output_file`.
+        """
+        blob = self.blob_path(digest)
+        if _stat(blob) is None:
+            raise KeyError(digest)
+        p = prepare_output_file(path, check_suffix, with_suffix)
+        if self._has_digest(p, digest):
+            return p
+        if _stat(p) is not None:
+            if overwrite_mode == OverwriteMode.RENAME:
+                p = rename_existing_path(p)
+            elif not overwrite_existing_path(p, overwrite_mode):
+                raise FileExistsError(p)
+        # linked next to the target then renamed over it, so that readers never see a partial target
+        tmp = p.with_name(f'.{p.name}.{secrets.token_hex(4)}.tmp')
+        _link(blob, tmp, self.link_mode)
+        try:
+            _timed('replace', os.replace, tmp, p)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        _invalidate(p)
+        self._record(p, digest)
+        return p
+
+    @instrumented
+    def write_bytes(
+        self,
+        path: str | Path,
+        data: bytes | bytearray | memoryview,
+        overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+        check_suffix: str | None = None,
+        with_suffix: str | None = None,
+    ) -> Path:
+        """Store the content and place it at the target path. See `place`."""
+        return self.place(self.put(data), path, overwrite_mode, check_suffix, with_suffix)
+
+    @contextmanager
+    def open(
+        self,
+        path: str | Path,
+        overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+        check_suffix: str | None = None,
+        with_suffix: str | None = None,
+    ) -> Iterator[_HashingWriter]:
+        """Write to the target file path through the store, in binary mode.
+
+        Data is hashed as it is written to a temporary file in the store. If the block exits without an exception,
+        the content is stored and placed at the target path as per `place`; otherwise the target path is untouched.
+        The target path is checked before the block runs, so that invalid targets fail before any data is produced.
+
+        Yields:
+            A file-like object with `write` and `writelines`.
+        """
+        p = prepare_output_file(path, check_suffix, with_suffix)
+        with self._writer() as w:
+            yield w
+        self.place(w.hexdigest(), p, overwrite_mode)
+
+    def __len__(self) -> int:
+        """Number of targets recorded in the index."""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM targets').fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'ContentStore':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
@@ -0,0 +1,209 @@
+import os
+from pathlib import Path, PurePath
+import stat
+from types import TracebackType
+from typing import IO, Any, Iterable
+
+from pathlib_extensions.cache import _IGNORED_ERRNOS, _invalidate
+from pathlib_extensions.instrument import _timed, instrumented
+from pathlib_extensions.prepare import NotAFileError, SuffixError, _apply_suffix, prepare_input_dir, prepare_output_dir
+
+__all__ = ['DirHandle']
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_CLOEXEC', 0)
+
+
+class DirHandle:
+    """Open directory, relative to which the files in it are checked, created and opened.
+
+    The directory path is resolved once when the handle is opened. Every later call passes `dir_fd` to the system
+    call, so the kernel only walks the given name, and all calls apply to the same directory even if its path is
+    renamed or replaced concurrently. Calls made through a handle do not consult the `StatCache`.
+
+    Names must be relative and must not contain '..'. This catches mistaken names, but does not confine the calls to
+    the directory: symlinks in the names are followed, including to directories elsewhere. Requires a platform
+    supporting `dir_fd`, i.e. not Windows.
+
+    Args:
+        p (str | Path): The directory path.
+        create (bool, optional): Whether to create the directory as per `prepare_output_dir` if it doesn't exist,
+            rather than requiring it to exist as per `prepare_input_dir`. Defaults to False.
+
+    Raises:
+        NotImplementedError: If the platform does not support `dir_fd`.
+        Same exceptions as `prepare_input_dir`, or as `prepare_output_dir` if `create` is True.
+    """
+
+    def __init__(self, p: str | Path, create: bool = False) -> None:
+        if os.stat not in os.supports_dir_fd or os.access not in os.supports_dir_fd:
+            raise NotImplementedError('dir_fd is not supported on this platform')
+        self.path = prepare_output_dir(p) if create else prepare_input_dir(p)
+        self._fd: int | None = _timed('open', os.open, self.path, _DIR_FLAGS)
+
+    def fileno(self) -> int:
+        if self._fd is None:
+            raise ValueError(f'I/O operation on closed directory handle: {self.path}')
+        return self._fd
+
+    def _check_name(self, name: str | PurePath) -> str:
+        s = os.fspath(name)
+        if not s or os.path.isabs(s) or '..' in PurePath(s).parts:
+            raise ValueError(f'Name must be relative to the directory, without "..": {s!r}')
+        return s
+
+    def _suffixed_name(self, name: str | PurePath, check_suffix: str | None, with_suffix: str | None) -> str:
+        return os.fspath(_apply_suffix(Path(self._check_name(name)), check_suffix, with_suffix))
+
+    def stat(self, name: str | PurePath, follow_symlinks: bool = True) -> os.stat_result | None:
+        """Stat the named path. Returns None if it does not exist."""
+        s = self._check_name(name)
+        fd = self.fileno()
+        # same errors as in `cache._stat`
+        try:
+            return _timed('stat', os.stat, s, dir_fd=fd, follow_symlinks=follow_symlinks)
+        except OSError as e:
+            if e.errno in _IGNORED_ERRNOS:
+                return None
+            raise
+        except ValueError:
+            return None
+
+    def access(self, name: str | PurePath, mode: int) -> bool:
+        """`os.access` of the named path."""
+        return _timed('access', os.access, self._check_name(name), mode, dir_fd=self.fileno())
+
+    def mkdir(self, name: str | PurePath, mode: int = 0o777, parents: bool = False, exist_ok: bool = False) -> None:
+        """Create the named directory, as per `Path.mkdir`."""
+        s = self._check_name(name)
+        try:
+            _timed('mkdir', os.mkdir, s, mode, dir_fd=self.fileno())
+        except FileNotFoundError:
+            parent = os.path.dirname(s)
+            if not parents or not parent:
+                raise
+            self.mkdir(parent, mode, parents=True, exist_ok=True)
+            self.mkdir(s, mode, parents=False, exist_ok=exist_ok)
+        except FileExistsError:
+            st = self.stat(s)
+            if not exist_ok or st is None or not stat.S_ISDIR(st.st_mode):
+                raise
+        _invalidate(self.path / s)
+
+    def open(self, name: str | PurePath, mode: str = 'r', buffering: int = -1, encoding: str | None = None, newline: str | None = None) -> IO[Any]:
+        """Open the named file, as per the built-in `open`."""
+        s = self._check_name(name)
+        fd = self.fileno()
+        return open(s, mode, buffering, encoding, newline=newline, opener=lambda path, flags: _timed('open', os.open, path, flags, 0o666, dir_fd=fd))
+
+    def _check_input_file(self, name: str) -> Path:
+        p = self.path / name
+        st = self.stat(name)
+        if st is None:
+            raise FileNotFoundError(p)
+        if not stat.S_ISREG(st.st_mode):
+            raise NotAFileError(p)
+        if not self.access(name, os.R_OK):
+            raise PermissionError(p)
+        return p
+
+    def _check_output_file(self, name: str, create: bool) -> Path:
+        p = self.path / name
+        st = self.stat(name)
+        if st is None:
+            parent = os.path.dirname(name)
+            if parent and create:
+                self.mkdir(parent, parents=True, exist_ok=True)
+            return p
+        if not stat.S_ISREG(st.st_mode):
+            raise NotAFileError(p)
+        if not self.access(name, os.W_OK):
+            raise PermissionError(p)
+        return p
+
+    @instrumented
+    def prepare_input_file(self, name: str | PurePath, check_suffix: str | None = None, with_suffix: str | None = None) -> Path:
+        """`prepare_input_file` for the named file in the directory.
+
+        Returns:
+            Path: The verified file path, i.e. the directory path joined with the name.
+        """
+        s = self._suffixed_name(name, check_suffix, with_suffix)
+        return self._check_input_file(s)
+
+    @instrumented
+    def prepare_output_file(self, name: str | PurePath, check_suffix: str | None = None, with_suffix: str | None = None, create: bool = True) -> Path:
+        """`prepare_output_file` for the named file in the directory. Missing parent directories of the name are
+        created relative to the directory.
+
+        Returns:
+            Path: The verified or updated file path, i.e. the directory path joined with the name.
+        """
+        s = self._suffixed_name(name, check_suffix, with_suffix)
+        return self._check_output_file(s, create)
+
+    @instrumented
+    def prepare_input_files(
+        self,
+        names: Iterable[str | PurePath],
+        check_suffix: str | None = None,
+        with_suffix: str | None = None,
+        return_exceptions: bool = False,
+    ) -> list[Path | Exception]:
+        """`prepare_input_files` for the named files in the directory, checked in the calling thread since each check
+        only resolves its name.
+
+        Returns:
+            list[Path | Exception]: The verified file paths (or exceptions), in input order.
+        """
+        if check_suffix is not None and with_suffix is not None:
+            raise ValueError('At most one of check_suffix and with_suffix can be specified')
+        results: list[Path | Exception] = []
+        for name in names:
+            try:
+                s = self._suffixed_name(name, check_suffix, with_suffix)
+                results.append(self._check_input_file(s))
+            except (OSError, SuffixError, ValueError) as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    @instrumented
+    def prepare_output_files(
+        self,
+        names: Iterable[str | PurePath],
+        check_suffix: str | None = None,
+        with_suffix: str | None = None,
+        create: bool = True,
+        return_exceptions: bool = False,
+    ) -> list[Path | Exception]:
+        """`prepare_output_files` for the named files in the directory. See `prepare_input_files`.
+
+        Returns:
+            list[Path | Exception]: The verified or updated file paths (or exceptions), in input order.
+        """
+        if check_suffix is not None and with_suffix is not None:
+            raise ValueError('At most one of check_suffix and with_suffix can be specified')
+        results: list[Path | Exception] = []
+        for name in names:
+            try:
+                s = self._suffixed_name(name, check_suffix, with_suffix)
+                results.append(self._check_output_file(s, create))
+            except (OSError, SuffixError, ValueError) as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> 'DirHandle':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.path})'
@@ -1,49 +1,250 @@
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from functools import lru_cache, partial
+import logging
+import os
 from pathlib import Path
-import re
+from typing import Callable, Iterable, Iterator
 
-__all__ = ['replace_os_reserved_chars', 'truncate_filename']
+__all__ = ['ReservedCharsProfile', 'replace_os_reserved_chars', 'sanitize_many', 'sanitize_paths', 'truncate_filename', 'truncate_filenames']
+logger = logging.getLogger(__name__)
 
 
-def replace_os_reserved_chars(text: str, replacement: str = '_') -> str:
+class ReservedCharsProfile(str, Enum):
+    PORTABLE = "portable"
+    POSIX = "posix"
+    WINDOWS = "windows"
+    MACOS = "macos"
+
+    @classmethod
+    def values(cls) -> tuple[str, ...]:
+        return tuple(profile.value for profile in cls)
+
+
+_RESERVED_CHARS = {
+    # union of the printable reserved characters of all supported OSes
+    ReservedCharsProfile.PORTABLE: '\\/*?:"<>|',
+    ReservedCharsProfile.POSIX: '/\0',
+    ReservedCharsProfile.WINDOWS: '\\/*?:"<>|' + ''.join(map(chr, range(32))),
+    # Finder displays ':' as '/'
+    ReservedCharsProfile.MACOS: '/:\0',
+}
+_WINDOWS_RESERVED_NAMES = frozenset(['CON', 'PRN', 'AUX', 'NUL', *(f'COM{i}' for i in range(1, 10)), *(f'LPT{i}' for i in range(1, 10))])
+
+
+@lru_cache(maxsize=None)
+def _translation_table(profile: ReservedCharsProfile, replacement: str) -> dict[int, str]:
+    # built once per profile and replacement rather than on every call
+    return str.maketrans(dict.fromkeys(_RESERVED_CHARS[profile], replacement))
+
+
+def _replace_windows_reserved_names(text: str, replacement: str) -> str:
+    # Windows silently strips trailing dots and spaces
+    stripped = text.rstrip('. ')
+    if len(stripped) < len(text):
+        text = stripped + replacement * (len(text) - len(stripped))
+    # device names are reserved regardless of case and extension, e.g. 'con.tar.gz'
+    base = text.split('.', 1)[0]
+    if base.rstrip(' ').upper() in _WINDOWS_RESERVED_NAMES:
+        text = base + replacement + text[len(base):]
+    return text
+
+
+def replace_os_reserved_chars(text: str, replacement: str = '_', profile: ReservedCharsProfile = ReservedCharsProfile.PORTABLE) -> str:
     """
     Replace OS-reserved characters in a string with a specified replacement character.
 
-    Should work on Windows, Linux, and macOS.
+    The default profile should work on Windows, Linux, and macOS. The Windows profile also replaces control
+    characters and trailing dots/spaces, and appends `replacement` to reserved device names such as `CON` and `NUL`.
 
     Args:
         text (str): The input text.
         replacement (str, optional): The replacement character. Defaults to '_'.
+        profile (ReservedCharsProfile, optional): The set of reserved characters. Defaults to portable.
 
     Returns:
         str: The modified text with reserved characters replaced by `replacement`.
     """
-    return re.sub(r'[\\/*?:"<>|]', replacement, text)
+    text = text.translate(_translation_table(profile, replacement))
+    if profile == ReservedCharsProfile.WINDOWS:
+        text = _replace_windows_reserved_names(text, replacement)
+    return text
 
 
-def truncate_filename(path: str | Path, max_length: int = 255) -> Path:
+def sanitize_many(texts: Iterable[str], replacement: str = '_', profile: ReservedCharsProfile = ReservedCharsProfile.PORTABLE) -> Iterator[str]:
     """
-    Truncate the filename such that it fits in `max_length` bytes.
+    Lazily apply `replace_os_reserved_chars` to many strings.
 
     Args:
-        path (str | Path): The path to process.
-        max_length (int, optional): The maximum number of bytes. Defaults to 255 for ext4.
+        texts (Iterable[str]): The input texts.
+        replacement (str, optional): The replacement character. Defaults to '_'.
+        profile (ReservedCharsProfile, optional): The set of reserved characters. Defaults to portable.
 
-    Returns:
-        Path: The processed path.
+    Yields:
+        str: The modified texts, in input order.
     """
-    if isinstance(path, str):
-        path = Path(path)
+    table = _translation_table(profile, replacement)
+    if profile == ReservedCharsProfile.WINDOWS:
+        for text in texts:
+            yield _replace_windows_reserved_names(text.translate(table), replacement)
+    else:
+        for text in texts:
+            yield text.translate(table)
+
+
+def _truncate_filename(path: Path, max_length: int, on_truncate: Callable[[Path, Path], None] | None) -> Path:
     filename = path.name
-    if len(filename.encode('utf-8')) <= max_length:
+    filename_bytes = filename.encode('utf-8')
+    if len(filename_bytes) <= max_length:
         return path
     suffixes = ''.join(path.suffixes)
     suffixes_bytes_length = len(suffixes.encode('utf-8'))
     if suffixes_bytes_length >= max_length:
         raise ValueError(f'Not possible to truncate filename to fit in {max_length} bytes: {path}')
-    stem_max_bytes_length = max_length - suffixes_bytes_length
-    stem = filename[:-len(suffixes)]
-    while len(stem.encode('utf-8')) > stem_max_bytes_length:
-        stem = stem[:-1]
+    # cut the encoded stem once, then drop the incomplete multibyte sequence (if any) at the cut point
+    stem_bytes = filename_bytes[:len(filename_bytes) - suffixes_bytes_length]
+    stem = stem_bytes[:max_length - suffixes_bytes_length].decode('utf-8', errors='ignore')
     result = path.parent / (stem + suffixes)
-    print(f'Truncated path: {path} -> {result}')
+    if on_truncate is None:
+        logger.info('Truncated path: %s -> %s', path, result)
+    else:
+        on_truncate(path, result)
+    return result
+
+
+def truncate_filename(path: str | Path, max_length: int = 255, on_truncate: Callable[[Path, Path], None] | None = None) -> Path:
+    """
+    Truncate the filename such that it fits in `max_length` bytes.
+
+    Args:
+        path (str | Path): The path to process.
+        max_length (int, optional): The maximum number of bytes. Defaults to 255 for ext4.
+        on_truncate (Callable[[Path, Path], None] | None, optional): Called with the original and the truncated path
+            whenever a filename is truncated. Defaults to None for logging at INFO level.
+
+    Returns:
+        Path: The processed path.
+    """
+    return _truncate_filename(Path(path), max_length, on_truncate)
+
+
+def truncate_filenames(paths: Iterable[str | Path], max_length: int = 255, on_truncate: Callable[[Path, Path], None] | None = None) -> list[Path]:
+    """
+    Truncate many filenames such that each fits in `max_length` bytes.
+
+    Runs in time linear to the total length of the filenames.
+
+    Args:
+        paths (Iterable[str | Path]): The paths to process.
+        max_length (int, optional): The maximum number of bytes. Defaults to 255 for ext4.
+        on_truncate (Callable[[Path, Path], None] | None, optional): Called with the original and the truncated path
+            whenever a filename is truncated. Defaults to None for logging at INFO level.
+
+    Returns:
+        list[Path]: The processed paths, in input order.
+    """
+    return [_truncate_filename(Path(p), max_length, on_truncate) for p in paths]
+
+
+def _ignore_truncation(original: Path, truncated: Path) -> None:
+    pass
+
+
+def _cut(text: str, max_length: int) -> str:
+    """Cut the text to at most `max_length` UTF-8 bytes, without splitting a character."""
+    return text.encode('utf-8')[:max_length].decode('utf-8', errors='ignore')
+
+
+def _sanitize_name(name: str, replacement: str, profile: ReservedCharsProfile, max_length: int) -> str:
+    # module-level so that it can be pickled to worker processes
+    name = replace_os_reserved_chars(name, replacement, profile)
+    if not name.strip('.'):
+        # empty or only dots, e.g. '...', which is not a usable file name
+        name = replacement * max(1, len(name))
+    try:
+        return _truncate_filename(Path(name), max_length, _ignore_truncation).name
+    except ValueError:
+        # e.g. a title with dots, whose suffixes alone do not fit
+        return _cut(name, max_length)
+
+
+def _numbered_name(name: str, n: int, max_length: int) -> str:
+    """`stem (n).suffix` as in `overwrite.RenameIndex`, cutting the stem so that the result fits in `max_length` bytes."""
+    p = Path(name)
+    stem, suffix = p.stem, p.suffix
+    tag = f' ({n})'
+    budget = max_length - len(tag.encode('utf-8')) - len(suffix.encode('utf-8'))
+    if budget > 0:
+        return _cut(stem, budget) + tag + suffix
+    return _cut(name, max_length - len(tag.encode('utf-8'))) + tag
+
+
+def sanitize_paths(
+    names: Iterable[str],
+    parent: str | Path,
+    replacement: str = '_',
+    profile: ReservedCharsProfile = ReservedCharsProfile.PORTABLE,
+    max_length: int = 255,
+    workers: int | None = None,
+    chunksize: int | None = None,
+) -> dict[str, Path]:
+    """
+    Turn many arbitrary names (e.g. user-provided titles) into distinct file paths in the parent directory.
+
+    Each name goes through `replace_os_reserved_chars` and `truncate_filename` on a process pool. Names that collide
+    after sanitization are then renamed `stem (n).suffix` in input order, as `overwrite.RenameIndex` does, and cut
+    again if needed to fit in `max_length` bytes. Collisions are case-insensitive unless `profile` is POSIX.
+    The filesystem is not accessed.
+
+    Args:
+        names (Iterable[str]): The names to process.
+        parent (str | Path): The directory of the resulting paths.
+        replacement (str, optional): The replacement for reserved characters. Defaults to '_'.
+        profile (ReservedCharsProfile, optional): The set of reserved characters. Defaults to PORTABLE.
+        max_length (int, optional): The maximum number of bytes of each filename. Defaults to 255 for ext4.
+        workers (Union[int, None], optional): Number of worker processes, or 1 to process in the calling process.
+            Defaults to None for `os.cpu_count()`.
+        chunksize (Union[int, None], optional): Number of names sent to a worker at once. Defaults to None for
+            a size that gives each worker about four chunks.
+
+    Returns:
+        dict[str, Path]: Each distinct original name mapped to its final path, in input order.
+
+    Raises:
+        ValueError: If a name is empty or only dots, and `replacement` is empty or only dots.
+    """
+    names = list(names)
+    parent = Path(parent)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    func = partial(_sanitize_name, replacement=replacement, profile=profile, max_length=max_length)
+    if workers == 1 or len(names) < 2:
+        sanitized: Iterable[str] = map(func, names)
+    else:
+        if chunksize is None:
+            chunksize = max(1, len(names) // (4 * workers))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sanitized = list(executor.map(func, names, chunksize=chunksize))
+    fold = profile != ReservedCharsProfile.POSIX
+    result: dict[str, Path] = {}
+    taken: set[str] = set()
+    # next number to try for each sanitized name
+    next_n: dict[str, int] = {}
+    for original, name in zip(names, sanitized):
+        if original in result:
+            continue
+        if not name.strip('.'):
+            raise ValueError(f'Not possible to sanitize the name {original!r} with replacement {replacement!r}')
+        key = name.casefold() if fold else name
+        final = name
+        if key in taken:
+            n = next_n.get(key, 1)
+            while True:
+                final = _numbered_name(name, n, max_length)
+                n += 1
+                if (final.casefold() if fold else final) not in taken:
+                    break
+            next_n[key] = n
+        taken.add(final.casefold() if fold else final)
+        result[original] = parent / final
     return result
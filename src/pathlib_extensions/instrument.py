@@ -0,0 +1,133 @@
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+import threading
+from time import perf_counter
+from typing import Any, Callable, Iterator, ParamSpec, TypeVar
+
+__all__ = ['ProfileStats', 'profile']
+P = ParamSpec('P')
+T = TypeVar('T')
+# filesystem calls made outside of any instrumented public function are attributed to this name
+_UNKNOWN_FUNCTION = '<unknown>'
+_current_function: ContextVar[str] = ContextVar('_current_function', default=_UNKNOWN_FUNCTION)
+
+
+class ProfileStats:
+    """Counts and latencies of public function calls, and of the filesystem calls made by each of them."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # function name -> [count, total seconds]
+        self._functions: dict[str, list[float]] = {}
+        # (function name, operation) -> [count, total seconds, max seconds]
+        self._fs_calls: dict[tuple[str, str], list[float]] = {}
+
+    def _record_function(self, function: str, seconds: float) -> None:
+        with self._lock:
+            x = self._functions.setdefault(function, [0, 0.0])
+            x[0] += 1
+            x[1] += seconds
+
+    def _record_fs_call(self, op: str, seconds: float) -> None:
+        key = (_current_function.get(), op)
+        with self._lock:
+            x = self._fs_calls.setdefault(key, [0, 0.0, 0.0])
+            x[0] += 1
+            x[1] += seconds
+            x[2] = max(x[2], seconds)
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Export as `{function: {'count', 'seconds', 'fs_calls': {op: {'count', 'seconds', 'max_seconds'}}}}`."""
+        with self._lock:
+            result: dict[str, dict[str, Any]] = {}
+            for function, (count, seconds) in self._functions.items():
+                result[function] = {'count': int(count), 'seconds': seconds, 'fs_calls': {}}
+            for (function, op), (count, seconds, max_seconds) in self._fs_calls.items():
+                x = result.setdefault(function, {'count': 0, 'seconds': 0.0, 'fs_calls': {}})
+                x['fs_calls'][op] = {'count': int(count), 'seconds': seconds, 'max_seconds': max_seconds}
+            return result
+
+    def to_prometheus(self, prefix: str = 'pathlib_extensions') -> str:
+        """Export in the Prometheus text exposition format."""
+        stats = self.to_dict()
+        lines = [
+            f'# HELP {prefix}_calls_total Calls of public functions.',
+            f'# TYPE {prefix}_calls_total counter',
+        ]
+        lines += [f'{prefix}_calls_total{{function="{f}"}} {x["count"]}' for f, x in stats.items()]
+        lines += [
+            f'# HELP {prefix}_call_seconds_total Time spent in public functions.',
+            f'# TYPE {prefix}_call_seconds_total counter',
+        ]
+        lines += [f'{prefix}_call_seconds_total{{function="{f}"}} {x["seconds"]}' for f, x in stats.items()]
+        fs_calls = [(f, op, y) for f, x in stats.items() for op, y in x['fs_calls'].items()]
+        lines += [
+            f'# HELP {prefix}_fs_calls_total Filesystem calls by public function and operation.',
+            f'# TYPE {prefix}_fs_calls_total counter',
+        ]
+        lines += [f'{prefix}_fs_calls_total{{function="{f}",op="{op}"}} {y["count"]}' for f, op, y in fs_calls]
+        lines += [
+            f'# HELP {prefix}_fs_call_seconds_total Time spent in filesystem calls by public function and operation.',
+            f'# TYPE {prefix}_fs_call_seconds_total counter',
+        ]
+        lines += [f'{prefix}_fs_call_seconds_total{{function="{f}",op="{op}"}} {y["seconds"]}' for f, op, y in fs_calls]
+        return '\n'.join(lines) + '\n'
+
+
+_active: ProfileStats | None = None
+
+
+@contextmanager
+def profile() -> Iterator[ProfileStats]:
+    """Collect `ProfileStats` for the duration of the block, across all threads.
+
+    When no profile is active, instrumentation costs one global lookup per call.
+    """
+    global _active
+    previous = _active
+    _active = stats = ProfileStats()
+    try:
+        yield stats
+    finally:
+        _active = previous
+
+
+def instrumented(func: Callable[P, T]) -> Callable[P, T]:
+    """Decorator for public functions, to which the filesystem calls made during their execution are attributed."""
+    name = func.__name__
+
+    @wraps(func)
+    def wrapper(*args: P.args, **kwargs: P.kwargs) -> T:
+        stats = _active
+        if stats is None:
+            return func(*args, **kwargs)
+        token = _current_function.set(name)
+        start = perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            stats._record_function(name, perf_counter() - start)
+            _current_function.reset(token)
+
+    return wrapper
+
+
+def _timed(op: str, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+    """Call `func`, recording it as filesystem operation `op` if a profile is active."""
+    stats = _active
+    if stats is None:
+        return func(*args, **kwargs)
+    start = perf_counter()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        stats._record_fs_call(op, perf_counter() - start)
+
+
+def _propagate(func: Callable[[T], Any]) -> Callable[[T], Any]:
+    """Wrap `func` to be run on worker threads in the context of the caller, so that its filesystem calls are
+    attributed to the calling function, and consult the caller's active `StatCache`."""
+    ctx = copy_context()
+    # a context cannot be entered by several threads at once, hence a copy per call
+    return lambda x: ctx.copy().run(func, x)
@@ -0,0 +1,174 @@
+import os
+from pathlib import Path
+import sqlite3
+from types import TracebackType
+from typing import Iterable, NamedTuple
+
+from pathlib_extensions.prepare import SuffixError, prepare_input_dir, prepare_input_file
+from pathlib_extensions.walk import _suffix, _walk_entries
+
+__all__ = ['ManifestEntry', 'InputManifest', 'prepare_changed_inputs']
+# number of paths looked up and recorded per SQLite statement
+_BATCH_SIZE = 500
+
+
+class ManifestEntry(NamedTuple):
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+    # name of the exception raised by validation, or None if the file is valid
+    error: str | None
+
+
+class InputManifest:
+    """On-disk record of validated input files, backed by SQLite.
+
+    Args:
+        path (str | Path): The database file path. Created if it doesn't exist.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS inputs '
+            '(path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, inode INTEGER NOT NULL, error TEXT)'
+        )
+        self._conn.commit()
+
+    def lookup(self, paths: Iterable[str]) -> dict[str, ManifestEntry]:
+        """Returns the recorded entries of the given paths. Paths never recorded are omitted."""
+        paths = list(paths)
+        entries = {}
+        for i in range(0, len(paths), _BATCH_SIZE):
+            batch = paths[i:i + _BATCH_SIZE]
+            placeholders = ','.join('?' * len(batch))
+            for row in self._conn.execute(f'SELECT path, size, mtime_ns, inode, error FROM inputs WHERE path IN ({placeholders})', batch):
+                entries[row[0]] = ManifestEntry(*row)
+        return entries
+
+    def record(self, entries: Iterable[ManifestEntry]) -> None:
+        """Insert or replace the given entries."""
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO inputs VALUES (?, ?, ?, ?, ?)', entries)
+
+    def prune(self, root: str | Path, keep: set[str]) -> int:
+        """Delete the entries of the paths under the root directory that are not in `keep`, e.g. of deleted files.
+
+        Returns:
+            int: The number of deleted entries.
+        """
+        prefix = os.path.join(os.fspath(root), '')
+        # every path starting with the prefix sorts between these two
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        rows = self._conn.execute('SELECT path FROM inputs WHERE path >= ? AND path < ?', (prefix, upper))
+        stale = [(row[0],) for row in rows if row[0] not in keep]
+        with self._conn:
+            self._conn.executemany('DELETE FROM inputs WHERE path = ?', stale)
+        return len(stale)
+
+    def __len__(self) -> int:
+        return self._conn.execute('SELECT COUNT(*) FROM inputs').fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> 'InputManifest':
+        return self
+
+    def __exit__(self, exc_type: type[BaseException] | None, exc: BaseException | None, tb: TracebackType | None) -> None:
+        self.close()
+
+
+def _prepare_batch(
+    batch: list[os.DirEntry[str]],
+    manifest: InputManifest,
+    check_suffix: str | None,
+    return_exceptions: bool,
+) -> list[Path | Exception]:
+    recorded = manifest.lookup(entry.path for entry in batch)
+    results: list[Path | Exception] = []
+    updates = []
+    try:
+        for entry in batch:
+            try:
+                st: os.stat_result | None = entry.stat()
+            except OSError:
+                # e.g. a broken symlink; left to `prepare_input_file` to report
+                st = None
+            old = recorded.get(entry.path)
+            if st is not None and old is not None and old.error is None and (old.size, old.mtime_ns, old.inode) == (st.st_size, st.st_mtime_ns, st.st_ino):
+                continue
+            error = None
+            try:
+                results.append(prepare_input_file(entry.path, check_suffix))
+            except (OSError, SuffixError) as e:
+                error = e
+            if st is not None:
+                updates.append(ManifestEntry(entry.path, st.st_size, st.st_mtime_ns, st.st_ino, None if error is None else type(error).__name__))
+            if error is not None:
+                if not return_exceptions:
+                    raise error
+                results.append(error)
+    finally:
+        manifest.record(updates)
+    return results
+
+
+def prepare_changed_inputs(
+    root: str | Path,
+    manifest: InputManifest,
+    check_suffix: str | None = None,
+    workers: int | None = None,
+    return_exceptions: bool = False,
+) -> list[Path | Exception]:
+    """Find the files under the target directory that are new or modified since they were last recorded in the
+    manifest, and prepare them for reading.
+
+    A file is considered unchanged if its size, modification time and inode match a valid entry in the manifest.
+    Only the other files are checked with `prepare_input_file`, and their results are recorded. Files that failed
+    validation are checked again on every call. Files not matching `check_suffix` are skipped. Once every directory
+    has been scanned, the entries of files under the root that no longer exist are deleted from the manifest, so that
+    it does not grow with the churn of the directory; after a subdirectory could not be scanned, none are.
+
+    Args:
+        root (str | Path): The target directory path.
+        manifest (InputManifest): The manifest recording previously validated files.
+        check_suffix (Union[str, None], optional): Expected suffix for the files. Defaults to None.
+        workers (Union[int, None], optional): Size of the thread pool for scanning directories. Defaults to None.
+        return_exceptions (bool, optional): Whether to return the exceptions of failing files and unreadable
+            subdirectories, rather than raising the first one. Defaults to False.
+
+    Returns:
+        list[Path | Exception]: The verified paths of new or modified files (or exceptions), in no particular order.
+
+    Raises:
+        Same exceptions as `prepare_input_dir` for the root, and as `prepare_input_file` for the files found
+        if `return_exceptions` is False.
+    """
+    root = prepare_input_dir(root)
+    results: list[Path | Exception] = []
+    batch: list[os.DirEntry[str]] = []
+    # every file found, whatever its suffix, whose entry is kept when pruning
+    seen: set[str] = set()
+    complete = True
+    for entry in _walk_entries(root, workers):
+        if isinstance(entry, OSError):
+            if not return_exceptions:
+                raise entry
+            results.append(entry)
+            complete = False
+            continue
+        seen.add(entry.path)
+        if check_suffix is not None and _suffix(entry.name) != check_suffix:
+            continue
+        batch.append(entry)
+        if len(batch) == _BATCH_SIZE:
+            results += _prepare_batch(batch, manifest, check_suffix, return_exceptions)
+            batch = []
+    results += _prepare_batch(batch, manifest, check_suffix, return_exceptions)
+    if complete:
+        manifest.prune(root, seen)
+    return results
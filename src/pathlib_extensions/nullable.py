@@ -1,113 +1,230 @@
-from os import PathLike, fspath
+import io
+from os import PathLike, fspath, stat_result
 from pathlib import Path
-from typing import Any, Tuple, TypeVar
+from stat import S_ISDIR, S_ISREG
+from typing import IO, Any, Iterator, Tuple
+
+from pathlib_extensions.cache import _forget_dir, _invalidate, _stat
 
 __all__ = ['NullablePath']
-T = TypeVar('T')
+# the null instance of each class, shared by all null paths of that class
+_NULLS: dict[type, 'NullablePath'] = {}
 
 
 # Optional* is already taken in Python; Maybe* is only used in Haskell. Nullable* should be less confusing?
-class NullablePath(PathLike):
-    def __new__(cls, *args, **kwargs) -> 'NullablePath':
-        return super().__new__(cls)
+class NullablePath:
+    # no per-instance __dict__; instances are immutable so that the null instance can be shared and derived values cached
+    __slots__ = ('_p', '_parents', '_suffixes')
+    _p: Path | None
+    _parents: Tuple['NullablePath', ...] | None
+    _suffixes: Tuple[str, ...] | None
+
+    def __new__(cls, p: PathLike | str | None = None) -> 'NullablePath':
+        if not p:
+            null = _NULLS.get(cls)
+            if null is None:
+                null = _NULLS[cls] = cls._create(None)
+            return null
+        return cls._create(p if isinstance(p, Path) else Path(p))
+
+    @classmethod
+    def _create(cls, p: Path | None) -> 'NullablePath':
+        # bypasses the argument conversion of __new__; `p` must be a Path, or None only for the shared null instance
+        self = object.__new__(cls)
+        self._p = p
+        self._parents = None
+        self._suffixes = None
+        return self
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # recreate via __new__, so that unpickling never mutates the shared null instance
+        return self.__class__, (self._p,)
 
-    def __init__(self, p: PathLike | str | None = None) -> None:
-        self.p: Path | None = Path(p) if p else None
+    @property
+    def p(self) -> Path | None:
+        return self._p
 
     def __bool__(self) -> bool:
-        return self.p is not None
+        return self._p is not None
 
     def __hash__(self) -> int:
-        return hash(self.p)
+        return hash(self._p)
 
     def __eq__(self, other: Any) -> bool:
         if isinstance(other, NullablePath):
-            return self.p == other.p
+            return self._p == other._p
         if isinstance(other, Path):
-            return self.p == other
+            return self._p == other
         return NotImplemented
 
     def __fspath__(self) -> str:
-        # must be defined when super().__new__() is called
-        if self.p:
-            return fspath(self.p)
+        if self._p is not None:
+            return fspath(self._p)
         return ''
 
     def __truediv__(self, other: PathLike | str | None) -> 'NullablePath':
-        if not other or not self.p:
+        if not other or self._p is None:
             return self.__class__()
-        return self.__class__(self.p / fspath(other))
+        return self._create(self._p / fspath(other))
 
     def __repr__(self) -> str:
-        return f'{self.__class__.__name__}({self.p})'
+        return f'{self.__class__.__name__}({self._p})'
 
     def __str__(self) -> str:
         return repr(self)
 
     @property
     def parent(self) -> 'NullablePath':
-        if self.p:
-            return self.__class__(self.p.parent)
+        if self._p is not None:
+            return self._create(self._p.parent)
         return self.__class__()
 
     @property
     def parents(self) -> Tuple['NullablePath', ...]:
-        if self.p:
-            return tuple(self.__class__(x) for x in self.p.parents)
-        return ()
-
-    def _redirect_getattr(self, attr_name: str, default: T) -> T:
-        if self.p:
-            return getattr(self.p, attr_name)
-        return default
+        if self._p is None:
+            return ()
+        if self._parents is None:
+            self._parents = tuple(self._create(x) for x in self._p.parents)
+        return self._parents
 
     @property
     def name(self) -> str:
-        return self._redirect_getattr('name', default='')
+        return self._p.name if self._p is not None else ''
 
     @property
     def stem(self) -> str:
-        return self._redirect_getattr('stem', default='')
+        return self._p.stem if self._p is not None else ''
 
     @property
     def suffix(self) -> str:
-        return self._redirect_getattr('suffix', default='')
+        return self._p.suffix if self._p is not None else ''
 
     @property
     def suffixes(self) -> list[str]:
-        return self._redirect_getattr('suffixes', default=[])
-    
+        if self._p is None:
+            return []
+        if self._suffixes is None:
+            self._suffixes = tuple(self._p.suffixes)
+        return list(self._suffixes)
+
     @property
     def root(self) -> str:
-        return self._redirect_getattr('root', default='')
+        return self._p.root if self._p is not None else ''
 
     @property
     def anchor(self) -> str:
-        return self._redirect_getattr('anchor', default='')
+        return self._p.anchor if self._p is not None else ''
 
     def mkdir(self, *args, **kwargs) -> None:
-        if self.p:
-            self.p.mkdir(*args, **kwargs)
-
-    def _redirect_method_call(self, method_name: str, *args, default: T, **kwargs) -> T:
-        if self.p:
-            return getattr(self.p, method_name)(*args, **kwargs)
-        return default
+        if self._p is not None:
+            self._p.mkdir(*args, **kwargs)
+            _invalidate(self._p)
 
     def exists(self) -> bool:
-        return self._redirect_method_call('exists', default=False)
+        if self._p is not None:
+            return _stat(self._p) is not None
+        return False
 
     def is_file(self) -> bool:
-        return self._redirect_method_call('is_file', default=False)
+        if self._p is not None:
+            st = _stat(self._p)
+            return st is not None and S_ISREG(st.st_mode)
+        return False
 
     def is_dir(self) -> bool:
-        return self._redirect_method_call('is_dir', default=False)
+        if self._p is not None:
+            st = _stat(self._p)
+            return st is not None and S_ISDIR(st.st_mode)
+        return False
 
     def with_name(self, name: str) -> 'NullablePath':
-        return self.__class__(self._redirect_method_call('with_name', name, default=self))
+        if self._p is not None:
+            return self._create(self._p.with_name(name))
+        return self
 
     def with_stem(self, stem: str) -> 'NullablePath':
-        return self.__class__(self._redirect_method_call('with_stem', stem, default=self))
+        if self._p is not None:
+            return self._create(self._p.with_stem(stem))
+        return self
 
     def with_suffix(self, suffix: str) -> 'NullablePath':
-        return self.__class__(self._redirect_method_call('with_suffix', suffix, default=self))
+        if self._p is not None:
+            return self._create(self._p.with_suffix(suffix))
+        return self
+
+    def stat(self, *, follow_symlinks: bool = True) -> stat_result | None:
+        if self._p is not None:
+            return self._p.stat(follow_symlinks=follow_symlinks)
+        return None
+
+    def open(self, mode: str = 'r', buffering: int = -1, encoding: str | None = None, errors: str | None = None, newline: str | None = None) -> IO[Any]:
+        """The null path opens as an empty in-memory stream, to which writes are discarded."""
+        if self._p is not None:
+            return self._p.open(mode, buffering, encoding, errors, newline)
+        if 'b' in mode:
+            return io.BytesIO()
+        return io.StringIO()
+
+    def read_bytes(self) -> bytes:
+        if self._p is not None:
+            return self._p.read_bytes()
+        return b''
+
+    def read_text(self, encoding: str | None = None, errors: str | None = None) -> str:
+        if self._p is not None:
+            return self._p.read_text(encoding, errors)
+        return ''
+
+    def iter_bytes(self, chunk_size: int = 1 << 20) -> Iterator[bytes]:
+        """Read the file in chunks of at most `chunk_size` bytes, without loading it into memory. Yields nothing for the null path."""
+        if self._p is None:
+            return
+        with self._p.open('rb') as f:
+            while chunk := f.read(chunk_size):
+                yield chunk
+
+    def iterdir(self) -> Iterator['NullablePath']:
+        if self._p is not None:
+            for x in self._p.iterdir():
+                yield self._create(x)
+
+    def glob(self, pattern: str) -> Iterator['NullablePath']:
+        if self._p is not None:
+            for x in self._p.glob(pattern):
+                yield self._create(x)
+
+    def rglob(self, pattern: str) -> Iterator['NullablePath']:
+        if self._p is not None:
+            for x in self._p.rglob(pattern):
+                yield self._create(x)
+
+    def unlink(self, missing_ok: bool = False) -> None:
+        if self._p is not None:
+            self._p.unlink(missing_ok)
+            _invalidate(self._p)
+
+    def rename(self, target: PathLike | str | None) -> 'NullablePath':
+        """Renaming the null path is a no-op returning the null path.
+
+        Raises:
+            ValueError: If a non-null path is renamed to None, the empty string or the null path, which `Path.rename`
+                would not accept either.
+        """
+        if self._p is None:
+            return self.__class__()
+        if not target:
+            raise ValueError(f'Cannot rename {self._p} to a null or empty target: {target!r}')
+        result = self._p.rename(fspath(target))
+        _forget_dir(self._p)
+        _invalidate(self._p)
+        _invalidate(result)
+        return self._create(result)
+
+    def resolve(self, strict: bool = False) -> 'NullablePath':
+        if self._p is not None:
+            return self._create(self._p.resolve(strict))
+        return self
+
+
+# registered rather than subclassed, since `PathLike` instances have a __dict__
+PathLike.register(NullablePath)
@@ -0,0 +1,241 @@
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from itertools import accumulate, compress, repeat
+from operator import add
+import os
+from pathlib import PurePath
+import re
+from stat import S_ISDIR, S_ISREG
+from typing import Iterable, Iterator, Sequence, overload
+
+from pathlib_extensions.cache import _stat
+from pathlib_extensions.instrument import _propagate
+from pathlib_extensions.nullable import NullablePath
+from pathlib_extensions.walk import _suffix
+
+__all__ = ['NullablePathArray']
+# strings that `PurePath` would change, e.g. 'a//b', 'a/./b' and 'a/'; other strings are stored as given.
+# On Windows, every string is normalized by `PurePath`.
+_NEEDS_NORMALIZING = re.compile(r'//|/\.(?:/|$)|^\./|./$') if os.sep == '/' else re.compile(r'')
+# normalized paths after which a component is joined without adding a separator
+_NO_SEPARATOR_NEEDED = frozenset(['.', os.sep, os.sep * 2])
+
+
+def _normalize(s: str) -> str:
+    if _NEEDS_NORMALIZING.search(s) is None:
+        return s
+    return str(PurePath(s))
+
+
+def _join(a: str, b: str) -> str:
+    """Same as `str(PurePath(a, b))` for normalized `a` and `b`."""
+    if os.sep != '/':
+        return str(PurePath(a, b))
+    if b.startswith('/'):
+        return b
+    if a == '.':
+        return b
+    if b == '.':
+        return a
+    if a.endswith('/'):
+        return a + b
+    return a + '/' + b
+
+
+def _check_suffix(suffix: str) -> None:
+    # same validation as `PurePath.with_suffix`
+    if suffix and (not suffix.startswith('.') or suffix == '.' or os.sep in suffix or (os.altsep is not None and os.altsep in suffix)):
+        raise ValueError(f'Invalid suffix {suffix!r}')
+
+
+class NullablePathArray:
+    """Columnar sequence of nullable paths, for holding millions of them without a Python object per path.
+
+    Paths are stored as one contiguous string buffer, an array of offsets into it, and a bitmap of nulls. Batched
+    operations work on the whole buffer at once where possible, and follow the null propagation of `NullablePath`:
+    any operation on a null element gives a null element, and joining with a null or empty component gives null.
+
+    Args:
+        paths (Iterable[PathLike | str | None], optional): The paths, where None, '' and null `NullablePath`s are null.
+    """
+
+    __slots__ = ('_buffer', '_offsets', '_nulls')
+
+    def __init__(self, paths: Iterable[os.PathLike | str | None] = ()) -> None:
+        strings = [_normalize(os.fspath(p)) if p else None for p in paths]
+        self._set(strings)
+
+    def _set(self, strings: Sequence[str | None]) -> None:
+        self._buffer = ''.join([s or '' for s in strings])
+        self._offsets = array('q', accumulate([len(s) if s else 0 for s in strings], initial=0))
+        self._nulls = bytearray((len(strings) + 7) // 8)
+        for i in compress(range(len(strings)), [s is None for s in strings]):
+            self._nulls[i >> 3] |= 1 << (i & 7)
+
+    @classmethod
+    def _from_strings(cls, strings: Sequence[str | None]) -> 'NullablePathArray':
+        # bypasses normalization; `strings` must be normalized paths, or None for null
+        self = object.__new__(cls)
+        self._set(strings)
+        return self
+
+    @classmethod
+    def nulls(cls, n: int) -> 'NullablePathArray':
+        """An array of `n` null paths."""
+        return cls._from_strings([None] * n)
+
+    def _is_null(self, i: int) -> bool:
+        return bool(self._nulls[i >> 3] & (1 << (i & 7)))
+
+    def _strings(self) -> list[str | None]:
+        buffer, offsets = self._buffer, self._offsets
+        strings: list[str | None] = [buffer[a:b] for a, b in zip(offsets, offsets[1:])]
+        for i in self._null_indices():
+            strings[i] = None
+        return strings
+
+    def _null_indices(self) -> Iterator[int]:
+        for j, byte in enumerate(self._nulls):
+            if byte:
+                for k in range(8):
+                    if byte >> k & 1:
+                        yield j * 8 + k
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    @overload
+    def __getitem__(self, i: int) -> NullablePath: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> 'NullablePathArray': ...
+
+    def __getitem__(self, i: int | slice) -> 'NullablePath | NullablePathArray':
+        if isinstance(i, slice):
+            return self._from_strings(self._strings()[i])
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError('NullablePathArray index out of range')
+        if self._is_null(i):
+            return NullablePath()
+        return NullablePath(self._buffer[self._offsets[i]:self._offsets[i + 1]])
+
+    def __iter__(self) -> Iterator[NullablePath]:
+        for s in self._strings():
+            yield NullablePath(s)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, NullablePathArray):
+            return self._buffer == other._buffer and self._offsets == other._offsets and self._nulls == other._nulls
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self._strings()})'
+
+    def to_list(self) -> list[NullablePath]:
+        """Convert to a list of `NullablePath`, sharing the null instance."""
+        return list(self)
+
+    def to_strings(self) -> list[str | None]:
+        """The paths as strings, with None for nulls."""
+        return self._strings()
+
+    def null_mask(self) -> list[bool]:
+        """Whether each element is null."""
+        return [self._is_null(i) for i in range(len(self))]
+
+    def __truediv__(self, other: 'os.PathLike | str | None | NullablePathArray | Sequence[os.PathLike | str | None]') -> 'NullablePathArray':
+        """Join each path with `other`, which is either one component for all paths or a sequence of the same length."""
+        strings = self._strings()
+        if other is None or isinstance(other, (str, os.PathLike)):
+            if not other:
+                return self.nulls(len(strings))
+            component = _normalize(os.fspath(other))
+            bases = [s or '' for s in strings]
+            if os.sep == '/' and not component.startswith('/') and component != '.':
+                # one C-level concatenation per path; only '.' and roots need the general rule
+                joined: list[str | None] = list(map(add, bases, repeat('/' + component)))
+                for i in compress(range(len(bases)), map(_NO_SEPARATOR_NEEDED.__contains__, bases)):
+                    joined[i] = _join(bases[i], component)
+            else:
+                joined = [_join(s, component) for s in bases]
+            for i in self._null_indices():
+                joined[i] = None
+            return self._from_strings(joined)
+        others = other._strings() if isinstance(other, NullablePathArray) else [_normalize(os.fspath(x)) if x else None for x in other]
+        if len(others) != len(strings):
+            raise ValueError(f'Length mismatch: {len(strings)} paths and {len(others)} components')
+        return self._from_strings([_join(a, b) if a is not None and b else None for a, b in zip(strings, others)])
+
+    @property
+    def names(self) -> list[str]:
+        """`NullablePath.name` of each element, '' for nulls."""
+        sep, buffer, offsets = os.sep, self._buffer, self._offsets
+        names = []
+        for a, b in zip(offsets, offsets[1:]):
+            name = buffer[buffer.rfind(sep, a, b) + 1 or a:b]
+            names.append('' if name == '.' else name)
+        return names
+
+    @property
+    def suffixes(self) -> list[str]:
+        """`NullablePath.suffix` of each element, '' for nulls. Note that this is one suffix per path, unlike `NullablePath.suffixes`."""
+        return list(map(_suffix, self.names))
+
+    @property
+    def stems(self) -> list[str]:
+        """`NullablePath.stem` of each element, '' for nulls."""
+        return [name[:len(name) - len(suffix)] for name, suffix in zip(self.names, self.suffixes)]
+
+    def with_suffix(self, suffix: str) -> 'NullablePathArray':
+        """`NullablePath.with_suffix` of each element.
+
+        Raises:
+            ValueError: If the suffix is invalid, or a non-null element has an empty name.
+        """
+        _check_suffix(suffix)
+        sep, buffer, offsets = os.sep, self._buffer, self._offsets
+        nulls = set(self._null_indices())
+        result: list[str | None] = []
+        # a single pass over the buffer, finding the name and the old suffix of each path without slicing them out
+        for i, (a, b) in enumerate(zip(offsets, offsets[1:])):
+            if i in nulls:
+                result.append(None)
+                continue
+            start = buffer.rfind(sep, a, b) + 1 or a
+            if start == b or buffer[start:b] == '.':
+                raise ValueError(f'{buffer[a:b]!r} has an empty name')
+            dot = buffer.rfind('.', start, b)
+            end = dot if start < dot < b - 1 else b
+            result.append(buffer[a:end] + suffix)
+        return self._from_strings(result)
+
+    def _stats(self, max_workers: int | None) -> list[os.stat_result | None]:
+        strings = self._strings()
+        paths = [s for s in strings if s is not None]
+        if max_workers == 1:
+            stats = list(map(_stat, paths))
+        else:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                stats = list(executor.map(_propagate(_stat), paths))
+        it = iter(stats)
+        return [next(it) if s is not None else None for s in strings]
+
+    def exists(self, max_workers: int | None = None) -> list[bool]:
+        """`NullablePath.exists` of each element, stat-ing the non-null paths concurrently on a thread pool.
+
+        Args:
+            max_workers (Union[int, None], optional): Size of the thread pool, or 1 to stat in the calling thread.
+                Defaults to None for the `ThreadPoolExecutor` default.
+        """
+        return [st is not None for st in self._stats(max_workers)]
+
+    def is_file(self, max_workers: int | None = None) -> list[bool]:
+        """`NullablePath.is_file` of each element. See `exists`."""
+        return [st is not None and S_ISREG(st.st_mode) for st in self._stats(max_workers)]
+
+    def is_dir(self, max_workers: int | None = None) -> list[bool]:
+        """`NullablePath.is_dir` of each element. See `exists`."""
+        return [st is not None and S_ISDIR(st.st_mode) for st in self._stats(max_workers)]
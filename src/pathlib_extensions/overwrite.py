@@ -1,7 +1,25 @@
 from enum import Enum
+from functools import lru_cache
+import hashlib
+import logging
+import os
 from pathlib import Path
+import re
+import stat
+import threading
+from typing import Callable, Iterable, Mapping
 
-__all__ = ['OverwriteMode', 'user_confirms_overwrite', 'overwrite_existing_path']
+from pathlib_extensions.cache import _exists, _invalidate, _stat
+from pathlib_extensions.instrument import _timed, instrumented
+
+__all__ = [
+    'OverwriteMode', 'OverwritePolicy', 'RenameIndex', 'user_confirms_overwrite', 'user_confirms_overwrite_all', 'overwrite_existing_path',
+    'overwrite_existing_paths', 'overwrite_if_older', 'overwrite_if_size_differs', 'overwrite_if_hash_differs', 'rename_existing_path',
+]
+logger = logging.getLogger(__name__)
+# called with an existing target path, its stat result, and the source path if any
+OverwritePolicy = Callable[[Path, os.stat_result, Path | None], bool]
+_NUMBERED_STEM = re.compile(r'^(?P<stem>.*) \((?P<n>[1-9][0-9]*)\)$')
 
 
 class OverwriteMode(str, Enum):
@@ -23,6 +41,18 @@ def user_confirms_overwrite(path: Path) -> bool:
     return user_input == 'y'
 
 
+def user_confirms_overwrite_all(path: Path) -> str:
+    """
+    Prompts the user to confirm overwriting an existing file/directory path, or all remaining paths in a batch.
+
+    Returns:
+        str: 'y' for yes, 'n' for no, 'a' for yes to all, or 's' for no to all (skip all).
+    """
+    user_input = input(f"Path '{path}' already exists. Overwrite? (y/N/a=yes to all/s=skip all): ").strip().lower()
+    return user_input if user_input in ('y', 'a', 's') else 'n'
+
+
+@instrumented
 def overwrite_existing_path(path: Path, overwrite_mode: OverwriteMode) -> bool:
     """
     Returns whether to overwrite an existing file/directory path based on the specified overwrite mode.
@@ -32,24 +62,191 @@ def overwrite_existing_path(path: Path, overwrite_mode: OverwriteMode) -> bool:
         overwrite_mode (OverwriteMode): Always, never, prompt user, or rename.
 
     Returns:
-        bool: True if the path should be overwritten, False otherwise.
+        bool: True if the path should be overwritten, False otherwise. Always False for rename; use
+            `rename_existing_path` to obtain the new path.
     """
-    if not path.exists():
+    if not _exists(path):
         raise FileNotFoundError(path)
     overwrite_message = f'Overwriting path: {path}'
     not_overwrite_message = f'Not overwriting path: {path}'
     match overwrite_mode:
         case OverwriteMode.ALWAYS:
-            print(overwrite_message)
+            logger.info(overwrite_message)
             return True
         case OverwriteMode.NEVER:
-            print(not_overwrite_message)
+            logger.info(not_overwrite_message)
             return False
         case OverwriteMode.PROMPT:
             if not user_confirms_overwrite(path):
-                print(not_overwrite_message)
+                logger.info(not_overwrite_message)
                 return False
-            print(overwrite_message)
+            logger.info(overwrite_message)
             return True
         case OverwriteMode.RENAME:
             return False
+
+
+def overwrite_if_older(target: Path, target_stat: os.stat_result, source: Path | None) -> bool:
+    """Overwrite policy: overwrite if the target was modified before the source."""
+    if source is None:
+        return True
+    return target_stat.st_mtime_ns < os.stat(source).st_mtime_ns
+
+
+def overwrite_if_size_differs(target: Path, target_stat: os.stat_result, source: Path | None) -> bool:
+    """Overwrite policy: overwrite if the target and the source differ in size."""
+    if source is None:
+        return True
+    return target_stat.st_size != os.stat(source).st_size
+
+
+def _file_digest(p: Path, chunk_size: int = 1 << 20) -> bytes:
+    h = hashlib.sha256()
+    with open(p, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.digest()
+
+
+def overwrite_if_hash_differs(target: Path, target_stat: os.stat_result, source: Path | None) -> bool:
+    """Overwrite policy: overwrite if the target and the source differ in content. Files differing in size are not hashed."""
+    if source is None or overwrite_if_size_differs(target, target_stat, source):
+        return True
+    return _file_digest(target) != _file_digest(source)
+
+
+@instrumented
+def overwrite_existing_paths(
+    paths: Iterable[Path] | Mapping[Path, Path],
+    overwrite_mode: OverwriteMode,
+    policy: OverwritePolicy | None = None,
+) -> dict[Path, bool]:
+    """
+    Returns whether to write to each of many target paths based on the specified overwrite mode and policy.
+
+    Each target is stat-ed once. Targets that do not exist can always be written. For existing targets, `policy`
+    (if any) is applied first, and the overwrite mode only decides among the targets that the policy selects.
+    In prompt mode, the user may answer yes or no to all remaining targets at once.
+
+    Args:
+        paths (Iterable[Path] | Mapping[Path, Path]): Target paths, or a mapping from target paths to source paths.
+        overwrite_mode (OverwriteMode): Always, never, prompt user, or rename.
+        policy (OverwritePolicy | None, optional): Rule deciding whether an existing target should be overwritten, e.g.
+            `overwrite_if_older`. Defaults to None for overwriting all existing targets.
+
+    Returns:
+        dict[Path, bool]: Mapping from each target path to True if it should be written, False otherwise. Existing
+            targets are never overwritten in rename mode; use `rename_existing_path` to obtain the new paths.
+    """
+    sources: Mapping[Path, Path] = paths if isinstance(paths, Mapping) else {}
+    decisions: dict[Path, bool] = {}
+    answer_all: bool | None = None
+    for path in paths:
+        st = _stat(path)
+        if st is None:
+            decisions[path] = True
+            continue
+        decision = False
+        if overwrite_mode in (OverwriteMode.ALWAYS, OverwriteMode.PROMPT):
+            decision = policy is None or policy(path, st, sources.get(path))
+            if decision and overwrite_mode == OverwriteMode.PROMPT:
+                if answer_all is None:
+                    answer = user_confirms_overwrite_all(path)
+                    if answer in ('a', 's'):
+                        answer_all = answer == 'a'
+                    decision = answer in ('y', 'a')
+                else:
+                    decision = answer_all
+        logger.info('%s path: %s', 'Overwriting' if decision else 'Not overwriting', path)
+        decisions[path] = decision
+    return decisions
+
+
+class RenameIndex:
+    """In-memory index of the names taken in a directory, for resolving `OverwriteMode.RENAME`.
+
+    The directory is listed once on construction. Names created afterwards by other writers are detected when
+    claiming, since each new name is created with `O_EXCL`. Names removed afterwards are not noticed, so their
+    numbers are not reused by this index.
+
+    Args:
+        directory (Path): The directory to index.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self._taken = set(_timed('listdir', os.listdir, directory))
+        # next candidate number per (stem, suffix), so that successive claims do not rescan from 1
+        self._next: dict[tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+
+    def claim(self, name: str, is_dir: bool = False) -> Path:
+        """Atomically create and return the next free path named `stem (n).suffix` in the directory, as observed by
+        this index.
+
+        Args:
+            name (str): The name to derive the new name from. A trailing ` (n)` in its stem is ignored.
+            is_dir (bool, optional): Whether to claim the new path as a directory rather than an empty file. Defaults to False.
+
+        Returns:
+            Path: The claimed path.
+        """
+        p = Path(name)
+        stem, suffix = p.stem, p.suffix
+        m = _NUMBERED_STEM.match(stem)
+        if m:
+            stem = m['stem']
+        key = (stem, suffix)
+        with self._lock:
+            n = self._next.get(key, 1)
+            while True:
+                candidate = f'{stem} ({n}){suffix}'
+                n += 1
+                if candidate in self._taken:
+                    continue
+                self._taken.add(candidate)
+                try:
+                    _create_exclusive(self.directory / candidate, is_dir)
+                except FileExistsError:
+                    continue
+                self._next[key] = n
+                return self.directory / candidate
+
+
+def _create_exclusive(p: Path, is_dir: bool) -> None:
+    if is_dir:
+        _timed('mkdir', os.mkdir, p)
+    else:
+        os.close(_timed('open', os.open, p, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    _invalidate(p)
+
+
+@lru_cache(maxsize=128)
+def _rename_index(directory: str) -> RenameIndex:
+    return RenameIndex(Path(directory))
+
+
+@instrumented
+def rename_existing_path(path: Path, index: RenameIndex | None = None) -> Path:
+    """
+    Claims a new path for an existing file/directory path, as per `OverwriteMode.RENAME`.
+
+    The new path is named `stem (n).suffix` with the next `n` not observed to be taken by this process, and is created
+    (as an empty file, or an empty directory if `path` is a directory) so that concurrent writers never receive the
+    same path. The shared index lists each directory once per process, so numbers freed afterwards by removing or
+    renaming paths are not reused, and `n` may not be the smallest free one, until `clear_known_dirs` is called.
+
+    Args:
+        path (Path): An existing file/directory path.
+        index (RenameIndex | None, optional): Index of the parent directory. Defaults to None for an index that is
+            shared by all calls in the same directory.
+
+    Returns:
+        Path: The claimed path.
+    """
+    st = _stat(path)
+    if st is None:
+        raise FileNotFoundError(path)
+    if index is None:
+        index = _rename_index(os.path.abspath(path.parent))
+    return path.with_name(index.claim(path.name, is_dir=stat.S_ISDIR(st.st_mode)).name)
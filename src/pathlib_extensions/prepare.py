@@ -1,7 +1,21 @@
+import mmap as _mmap
 import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, TypeVar
 
-__all__ = ['NotAFileError', 'SuffixError', 'prepare_input_dir', 'prepare_input_file', 'prepare_output_dir', 'prepare_output_file']
+from pathlib_extensions.cache import _access, _add_known_dir, _forget_dir, _invalidate, _is_known_dir, _mkdir, _stat
+from pathlib_extensions.capacity import capacity_budget
+from pathlib_extensions.instrument import _propagate, _timed, instrumented
+
+__all__ = [
+    'NotAFileError', 'SuffixError', 'prepare_input_dir', 'prepare_input_file', 'prepare_output_dir', 'prepare_output_file',
+    'prepare_input_files', 'prepare_output_files', 'ensure_dirs', 'open_input',
+]
+# O_CLOEXEC is missing on Windows, where handles are not inherited by default
+_OPEN_INPUT_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+T = TypeVar('T')
 
 
 class NotAFileError(OSError):
@@ -15,6 +29,58 @@ class SuffixError(Exception):
     """Raised when the file suffix does not meet the expected criteria."""
 
 
+def _apply_suffix(p: Path, check_suffix: str | None, with_suffix: str | None) -> Path:
+    if check_suffix is not None:
+        if with_suffix is not None:
+            raise ValueError('At most one of check_suffix and with_suffix can be specified')
+        if p.suffix != check_suffix:
+            raise SuffixError(check_suffix, p)
+    if with_suffix is not None:
+        p = p.with_suffix(with_suffix)
+    return p
+
+
+def _check_input_file(p: Path) -> None:
+    st = _stat(p)
+    if st is None:
+        raise FileNotFoundError(p)
+    if not stat.S_ISREG(st.st_mode):
+        raise NotAFileError(p)
+    if not _access(p, os.R_OK):
+        raise PermissionError(p)
+
+
+def _check_output_file(p: Path) -> bool:
+    """Returns True if the target file does not exist yet, i.e. its parent directory may need to be created."""
+    st = _stat(p)
+    if st is None:
+        return True
+    if not stat.S_ISREG(st.st_mode):
+        raise NotAFileError(p)
+    if not _access(p, os.W_OK):
+        raise PermissionError(p)
+    return False
+
+
+def _map_paths(func: Callable[[Path], T], paths: Iterable[Path], max_workers: int | None, return_exceptions: bool) -> list[T | Exception]:
+    """Apply `func` to each path on a thread pool, returning results in input order."""
+    def call(p: Path) -> T | Exception:
+        try:
+            return func(p)
+        except (OSError, SuffixError, ValueError) as e:
+            if not return_exceptions:
+                raise
+            return e
+
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        return list(executor.map(_propagate(call), paths))
+    finally:
+        # on the first error, do not wait for the remaining paths
+        executor.shutdown(cancel_futures=True)
+
+
+@instrumented
 def prepare_input_dir(p: str | Path) -> Path:
     """Prepare the target directory path for reading.
 
@@ -31,15 +97,17 @@ def prepare_input_dir(p: str | Path) -> Path:
     """
     if isinstance(p, str):
         p = Path(p)
-    if not p.is_dir():
-        if p.exists():
-            raise NotADirectoryError(p)
+    st = _stat(p)
+    if st is None:
         raise FileNotFoundError(p)
-    if not os.access(p, os.R_OK):
+    if not stat.S_ISDIR(st.st_mode):
+        raise NotADirectoryError(p)
+    if not _access(p, os.R_OK):
         raise PermissionError(p)
     return p
 
 
+@instrumented
 def prepare_input_file(p: str | Path, check_suffix: str | None = None, with_suffix: str | None = None) -> Path:
     """Prepare the target file path for reading.
 
@@ -60,28 +128,26 @@ def prepare_input_file(p: str | Path, check_suffix: str | None = None, with_suff
     """
     if isinstance(p, str):
         p = Path(p)
-    if check_suffix is not None:
-        if with_suffix is not None:
-            raise ValueError('At most one of check_suffix and with_suffix can be specified')
-        if p.suffix != check_suffix:
-            raise SuffixError(check_suffix, p)
-    if with_suffix is not None:
-        p = p.with_suffix(with_suffix)
-    if not p.is_file():
-        if p.exists():
-            raise NotAFileError(p)
-        raise FileNotFoundError(p)
-    if not os.access(p, os.R_OK):
-        raise PermissionError(p)
+    p = _apply_suffix(p, check_suffix, with_suffix)
+    _check_input_file(p)
     return p
 
 
-def prepare_output_dir(p: str | Path, create: bool = True) -> Path:
+@instrumented
+def prepare_output_dir(p: str | Path, create: bool = True, *, expected_bytes: int = 0, expected_files: int = 0) -> Path:
     """Prepare the target directory path for writing.
 
+    If `expected_bytes` or `expected_files` is given, the free capacity of the filesystem is also checked against
+    them, net of current reservations, as per `capacity_budget(p).check`, so that a large batch of writes fails before
+    it starts rather than when the disk is full. The free capacity is read at most once per filesystem per
+    `CapacityBudget.max_age`. The check does not reserve the capacity: writers running concurrently with other batches
+    should reserve what they write with `capacity_budget(p).reserve`, and release it once written.
+
     Args:
         p (str | Path): The target directory path.
         create (bool, optional): Whether to create the directory if it doesn't exist. Defaults to True.
+        expected_bytes (int, optional): Bytes expected to be written to the filesystem. Defaults to 0.
+        expected_files (int, optional): Files expected to be created on the filesystem. Defaults to 0.
 
     Returns:
         Path: The verified or created directory path.
@@ -89,20 +155,34 @@ def prepare_output_dir(p: str | Path, create: bool = True) -> Path:
     Raises:
         NotADirectoryError: If the target path exists but is not a directory.
         PermissionError: If the current user has no write permission to the target directory.
+        InsufficientSpaceError: If the filesystem lacks the expected capacity.
     """
     if isinstance(p, str):
         p = Path(p)
-    if p.exists():
-        if not p.is_dir():
+    if expected_bytes or expected_files:
+        # before anything is created, so that a failing preflight leaves nothing behind
+        capacity_budget(p).check(expected_bytes, expected_files)
+    # directories this process has created or found before are not stat-ed again, unless no longer writable
+    if _is_known_dir(p):
+        if _access(p, os.W_OK):
+            return p
+        # e.g. removed by other means since
+        _forget_dir(p)
+        _invalidate(p)
+    st = _stat(p)
+    if st is not None:
+        if not stat.S_ISDIR(st.st_mode):
             raise NotADirectoryError(p)
+        _add_known_dir(p)
     elif create:
         # if checks failed, new dir is not created
-        p.mkdir(parents=True, exist_ok=True)
-    if not os.access(p, os.W_OK):
+        _mkdir(p)
+    if not _access(p, os.W_OK):
         raise PermissionError(p)
     return p
 
 
+@instrumented
 def prepare_output_file(p: str | Path, check_suffix: str | None = None, with_suffix: str | None = None, create: bool = True) -> Path:
     """Prepare the target file path for writing.
 
@@ -123,19 +203,171 @@ def prepare_output_file(p: str | Path, check_suffix: str | None = None, with_suf
     """
     if isinstance(p, str):
         p = Path(p)
-    if check_suffix is not None:
-        if with_suffix is not None:
-            raise ValueError('At most one of check_suffix and with_suffix can be specified')
-        if p.suffix != check_suffix:
-            raise SuffixError(check_suffix, p)
-    if with_suffix is not None:
-        p = p.with_suffix(with_suffix)
-    if p.exists():
-        if not p.is_file():
-            raise NotAFileError(p)
-        if not os.access(p, os.W_OK):
-            raise PermissionError(p)
-    elif create:
+    p = _apply_suffix(p, check_suffix, with_suffix)
+    if _check_output_file(p) and create:
         # if checks failed, new dir is not created
-        p.parent.mkdir(parents=True, exist_ok=True)
+        _mkdir(p.parent)
     return p
+
+
+@instrumented
+def prepare_input_files(
+    paths: Iterable[str | Path],
+    check_suffix: str | None = None,
+    with_suffix: str | None = None,
+    max_workers: int | None = None,
+    return_exceptions: bool = False,
+) -> list[Path | Exception]:
+    """Prepare many target file paths for reading, checking them concurrently on a thread pool.
+
+    Each path is stat-ed exactly once; the file type is read from that single result.
+
+    Args:
+        paths (Iterable[str | Path]): The target file paths.
+        check_suffix (Union[str, None], optional): Expected suffix for the files. Defaults to None.
+        with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+        max_workers (Union[int, None], optional): Size of the thread pool. Defaults to None for the `ThreadPoolExecutor` default.
+        return_exceptions (bool, optional): Whether to return the exception of a failing path in place of its result,
+            rather than raising the first one in input order. Defaults to False.
+
+    Returns:
+        list[Path | Exception]: The verified file paths (or exceptions), in input order.
+
+    Raises:
+        ValueError: If both `check_suffix` and `with_suffix` are specified.
+        Same exceptions as `prepare_input_file` if `return_exceptions` is False.
+    """
+    if check_suffix is not None and with_suffix is not None:
+        raise ValueError('At most one of check_suffix and with_suffix can be specified')
+
+    def prepare(p: Path) -> Path:
+        p = _apply_suffix(p, check_suffix, with_suffix)
+        _check_input_file(p)
+        return p
+
+    return _map_paths(prepare, (Path(p) for p in paths), max_workers, return_exceptions)
+
+
+@instrumented
+def prepare_output_files(
+    paths: Iterable[str | Path],
+    check_suffix: str | None = None,
+    with_suffix: str | None = None,
+    create: bool = True,
+    max_workers: int | None = None,
+    return_exceptions: bool = False,
+) -> list[Path | Exception]:
+    """Prepare many target file paths for writing, checking them concurrently on a thread pool.
+
+    Each path is stat-ed exactly once. Missing parent directories are created once per distinct directory.
+
+    Args:
+        paths (Iterable[str | Path]): The target file paths.
+        check_suffix (Union[str, None], optional): Expected suffix for the files. Defaults to None.
+        with_suffix (Union[str, None], optional): Suffix to add if missing. Defaults to None.
+        create (bool, optional): Whether to create the directories if they don't exist. Defaults to True.
+        max_workers (Union[int, None], optional): Size of the thread pool. Defaults to None for the `ThreadPoolExecutor` default.
+        return_exceptions (bool, optional): Whether to return the exception of a failing path in place of its result,
+            rather than raising the first one in input order. Defaults to False.
+
+    Returns:
+        list[Path | Exception]: The verified or updated file paths (or exceptions), in input order.
+
+    Raises:
+        ValueError: If both `check_suffix` and `with_suffix` are specified.
+        Same exceptions as `prepare_output_file` if `return_exceptions` is False.
+    """
+    if check_suffix is not None and with_suffix is not None:
+        raise ValueError('At most one of check_suffix and with_suffix can be specified')
+
+    def prepare(p: Path) -> tuple[Path, bool]:
+        p = _apply_suffix(p, check_suffix, with_suffix)
+        return p, _check_output_file(p)
+
+    results: list[Path | Exception] = []
+    missing_parents: dict[Path, list[int]] = {}
+    for result in _map_paths(prepare, (Path(p) for p in paths), max_workers, return_exceptions):
+        if isinstance(result, Exception):
+            results.append(result)
+            continue
+        p, missing = result
+        if missing and create:
+            missing_parents.setdefault(p.parent, []).append(len(results))
+        results.append(p)
+    # each distinct directory is created once, top-down
+    for parent in sorted(missing_parents, key=lambda x: x.parts):
+        try:
+            _mkdir(parent)
+        except OSError as e:
+            if not return_exceptions:
+                raise
+            for i in missing_parents[parent]:
+                results[i] = e
+    return results
+
+
+@instrumented
+def ensure_dirs(paths: Iterable[str | Path]) -> list[Path]:
+    """Create many directories and their missing parents.
+
+    Directories are deduplicated and created top-down, so each new directory whose parent exists by then costs one
+    `mkdir`. A missing parent that is not among the paths costs two more, as `Path.mkdir(parents=True)` first fails,
+    then creates the parent and retries. Like in `prepare_output_dir` and `prepare_output_file`, each directory is
+    created at most once per process.
+
+    Args:
+        paths (Iterable[str | Path]): The target directory paths.
+
+    Returns:
+        list[Path]: The deduplicated directory paths, sorted top-down.
+
+    Raises:
+        FileExistsError: If a target path exists but is not a directory.
+    """
+    dirs = sorted({Path(p) for p in paths}, key=lambda x: x.parts)
+    for d in dirs:
+        _mkdir(d)
+    return dirs
+
+
+@instrumented
+def open_input(p: str | Path, check_suffix: str | None = None, mmap: bool = True) -> _mmap.mmap | BinaryIO:
+    """Prepare the target file path for reading, and open it.
+
+    The file is opened first and validated with `os.fstat` on the same descriptor, so that the checks and the reads
+    apply to the same file even if the path is replaced concurrently, and the file is opened only once.
+
+    Args:
+        p (str | Path): The target file path.
+        check_suffix (Union[str, None], optional): Expected suffix for the file. Defaults to None.
+        mmap (bool, optional): Whether to map regular non-empty files into memory. Defaults to True.
+
+    Returns:
+        mmap | BinaryIO: A read-only `mmap` for regular non-empty files if `mmap` is True, which can be sliced or
+            wrapped in a `memoryview` without copying. Otherwise, a buffered binary reader, which also streams pipes
+            and character devices. Either can be used as a context manager to close it.
+
+    Raises:
+        FileNotFoundError: If the target path does not exist.
+        NotAFileError: If the target path is a directory.
+        SuffixError: If the file suffix does not meet the expected criteria.
+        PermissionError: If the current user has no read permission to the target file.
+    """
+    if isinstance(p, str):
+        p = Path(p)
+    p = _apply_suffix(p, check_suffix, None)
+    fd = _timed('open', os.open, p, _OPEN_INPUT_FLAGS)
+    try:
+        st = _timed('fstat', os.fstat, fd)
+        if stat.S_ISDIR(st.st_mode):
+            raise NotAFileError(p)
+        if not (mmap and stat.S_ISREG(st.st_mode) and st.st_size > 0):
+            return open(fd, 'rb')
+    except BaseException:
+        os.close(fd)
+        raise
+    try:
+        return _mmap.mmap(fd, 0, access=_mmap.ACCESS_READ)
+    finally:
+        # the mapping holds its own reference to the file
+        os.close(fd)
@@ -0,0 +1,111 @@
+import hashlib
+import os
+from pathlib import Path, PurePath
+from typing import Iterator
+
+from pathlib_extensions.cache import _stat
+from pathlib_extensions.prepare import _apply_suffix, prepare_output_dir, prepare_output_file
+from pathlib_extensions.walk import _walk_entries
+
+__all__ = ['ShardedLayout']
+# bytes of the hash of a name, from which the subdirectories of all levels are derived
+_DIGEST_SIZE = 8
+
+
+def _check_name(name: str) -> None:
+    if not name or name in ('.', '..') or os.sep in name or (os.altsep is not None and os.altsep in name):
+        raise ValueError(f'Not a file name: {name!r}')
+
+
+class ShardedLayout:
+    """Maps logical file names to paths spread over a tree of hashed subdirectories, e.g. `root/3f/a0/name`.
+
+    Keeping directories small keeps lookups and creates fast on filesystems such as ext4 and NFS, which slow down with
+    millions of entries in one directory. The subdirectories of a name are derived from a stable hash of the name, so
+    that every process maps the same name to the same path, and the name is kept as is for the reverse lookup.
+
+    Args:
+        root (str | Path): The root directory of the layout.
+        fanout (int, optional): Number of subdirectories per level. Defaults to 256.
+        depth (int, optional): Number of levels of subdirectories. Defaults to 2, for 65536 leaf directories.
+
+    Raises:
+        ValueError: If `fanout` is less than 2, `depth` is less than 1, or `fanout ** depth` exceeds the 2**64 values of
+            the hash, which would leave the deeper levels always the same.
+    """
+
+    def __init__(self, root: str | Path, fanout: int = 256, depth: int = 2) -> None:
+        if fanout < 2:
+            raise ValueError(f'fanout must be at least 2: {fanout}')
+        if depth < 1:
+            raise ValueError(f'depth must be at least 1: {depth}')
+        # the depth is checked first, so that a huge depth fails without computing the power
+        if depth > 8 * _DIGEST_SIZE or fanout**depth > 1 << 8 * _DIGEST_SIZE:
+            raise ValueError(f'fanout ** depth exceeds the hash space of 2**{8 * _DIGEST_SIZE}: {fanout} ** {depth}')
+        self.root = Path(root)
+        self.fanout = fanout
+        self.depth = depth
+        # hex digits per level, e.g. 2 for a fanout of 256
+        self._width = len(format(fanout - 1, 'x'))
+
+    def __repr__(self) -> str:
+        return f'{self.__class__.__name__}({self.root}, fanout={self.fanout}, depth={self.depth})'
+
+    def shards(self, name: str) -> tuple[str, ...]:
+        """The subdirectory names of the logical name, one per level."""
+        _check_name(name)
+        h = int.from_bytes(hashlib.blake2b(name.encode('utf-8', 'surrogateescape'), digest_size=_DIGEST_SIZE).digest(), 'big')
+        shards = []
+        for _ in range(self.depth):
+            h, i = divmod(h, self.fanout)
+            shards.append(format(i, f'0{self._width}x'))
+        return tuple(shards)
+
+    def path(self, name: str) -> Path:
+        """The path of the logical name, without accessing the filesystem."""
+        return self.root.joinpath(*self.shards(name), name)
+
+    def prepare(self, name: str, check_suffix: str | None = None, with_suffix: str | None = None) -> Path:
+        """Prepare the path of the logical name for writing, as per `prepare_output_file`.
+
+        The subdirectories are created on first use with `prepare_output_dir`, so each is created at most once per process.
+        The suffix is applied before hashing, so that the returned path is the path of its own name.
+
+        Returns:
+            Path: The verified path of the logical name.
+
+        Raises:
+            ValueError: If the name is not a file name, i.e. contains a separator.
+            Same exceptions as `prepare_output_dir` and `prepare_output_file`.
+        """
+        _check_name(name)
+        name = _apply_suffix(Path(name), check_suffix, with_suffix).name
+        p = self.path(name)
+        prepare_output_dir(p.parent)
+        return prepare_output_file(p, create=False)
+
+    def name_of(self, p: str | PurePath) -> str:
+        """Reverse lookup: the logical name of a path in the layout.
+
+        Raises:
+            ValueError: If the path is not where the layout would put its name.
+        """
+        p = Path(p)
+        if p != self.path(p.name):
+            raise ValueError(f'Not a path in {self!r}: {p}')
+        return p.name
+
+    def __contains__(self, name: str) -> bool:
+        """Whether the path of the logical name exists."""
+        return _stat(self.path(name)) is not None
+
+    def names(self) -> Iterator[str]:
+        """The logical names of all files in the layout, in no particular order. Files not placed by the layout are skipped."""
+        root = os.fspath(self.root)
+        for entry in _walk_entries(self.root):
+            if isinstance(entry, OSError):
+                if entry.filename == root:
+                    raise entry
+                continue
+            if os.path.dirname(entry.path) == os.fspath(self.path(entry.name).parent):
+                yield entry.name
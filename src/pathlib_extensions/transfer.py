@@ -0,0 +1,379 @@
+from concurrent.futures import ThreadPoolExecutor
+import errno
+import os
+from pathlib import Path
+import shutil
+import stat
+from typing import BinaryIO, Iterable
+
+from pathlib_extensions.cache import _access, _forget_dir, _invalidate, _mkdir, _stat
+from pathlib_extensions.instrument import _propagate, _timed, instrumented
+from pathlib_extensions.overwrite import OverwriteMode, OverwritePolicy, overwrite_existing_paths, rename_existing_path
+from pathlib_extensions.prepare import NotAFileError, prepare_input_dir, prepare_output_dir
+from pathlib_extensions.walk import _walk_entries
+
+__all__ = ['copy_tree', 'move_tree']
+# bytes per `copy_file_range` or `sendfile` call
+_CHUNK_SIZE = 1 << 26
+# bytes per read when comparing contents
+_COMPARE_CHUNK_SIZE = 1 << 20
+# errors for which a kernel copy is not possible between two files, so that a slower method is tried next
+_UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP, errno.EBADF, errno.ENOTSUP}
+
+
+def _kernel_copy(fsrc: BinaryIO, fdst: BinaryIO, method: str) -> None:
+    infd, outfd = fsrc.fileno(), fdst.fileno()
+    offset = 0
+    while True:
+        if method == 'copy_file_range':
+            n = _timed(method, os.copy_file_range, infd, outfd, _CHUNK_SIZE)
+        else:
+            n = _timed(method, os.sendfile, outfd, infd, offset, _CHUNK_SIZE)
+        if n == 0:
+            return
+        offset += n
+
+
+def _copy_data(fsrc: BinaryIO, fdst: BinaryIO) -> None:
+    """Copy the file content in the kernel where possible, falling back to a read/write loop."""
+    for method in ('copy_file_range', 'sendfile'):
+        if not hasattr(os, method):
+            continue
+        try:
+            return _kernel_copy(fsrc, fdst, method)
+        except OSError as e:
+            # only retried if nothing was written yet
+            if e.errno not in _UNSUPPORTED_ERRNOS or fdst.tell() or os.fstat(fdst.fileno()).st_size:
+                raise
+    _timed('copyfileobj', shutil.copyfileobj, fsrc, fdst, _CHUNK_SIZE)
+
+
+def _copy_file(src: Path, dst: Path, src_stat: os.stat_result) -> None:
+    """Copy content, permission bits and timestamps to a partial file next to `dst`, then rename it over `dst`."""
+    # named after the target, so that a transfer interrupted by a crash truncates rather than accumulates partial files
+    part = dst.with_name(f'.{dst.name}.part')
+    try:
+        with open(src, 'rb') as fsrc, open(part, 'wb') as fdst:
+            _copy_data(fsrc, fdst)
+        os.chmod(part, stat.S_IMODE(src_stat.st_mode))
+        # the modification time is what later runs compare to skip completed files
+        os.utime(part, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        _timed('replace', os.replace, part, dst)
+    except BaseException:
+        part.unlink(missing_ok=True)
+        raise
+
+
+def _move_file(src: Path, dst: Path, src_stat: os.stat_result, is_link: bool) -> None:
+    """Rename the source over `dst`, or copy it and remove the source if on another filesystem or a symlink."""
+    # a renamed symlink would stay a link, whereas a copy gets the content of the linked file
+    if not is_link:
+        try:
+            _timed('rename', os.replace, src, dst)
+            _invalidate(src)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+    _copy_file(src, dst, src_stat)
+    _timed('unlink', os.unlink, src)
+    _invalidate(src)
+
+
+def _unclaim(p: Path) -> None:
+    """Remove the placeholder claimed by `rename_existing_path` for a transfer that failed or never ran."""
+    try:
+        _timed('unlink', os.unlink, p)
+    except OSError:
+        # best effort, e.g. already removed by other means
+        pass
+    _invalidate(p)
+
+
+def _check_target(p: Path) -> os.stat_result | None:
+    """Same checks as `prepare_output_file`, returning the stat result of an existing target."""
+    st = _stat(p)
+    if st is not None:
+        if not stat.S_ISREG(st.st_mode):
+            raise NotAFileError(p)
+        if not _access(p, os.W_OK):
+            raise PermissionError(p)
+    return st
+
+
+def _is_complete(src_stat: os.stat_result, dst_stat: os.stat_result) -> bool:
+    return src_stat.st_size == dst_stat.st_size and src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        while True:
+            x = _timed('read', fa.read, _COMPARE_CHUNK_SIZE)
+            if x != _timed('read', fb.read, _COMPARE_CHUNK_SIZE):
+                return False
+            if not x:
+                return True
+
+
+def _check_not_inside(src: Path, dst: Path) -> None:
+    """Same check as `shutil.move`: a directory cannot be moved into itself."""
+    s, d = src.resolve(), dst.resolve()
+    if d == s or s in d.parents:
+        raise ValueError(f'Cannot move a directory into itself: {src} -> {dst}')
+
+
+def _transfer(
+    src: str | Path,
+    dsts: list[Path],
+    move: bool,
+    overwrite_mode: OverwriteMode,
+    policy: OverwritePolicy | None,
+    resume: bool,
+    workers: int | None,
+    return_exceptions: bool,
+) -> dict[Path, Path | None | Exception]:
+    src_root = prepare_input_dir(src)
+    if move:
+        for d in dsts:
+            _check_not_inside(src_root, d)
+    dst_roots = [prepare_output_dir(d) for d in dsts]
+    results: dict[Path, Path | None | Exception] = {}
+    # (source, target) pairs in walk order
+    pairs: list[tuple[Path, Path]] = []
+    src_stats: dict[Path, os.stat_result] = {}
+    # sources that are symlinks to files, moved by copying the linked file as for copies
+    links: set[Path] = set()
+    for entry in _walk_entries(src_root, workers):
+        if isinstance(entry, OSError):
+            if not return_exceptions:
+                raise entry
+            results[Path(entry.filename or src_root)] = entry
+            continue
+        p = Path(entry.path)
+        try:
+            if not entry.is_file():
+                raise NotAFileError(p)
+            src_stats[p] = entry.stat()
+            if entry.is_symlink():
+                links.add(p)
+        except OSError as e:
+            if not return_exceptions:
+                raise
+            results[p] = e
+            continue
+        rel = p.relative_to(src_root)
+        pairs += [(p, d / rel) for d in dst_roots]
+
+    def check(pair: tuple[Path, Path]) -> os.stat_result | None | Exception:
+        try:
+            return _check_target(pair[1])
+        except OSError as e:
+            return e
+
+    def compare(pair: tuple[Path, Path]) -> bool | Exception:
+        try:
+            return _same_content(*pair)
+        except OSError as e:
+            return e
+
+    # placeholders claimed in rename mode, and the final targets whose transfer has started, so that the placeholders
+    # of failed and cancelled transfers are removed rather than left behind empty
+    claimed: set[Path] = set()
+    started: set[Path] = set()
+
+    def run(item: tuple[Path, Path, bool]) -> Path | None | Exception:
+        s, final, complete = item
+        started.add(final)
+        try:
+            if complete:
+                # only for moves: the copy of an interrupted run completed, but the source was not removed
+                _timed('unlink', os.unlink, s)
+                _invalidate(s)
+                return None
+            if move:
+                _move_file(s, final, src_stats[s], s in links)
+            else:
+                _copy_file(s, final, src_stats[s])
+            _invalidate(final)
+            return final
+        except OSError as e:
+            if final in claimed:
+                _unclaim(final)
+            return e
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        # targets are stat-ed once, concurrently; only existing targets that are not complete need a decision.
+        # Each item to run is (target, (source, final target, whether the target is already complete)).
+        todo: list[tuple[Path, tuple[Path, Path, bool]]] = []
+        undecided: dict[Path, Path] = {}
+        # on move, targets matching in size and modification time, whose sources are only removed if the contents match
+        # too, since a partially written target may have been given the modification time of its source
+        to_compare: list[tuple[Path, Path]] = []
+        for (s, d), st in zip(pairs, executor.map(_propagate(check), pairs)):
+            if isinstance(st, Exception):
+                if not return_exceptions:
+                    raise st
+                results[d] = st
+            elif st is None:
+                todo.append((d, (s, d, False)))
+            elif resume and _is_complete(src_stats[s], st):
+                if move:
+                    to_compare.append((s, d))
+                else:
+                    results[d] = None
+            else:
+                undecided[d] = s
+        for (s, d), same in zip(to_compare, executor.map(_propagate(compare), to_compare)):
+            if isinstance(same, Exception):
+                if not return_exceptions:
+                    raise same
+                results[d] = same
+            elif same:
+                todo.append((d, (s, d, True)))
+            else:
+                undecided[d] = s
+        decisions = overwrite_existing_paths(undecided, overwrite_mode, policy) if undecided else {}
+        for d, s in undecided.items():
+            if overwrite_mode == OverwriteMode.RENAME:
+                final = rename_existing_path(d)
+                claimed.add(final)
+                todo.append((d, (s, final, False)))
+            elif decisions[d]:
+                todo.append((d, (s, d, False)))
+            else:
+                results[d] = None
+        # created top-down, once each; the files of a directory that cannot be created fail like any other file
+        dir_errors: dict[Path, OSError] = {}
+        for parent in sorted({final.parent for _, (_, final, _) in todo}, key=lambda x: x.parts):
+            try:
+                _mkdir(parent)
+            except OSError as e:
+                dir_errors[parent] = e
+        runnable = []
+        for d, item in todo:
+            error = dir_errors.get(item[1].parent)
+            if error is None:
+                runnable.append((d, item))
+            elif not return_exceptions:
+                raise error
+            else:
+                results[d] = error
+        items = [item for _, item in runnable]
+        for (d, _), result in zip(runnable, executor.map(_propagate(run), items)):
+            if isinstance(result, Exception) and not return_exceptions:
+                raise result
+            results[d] = result
+    finally:
+        # on the first error, do not wait for the remaining files
+        executor.shutdown(cancel_futures=True)
+        for final in claimed - started:
+            _unclaim(final)
+    if move:
+        _remove_empty_dirs(src_root)
+    return results
+
+
+def _remove_empty_dirs(root: Path) -> None:
+    for dirpath, _, _ in os.walk(root, topdown=False):
+        try:
+            os.rmdir(dirpath)
+        except OSError:
+            # not empty, e.g. files that were not moved
+            continue
+        p = Path(dirpath)
+        _forget_dir(p)
+        _invalidate(p)
+
+
+def _destinations(dst: str | Path | Iterable[str | Path]) -> list[Path]:
+    if isinstance(dst, (str, os.PathLike)):
+        return [Path(dst)]
+    return [Path(d) for d in dst]
+
+
+@instrumented
+def copy_tree(
+    src: str | Path,
+    dst: str | Path | Iterable[str | Path],
+    overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+    policy: OverwritePolicy | None = None,
+    resume: bool = True,
+    workers: int | None = None,
+    return_exceptions: bool = False,
+) -> dict[Path, Path | None | Exception]:
+    """Copy the files under the source directory to the same relative paths under one or more destinations.
+
+    The source is checked with `prepare_input_dir`, each destination with `prepare_output_dir`, and each target file
+    as per `prepare_output_file`. Existing targets are handled as per `overwrite_existing_paths`, with the source files
+    passed to `policy`. Missing directories are created once each. Files are copied concurrently on a thread pool,
+    using `os.copy_file_range` or `os.sendfile` where supported. Each file is written to a partial file next to its
+    target and renamed over it once complete, with the permission bits and timestamps of the source.
+
+    With `resume`, targets matching their source in size and modification time are assumed to be complete copies from
+    an earlier, possibly interrupted run, and are skipped without consulting the overwrite mode. Symlinks to files are
+    followed, i.e. the target gets the content of the linked file. Empty directories and symlinks to directories are
+    not copied. In rename mode, the new path claimed for a target is removed again if its transfer fails.
+
+    Args:
+        src (str | Path): The source directory.
+        dst (str | Path | Iterable[str | Path]): The destination directory, or several destination directories.
+        overwrite_mode (OverwriteMode, optional): How to handle existing targets. Defaults to always.
+        policy (OverwritePolicy | None, optional): Rule deciding whether an existing target should be overwritten,
+            e.g. `overwrite_if_older`. Defaults to None for overwriting all existing targets.
+        resume (bool, optional): Whether to skip targets with the size and modification time of the source. Defaults to True.
+        workers (Union[int, None], optional): Size of the thread pool. Defaults to None for the `ThreadPoolExecutor` default.
+        return_exceptions (bool, optional): Whether to return the exceptions of failing files, rather than raising the
+            first one. Defaults to False.
+
+    Returns:
+        dict[Path, Path | None | Exception]: Mapping from each target path to the path written (which differs in rename
+            mode), None if skipped, or the exception if failed. Unreadable source files and directories are keyed by
+            their source path.
+
+    Raises:
+        Same exceptions as `prepare_input_dir` for the source and `prepare_output_dir` for the destinations, and
+        the first exception of a file if `return_exceptions` is False.
+    """
+    return _transfer(src, _destinations(dst), False, overwrite_mode, policy, resume, workers, return_exceptions)
+
+
+@instrumented
+def move_tree(
+    src: str | Path,
+    dst: str | Path,
+    overwrite_mode: OverwriteMode = OverwriteMode.ALWAYS,
+    policy: OverwritePolicy | None = None,
+    resume: bool = True,
+    workers: int | None = None,
+    return_exceptions: bool = False,
+) -> dict[Path, Path | None | Exception]:
+    """Move the files under the source directory to the same relative paths under the destination.
+
+    Same as `copy_tree`, except that each file is renamed if the source and the target are on the same filesystem,
+    and otherwise copied and then removed. Symlinks to files are copied as by `copy_tree`, and the links removed.
+    Source files whose targets are skipped by the overwrite mode are kept.
+    With `resume`, targets matching their source in size and modification time are compared by content, and their
+    source files are removed if the contents match; otherwise they are handled as per the overwrite mode. Source
+    directories left empty are removed, including the source directory itself.
+
+    Args:
+        src (str | Path): The source directory.
+        dst (str | Path): The destination directory.
+        overwrite_mode (OverwriteMode, optional): How to handle existing targets. Defaults to always.
+        policy (OverwritePolicy | None, optional): Rule deciding whether an existing target should be overwritten.
+            Defaults to None for overwriting all existing targets.
+        resume (bool, optional): Whether to treat targets with the size and modification time of the source as
+            already moved if their contents match. Defaults to True.
+        workers (Union[int, None], optional): Size of the thread pool. Defaults to None for the `ThreadPoolExecutor` default.
+        return_exceptions (bool, optional): Whether to return the exceptions of failing files, rather than raising the
+            first one. Defaults to False.
+
+    Returns:
+        dict[Path, Path | None | Exception]: Same as `copy_tree`.
+
+    Raises:
+        ValueError: If the destination is the source directory or inside it.
+        Same exceptions as `copy_tree`.
+    """
+    return _transfer(src, [Path(dst)], True, overwrite_mode, policy, resume, workers, return_exceptions)
@@ -0,0 +1,145 @@
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import os
+from pathlib import Path
+from typing import Iterator
+
+from pathlib_extensions.cache import _access, _stat
+from pathlib_extensions.prepare import NotAFileError, prepare_input_dir
+
+__all__ = ['walk_input_files']
+# non-directory entries, and subdirectories with their (device, inode) identity if following symlinks
+_ScanResult = tuple[list[os.DirEntry[str]], list[tuple[str, tuple[int, int] | None]]]
+
+
+def _suffix(name: str) -> str:
+    """Same as `PurePath.suffix`, without constructing a path."""
+    i = name.rfind('.')
+    if 0 < i < len(name) - 1:
+        return name[i:]
+    return ''
+
+
+def _scan_dir(path: str, follow_symlinks: bool) -> _ScanResult | OSError:
+    """The non-directory entries and the subdirectories of the directory. Subdirectories come with their (device,
+    inode) identity if following symlinks, which may lead back to one of their ancestors."""
+    files = []
+    dirs: list[tuple[str, tuple[int, int] | None]] = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    # file type is cached on the entry by scandir on most platforms, so this usually costs no syscall
+                    if not entry.is_dir():
+                        files.append(entry)
+                    elif follow_symlinks:
+                        st = entry.stat()
+                        dirs.append((entry.path, (st.st_dev, st.st_ino)))
+                    elif not entry.is_symlink():
+                        dirs.append((entry.path, None))
+                    # symlinks to directories are skipped when not following them
+                except OSError:
+                    files.append(entry)
+    except OSError as e:
+        return e
+    return files, dirs
+
+
+def _walk_entries(root: Path, workers: int | None = None, follow_symlinks: bool = False) -> Iterator[os.DirEntry[str] | OSError]:
+    """Yield the non-directory entries under the root directory in no particular order, scanning subdirectories
+    concurrently. Directories that cannot be scanned are yielded as their exceptions. Symlinks to directories are
+    skipped unless following them, in which case those leading back to one of their ancestors are skipped, so that
+    symlink cycles terminate.
+
+    At most twice as many directories as workers are scanned at once, which bounds memory use.
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) + 4)
+    # (device, inode) of the ancestors of each pending directory, only tracked when following symlinks
+    ancestors: frozenset[tuple[int, int]] = frozenset()
+    if follow_symlinks:
+        try:
+            st = os.stat(root)
+        except OSError as e:
+            yield e
+            return
+        ancestors = frozenset([(st.st_dev, st.st_ino)])
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        pending = deque([(os.fspath(root), ancestors)])
+        # scanning future -> ancestors of the directories it finds
+        scanning: dict[Future[_ScanResult | OSError], frozenset[tuple[int, int]]] = {}
+        while pending or scanning:
+            while pending and len(scanning) < 2 * workers:
+                path, ancestors = pending.popleft()
+                scanning[executor.submit(_scan_dir, path, follow_symlinks)] = ancestors
+            done, _ = wait(scanning, return_when=FIRST_COMPLETED)
+            for fut in done:
+                ancestors = scanning.pop(fut)
+                result = fut.result()
+                if isinstance(result, OSError):
+                    yield result
+                    continue
+                files, dirs = result
+                for path, key in dirs:
+                    if key is None:
+                        pending.append((path, ancestors))
+                    elif key not in ancestors:
+                        pending.append((path, ancestors | {key}))
+                yield from files
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def walk_input_files(
+    root: str | Path,
+    check_suffix: str | None = None,
+    workers: int | None = None,
+    follow_symlinks: bool = False,
+    return_exceptions: bool = False,
+) -> Iterator[Path | Exception]:
+    """Recursively find the files under the target directory that are ready for reading.
+
+    The root is checked with `prepare_input_dir`. Each file found is checked as per `prepare_input_file`, reusing the
+    file type cached by `os.scandir`. Files not matching `check_suffix` are skipped rather than raising `SuffixError`.
+    Subdirectories are scanned concurrently on a thread pool, and results are streamed in no particular order.
+
+    Args:
+        root (str | Path): The target directory path.
+        check_suffix (Union[str, None], optional): Expected suffix for the files. Defaults to None.
+        workers (Union[int, None], optional): Size of the thread pool. Defaults to None for the `ThreadPoolExecutor` default.
+        follow_symlinks (bool, optional): Whether to descend into symlinks to directories, rather than skipping them.
+            Symlinks leading back to one of their ancestors are skipped. Defaults to False.
+        return_exceptions (bool, optional): Whether to yield the exceptions of failing files and unreadable
+            subdirectories, rather than raising the first one. Defaults to False.
+
+    Yields:
+        Path | Exception: The verified file paths (or exceptions).
+
+    Raises:
+        Same exceptions as `prepare_input_dir` for the root, and as `prepare_input_file` for the files found
+        if `return_exceptions` is False.
+    """
+    root = prepare_input_dir(root)
+    for entry in _walk_entries(root, workers, follow_symlinks):
+        if isinstance(entry, OSError):
+            if not return_exceptions:
+                raise entry
+            yield entry
+            continue
+        if check_suffix is not None and _suffix(entry.name) != check_suffix:
+            continue
+        p = Path(entry.path)
+        try:
+            if not entry.is_file():
+                if entry.is_symlink() and _stat(p) is None:
+                    raise FileNotFoundError(p)
+                raise NotAFileError(p)
+            if not _access(p, os.R_OK):
+                raise PermissionError(p)
+        except OSError as e:
+            if not return_exceptions:
+                raise
+            yield e
+            continue
+        yield p
@@ -0,0 +1,358 @@
+import asyncio
+from collections import deque
+from concurrent.futures import Executor
+from contextvars import copy_context
+import ctypes
+import ctypes.util
+import os
+from pathlib import Path
+import select
+import struct
+import sys
+import threading
+import time
+from typing import AsyncIterator, Generator, Iterator
+
+from pathlib_extensions.prepare import prepare_input_dir, prepare_input_file
+from pathlib_extensions.walk import _suffix, _walk_entries
+
+__all__ = ['watch_inputs', 'awatch_inputs']
+# from sys/inotify.h
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+_IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct('iIII')
+# longest time a watcher blocks at once, so that a stop request is noticed promptly
+_MAX_WAIT = 0.5
+
+
+def _scan(root: str, recursive: bool, since_ns: int = 0) -> list[str]:
+    """The non-directory entries under the root, optionally only those modified at or after `since_ns`."""
+    if recursive:
+        entries = [x for x in _walk_entries(Path(root)) if not isinstance(x, OSError)]
+    else:
+        try:
+            with os.scandir(root) as it:
+                entries = [x for x in it if not x.is_dir()]
+        except OSError:
+            return []
+    if not since_ns:
+        return [x.path for x in entries]
+    paths = []
+    for x in entries:
+        try:
+            if x.stat().st_mtime_ns >= since_ns:
+                paths.append(x.path)
+        except OSError:
+            continue
+    return paths
+
+
+class _InotifyWatcher:
+    """Reports files closed after writing or moved into the watched directories, using Linux inotify via ctypes."""
+
+    def __init__(self, root: str, recursive: bool) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._fd = self._libc.inotify_init1(_IN_NONBLOCK | _IN_CLOEXEC)
+        if self._fd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e))
+        self._root = root
+        self._recursive = recursive
+        # watch descriptor -> directory path
+        self._dirs: dict[int, str] = {}
+        # events between this time and the last read may have been lost by a queue overflow
+        self._drained_ns = time.time_ns()
+        try:
+            self._add(root)
+            if recursive:
+                for dirpath, _, _ in os.walk(root):
+                    if dirpath != root:
+                        self._add(dirpath)
+        except BaseException:
+            # e.g. a subdirectory that cannot be watched; `close` is never called for a failed constructor
+            os.close(self._fd)
+            raise
+
+    def _add(self, path: str) -> None:
+        mask = _IN_CLOSE_WRITE | _IN_MOVED_TO | (_IN_CREATE if self._recursive else 0)
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            e = ctypes.get_errno()
+            raise OSError(e, os.strerror(e), path)
+        self._dirs[wd] = path
+
+    def poll(self, timeout: float) -> list[str]:
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return []
+        paths = []
+        started_ns = time.time_ns()
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return []
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = _EVENT.unpack_from(data, offset)
+            offset += _EVENT.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            if mask & _IN_Q_OVERFLOW:
+                # events were dropped by the kernel: find the files they were about by their modification time
+                paths += _scan(self._root, self._recursive, self._drained_ns)
+                continue
+            if mask & _IN_IGNORED:
+                self._dirs.pop(wd, None)
+                continue
+            directory = self._dirs.get(wd)
+            if directory is None:
+                continue
+            path = os.path.join(directory, name)
+            if mask & _IN_ISDIR:
+                if self._recursive:
+                    try:
+                        self._add(path)
+                    except OSError:
+                        continue
+                    # files written before the watch was added
+                    paths += _scan(path, True)
+                continue
+            if mask & (_IN_CLOSE_WRITE | _IN_MOVED_TO):
+                paths.append(path)
+        self._drained_ns = started_ns
+        return paths
+
+    def close(self) -> None:
+        os.close(self._fd)
+
+
+class _PollingWatcher:
+    """Reports files whose size and modification time changed, and then stayed the same for one poll interval."""
+
+    def __init__(self, root: str, recursive: bool, interval: float) -> None:
+        self._root = root
+        self._recursive = recursive
+        self._interval = interval
+        self._next_poll = time.monotonic()
+        self._seen = self._snapshot()
+        # files that changed in the last poll, reported once they stop changing
+        self._changed: set[str] = set()
+
+    def _snapshot(self) -> dict[str, tuple[int, int]]:
+        snapshot = {}
+        for p in _scan(self._root, self._recursive):
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            snapshot[p] = (st.st_size, st.st_mtime_ns)
+        return snapshot
+
+    def poll(self, timeout: float) -> list[str]:
+        wait = self._next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(0.0, wait))
+        self._next_poll = time.monotonic() + self._interval
+        snapshot = self._snapshot()
+        changed = {p for p, x in snapshot.items() if self._seen.get(p) != x}
+        stable = [p for p in self._changed if p in snapshot and p not in changed]
+        self._seen = snapshot
+        self._changed = changed
+        return stable
+
+    def close(self) -> None:
+        pass
+
+
+def _watch_batches(
+    root: str | Path,
+    check_suffix: str | None,
+    recursive: bool,
+    existing: bool,
+    debounce: float,
+    batch_size: int,
+    max_pending: int,
+    poll_interval: float,
+    use_inotify: bool | None,
+    idle_timeout: float | None,
+    return_exceptions: bool,
+    stop: threading.Event,
+) -> Generator[list[Path | Exception], None, None]:
+    root_str = os.fspath(prepare_input_dir(root))
+    if use_inotify is None:
+        use_inotify = sys.platform == 'linux'
+    # started before the initial scan, so that no file written in between is missed
+    watcher: _InotifyWatcher | _PollingWatcher = _InotifyWatcher(root_str, recursive) if use_inotify else _PollingWatcher(root_str, recursive, poll_interval)
+    try:
+        ready: deque[str] = deque(_scan(root_str, recursive) if existing else [])
+        # path -> time after which it is ready, unless another event arrives for it first
+        pending: dict[str, float] = {}
+        last_event = time.monotonic()
+        while not stop.is_set():
+            now = time.monotonic()
+            if pending:
+                due = [p for p, t in pending.items() if t <= now]
+                for p in due:
+                    del pending[p]
+                ready.extend(due)
+            if ready:
+                batch = [ready.popleft() for _ in range(min(batch_size, len(ready)))]
+                results = _validate(batch, check_suffix, return_exceptions)
+                if results:
+                    yield results
+                continue
+            if idle_timeout is not None and not pending and now - last_event >= idle_timeout:
+                return
+            timeout = _MAX_WAIT
+            if pending:
+                timeout = min(timeout, max(0.0, min(pending.values()) - now))
+            if len(pending) >= max_pending:
+                # backpressure: leave further events queued in the kernel until pending files are handed over
+                time.sleep(timeout)
+                continue
+            paths = watcher.poll(timeout)
+            if paths:
+                last_event = time.monotonic()
+                for p in paths:
+                    if check_suffix is None or _suffix(os.path.basename(p)) == check_suffix:
+                        pending[p] = last_event + debounce
+    finally:
+        watcher.close()
+
+
+def _validate(paths: list[str], check_suffix: str | None, return_exceptions: bool) -> list[Path | Exception]:
+    results: list[Path | Exception] = []
+    for p in paths:
+        if check_suffix is not None and _suffix(os.path.basename(p)) != check_suffix:
+            continue
+        try:
+            results.append(prepare_input_file(p))
+        except FileNotFoundError:
+            # removed or renamed since the event, e.g. a temporary file
+            continue
+        except OSError as e:
+            if not return_exceptions:
+                raise
+            results.append(e)
+    return results
+
+
+def watch_inputs(
+    root: str | Path,
+    check_suffix: str | None = None,
+    *,
+    recursive: bool = False,
+    existing: bool = True,
+    debounce: float = 0.05,
+    batch_size: int = 1024,
+    max_pending: int = 65536,
+    poll_interval: float = 1.0,
+    use_inotify: bool | None = None,
+    idle_timeout: float | None = None,
+    return_exceptions: bool = False,
+) -> Iterator[Path | Exception]:
+    """Yield the files in the target directory that are ready for reading, as they are written.
+
+    On Linux, files are reported by inotify once they are closed after writing or moved into the directory, so there
+    is no per-file cost while nothing happens. Elsewhere, or if `use_inotify` is False, the directory is polled, and
+    files are reported once their size and modification time stay the same for one poll interval.
+
+    Each reported file is checked with `prepare_input_file`. Files not matching `check_suffix` are skipped, as are
+    files removed before they could be checked. Events for the same file within `debounce` seconds are coalesced.
+    Nothing is read from the kernel while `max_pending` files await their debounce, or while the caller has not
+    consumed the files already found. Should the kernel queue overflow, files modified since the last read are found
+    by a rescan, so a file may occasionally be yielded twice.
+
+    Args:
+        root (str | Path): The target directory path.
+        check_suffix (Union[str, None], optional): Expected suffix for the files. Defaults to None.
+        recursive (bool, optional): Whether to watch subdirectories, including new ones. Defaults to False.
+        existing (bool, optional): Whether to first yield the files already present, which are assumed to be complete.
+            Defaults to True.
+        debounce (float, optional): Seconds without further events before a file is reported. Defaults to 0.05.
+        batch_size (int, optional): Maximum number of files checked at once. Defaults to 1024.
+        max_pending (int, optional): Maximum number of files awaiting their debounce. Defaults to 65536.
+        poll_interval (float, optional): Seconds between polls when polling. Defaults to 1.
+        use_inotify (Union[bool, None], optional): Whether to use inotify rather than polling. Defaults to None for
+            inotify on Linux only.
+        idle_timeout (Union[float, None], optional): Seconds without any file after which to stop. Defaults to None
+            for watching until the generator is closed.
+        return_exceptions (bool, optional): Whether to yield the exceptions of failing files, rather than raising
+            the first one. Defaults to False.
+
+    Yields:
+        Path | Exception: The verified file paths (or exceptions).
+
+    Raises:
+        Same exceptions as `prepare_input_dir` for the root, and as `prepare_input_file` for the files found
+        if `return_exceptions` is False.
+    """
+    for batch in _watch_batches(
+        root, check_suffix, recursive, existing, debounce, batch_size, max_pending, poll_interval, use_inotify,
+        idle_timeout, return_exceptions, threading.Event(),
+    ):
+        yield from batch
+
+
+async def awatch_inputs(
+    root: str | Path,
+    check_suffix: str | None = None,
+    *,
+    executor: Executor | None = None,
+    recursive: bool = False,
+    existing: bool = True,
+    debounce: float = 0.05,
+    batch_size: int = 1024,
+    max_pending: int = 65536,
+    poll_interval: float = 1.0,
+    use_inotify: bool | None = None,
+    idle_timeout: float | None = None,
+    return_exceptions: bool = False,
+) -> AsyncIterator[Path | Exception]:
+    """Async version of `watch_inputs`, waiting for files and checking them on an executor without blocking the loop.
+
+    The next batch of files is only read once the current one has been consumed.
+
+    Args:
+        executor (Union[Executor, None], optional): Executor to wait and check on. Defaults to None for the loop's
+            default executor. One of its threads is occupied while waiting.
+        Other arguments: Same as `watch_inputs`.
+
+    Yields:
+        Path | Exception: The verified file paths (or exceptions).
+    """
+    loop = asyncio.get_running_loop()
+    stop = threading.Event()
+    batches = _watch_batches(
+        root, check_suffix, recursive, existing, debounce, batch_size, max_pending, poll_interval, use_inotify,
+        idle_timeout, return_exceptions, stop,
+    )
+    # entered by one thread at a time, since the next batch is only requested once the current one is consumed
+    ctx = copy_context()
+
+    def next_batch() -> list[Path | Exception] | None:
+        return ctx.run(next, batches, None)
+
+    future = None
+    try:
+        while True:
+            future = loop.run_in_executor(executor, next_batch)
+            batch = await future
+            future = None
+            if batch is None:
+                return
+            for x in batch:
+                yield x
+    finally:
+        stop.set()
+        if future is not None:
+            # the generator cannot be closed while running; it notices the stop request within `_MAX_WAIT`
+            await asyncio.shield(asyncio.wait([future]))
+        batches.close()
@@ -0,0 +1,65 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+from pathlib_extensions import aio
+from pathlib_extensions.prepare import NotAFileError, SuffixError, prepare_input_file
+
+
+def test_prepare_input_dir():
+    d = Path.cwd()
+    assert asyncio.run(aio.prepare_input_dir(d)) is d
+    with pytest.raises(NotADirectoryError):
+        asyncio.run(aio.prepare_input_dir(__file__))
+
+
+def test_prepare_input_file():
+    assert asyncio.run(aio.prepare_input_file(__file__, check_suffix='.py')) == Path(__file__)
+    with pytest.raises(SuffixError):
+        asyncio.run(aio.prepare_input_file(__file__, check_suffix='.txt'))
+
+
+def test_prepare_output_dir(tmp_path):
+    d = tmp_path / 'a' / 'b'
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        assert asyncio.run(aio.prepare_output_dir(d, executor=executor)) == d
+    assert d.is_dir()
+
+
+def test_prepare_output_file(tmp_path):
+    p = tmp_path / 'a' / 'b.txt'
+
+    async def main():
+        limiter = asyncio.Semaphore(1)
+        return await asyncio.gather(*(aio.prepare_output_file(p, limiter=limiter) for _ in range(3)))
+
+    assert asyncio.run(main()) == [p] * 3
+    assert p.parent.is_dir()
+
+
+def test_prepare_as_completed(tmp_path):
+    paths = [tmp_path / f'{i}.txt' for i in range(10)]
+    for p in paths:
+        p.touch()
+
+    async def main():
+        return [x async for x in aio.prepare_as_completed(prepare_input_file, paths, max_concurrency=3, check_suffix='.txt')]
+
+    results = asyncio.run(main())
+    assert sorted(p for p, _ in results) == paths
+    assert all(p == result for p, result in results)
+
+
+def test_prepare_as_completed_exceptions(tmp_path):
+    async def main(**kwargs):
+        return [x async for x in aio.prepare_as_completed(prepare_input_file, [tmp_path], **kwargs)]
+
+    with pytest.raises(NotAFileError):
+        asyncio.run(main())
+    [(p, result)] = asyncio.run(main(return_exceptions=True))
+    assert p == tmp_path
+    assert isinstance(result, NotAFileError)
+    with pytest.raises(ValueError):
+        asyncio.run(main(max_concurrency=0))
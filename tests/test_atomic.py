@@ -0,0 +1,104 @@
+import os
+from pathlib import Path
+import sys
+
+import pytest
+
+from pathlib_extensions.atomic import atomic_write
+from pathlib_extensions.cache import StatCache, _stat
+from pathlib_extensions.overwrite import OverwriteMode
+from pathlib_extensions.prepare import NotAFileError, SuffixError
+
+
+def test_atomic_write(tmp_path):
+    p = tmp_path / 'a' / 'b.bin'
+    with atomic_write(p) as f:
+        f.write(b'hello ')
+        f.write(memoryview(b'world'))
+        assert not p.exists()
+    assert p.read_bytes() == b'hello world'
+    assert list(p.parent.iterdir()) == [p]
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='POSIX permissions')
+def test_atomic_write_keeps_mode(tmp_path):
+    p = tmp_path / 'secret.txt'
+    p.write_bytes(b'old')
+    p.chmod(0o600)
+    with atomic_write(p) as f:
+        f.write(b'new')
+    assert p.read_bytes() == b'new'
+    assert p.stat().st_mode & 0o777 == 0o600
+    q = tmp_path / 'new.txt'
+    umask = os.umask(0o022)
+    try:
+        with atomic_write(q) as f:
+            f.write(b'new')
+    finally:
+        os.umask(umask)
+    assert q.stat().st_mode & 0o777 == 0o644
+
+
+def test_atomic_write_text(tmp_path):
+    p = tmp_path / 'b.txt'
+    with atomic_write(str(p), 'w', encoding='utf-8', fsync_dir=True) as f:
+        f.write('héllo')
+    assert p.read_text(encoding='utf-8') == 'héllo'
+
+
+def test_atomic_write_unbuffered(tmp_path):
+    p = tmp_path / 'b'
+    data = bytearray(b'x' * (1 << 20))
+    with atomic_write(p, buffering=0, with_suffix='.bin') as f:
+        view = memoryview(data)
+        while view:
+            view = view[f.write(view):]
+    assert p.with_suffix('.bin').read_bytes() == data
+
+
+def test_atomic_write_failure(tmp_path):
+    p = tmp_path / 'b.bin'
+    p.write_bytes(b'old')
+    with pytest.raises(RuntimeError):
+        with atomic_write(p) as f:
+            f.write(b'new')
+            raise RuntimeError
+    assert p.read_bytes() == b'old'
+    assert list(tmp_path.iterdir()) == [p]
+
+
+def test_atomic_write_overwrite_mode(tmp_path):
+    p = tmp_path / 'b.bin'
+    p.write_bytes(b'old')
+    with pytest.raises(FileExistsError):
+        with atomic_write(p, overwrite_mode=OverwriteMode.NEVER):
+            pass
+    with pytest.raises(ValueError):
+        with atomic_write(p, overwrite_mode=OverwriteMode.RENAME):
+            pass
+    assert p.read_bytes() == b'old'
+    assert list(tmp_path.iterdir()) == [p]
+
+
+def test_atomic_write_overwrite_mode_cached(tmp_path):
+    p = tmp_path / 'b.bin'
+    with StatCache():
+        # cached as missing, then created by other means
+        assert _stat(p) is None
+        p.write_bytes(b'old')
+        with pytest.raises(FileExistsError):
+            with atomic_write(p, overwrite_mode=OverwriteMode.NEVER):
+                pass
+    assert p.read_bytes() == b'old'
+
+
+def test_atomic_write_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        with atomic_write(tmp_path / 'b.bin', 'ab'):
+            pass
+    with pytest.raises(NotAFileError):
+        with atomic_write(tmp_path):
+            pass
+    with pytest.raises(SuffixError):
+        with atomic_write(Path(tmp_path / 'b.bin'), check_suffix='.txt'):
+            pass
@@ -0,0 +1,163 @@
+import asyncio
+import os
+from pathlib import Path
+import threading
+
+import pytest
+
+from pathlib_extensions import aio
+from pathlib_extensions.cache import CacheInfo, StatCache, _active, _add_known_dir, _forget_dir, _is_known_dir, _stat, clear_known_dirs
+from pathlib_extensions.nullable import NullablePath
+from pathlib_extensions.prepare import prepare_input_file, prepare_input_files, prepare_output_dir
+
+
+def test_stat_cache_hit_miss():
+    cache = StatCache()
+    assert cache.stat(__file__) == os.stat(__file__)
+    assert cache.stat(__file__) == os.stat(__file__)
+    assert cache.access(__file__, os.R_OK)
+    assert cache.stat('path/that/does/not/exist') is None
+    assert cache.cache_info() == CacheInfo(hits=1, misses=3, maxsize=65536, currsize=3)
+    cache.clear()
+    assert cache.cache_info() == CacheInfo(hits=0, misses=0, maxsize=65536, currsize=0)
+
+
+def test_stat_cache_ttl(mocker):
+    mock_time = mocker.patch('pathlib_extensions.cache.time.monotonic', return_value=0.0)
+    cache = StatCache(ttl=10)
+    cache.stat(__file__)
+    mock_time.return_value = 9.0
+    cache.stat(__file__)
+    assert cache.cache_info().hits == 1
+    mock_time.return_value = 10.0
+    cache.stat(__file__)
+    assert cache.cache_info().misses == 2
+
+
+def test_stat_cache_lru():
+    cache = StatCache(maxsize=2)
+    cache.stat('a')
+    cache.stat('b')
+    cache.stat('a')
+    cache.stat('c')  # evicts b
+    assert cache.cache_info().currsize == 2
+    cache.stat('a')
+    cache.stat('b')
+    assert cache.cache_info().hits == 2
+
+
+def test_stat_cache_invalid_argument():
+    with pytest.raises(ValueError):
+        StatCache(ttl=0)
+    with pytest.raises(ValueError):
+        StatCache(maxsize=0)
+
+
+def test_stat_cache_context(tmp_path):
+    assert _stat(tmp_path) is not None
+    with StatCache() as cache:
+        with StatCache() as inner:
+            prepare_input_file(__file__)
+        assert inner.cache_info().misses == 2
+        prepare_input_file(__file__)
+        prepare_input_file(__file__)
+        assert cache.cache_info() == CacheInfo(hits=2, misses=2, maxsize=65536, currsize=2)
+    prepare_input_file(__file__)
+    assert cache.cache_info().hits == 2
+
+
+def test_stat_cache_per_thread():
+    caches = [StatCache(), StatCache()]
+    entered = threading.Barrier(2)
+    seen = []
+
+    def run(cache):
+        with cache:
+            # both caches are active at once, each in its own thread
+            entered.wait()
+            prepare_input_file(__file__)
+            entered.wait()
+        seen.append(_active.get())
+
+    threads = [threading.Thread(target=run, args=(c,)) for c in caches]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert [c.cache_info().misses for c in caches] == [2, 2]
+    assert seen == [None, None]
+    assert _active.get() is None
+
+
+def test_stat_cache_per_task():
+    async def run(cache, delay):
+        with cache:
+            await asyncio.sleep(delay)
+            prepare_input_file(__file__)
+            await aio.prepare_input_file(__file__)
+            await asyncio.sleep(delay)
+            assert _active.get() is cache
+
+    async def main():
+        caches = [StatCache(), StatCache()]
+        await asyncio.gather(run(caches[0], 0.01), run(caches[1], 0.02))
+        return caches
+
+    caches = asyncio.run(main())
+    assert [c.cache_info() for c in caches] == [CacheInfo(hits=2, misses=2, maxsize=65536, currsize=2)] * 2
+
+
+def test_stat_cache_worker_threads():
+    with StatCache() as cache:
+        prepare_input_files([__file__] * 4, max_workers=2)
+    assert cache.cache_info().hits + cache.cache_info().misses == 8
+
+
+def test_stat_cache_invalidated_on_mkdir(tmp_path):
+    d = tmp_path / 'a' / 'b'
+    with StatCache() as cache:
+        assert not NullablePath(d).exists()
+        assert not NullablePath(d.parent).exists()
+        prepare_output_dir(d)
+        assert NullablePath(d).is_dir()
+        assert NullablePath(d.parent).is_dir()
+        assert not NullablePath(d).is_file()
+        e = NullablePath(tmp_path / 'c')
+        assert not e.exists()
+        e.mkdir()
+        assert e.exists()
+    assert cache.cache_info().currsize > 0
+
+
+def test_stat_cache_shared_with_nullable_path():
+    with StatCache() as cache:
+        np = NullablePath(Path(__file__))
+        assert np.exists() and np.is_file() and not np.is_dir()
+        assert not NullablePath().exists()
+    assert cache.cache_info().hits == 2
+
+
+def test_known_dirs_concurrent_forget(tmp_path):
+    errors = []
+
+    def add():
+        for i in range(20000):
+            _add_known_dir(tmp_path / str(i))
+
+    def forget():
+        try:
+            for _ in range(200):
+                _forget_dir(tmp_path / 'x')
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=add), threading.Thread(target=forget)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert _is_known_dir(tmp_path / '0')
+    _forget_dir(tmp_path)
+    assert not _is_known_dir(tmp_path / '0')
+    clear_known_dirs()
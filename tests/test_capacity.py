@@ -0,0 +1,150 @@
+import errno
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+from pathlib_extensions.capacity import CapacityBudget, InsufficientSpaceError, capacity_budget, clear_capacity_budgets
+from pathlib_extensions.prepare import prepare_output_dir
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='statvfs')
+
+
+class FakeStatvfs:
+    def __init__(self, free_bytes, free_files, total_files=1 << 20):
+        self.f_frsize = 4096
+        self.f_bavail = free_bytes // 4096
+        self.f_favail = free_files
+        self.f_files = total_files
+
+
+@pytest.fixture
+def statvfs(monkeypatch):
+    calls = []
+    result = FakeStatvfs(4096 * 100, 10)
+
+    def fake(p):
+        calls.append(p)
+        return result
+
+    monkeypatch.setattr(os, 'statvfs', fake)
+    clear_capacity_budgets()
+    yield calls
+    clear_capacity_budgets()
+
+
+def test_capacity_budget_cached_per_device(tmp_path, statvfs):
+    (tmp_path / 'a').mkdir()
+    budget = capacity_budget(tmp_path / 'a')
+    assert capacity_budget(tmp_path / 'b' / 'c') is budget
+    assert capacity_budget(str(tmp_path)) is budget
+    assert len(statvfs) == 1
+    assert budget.device == os.stat(tmp_path).st_dev
+    assert (budget.free_bytes, budget.free_files) == (4096 * 100, 10)
+
+
+def test_reserve_release(tmp_path, statvfs):
+    budget = CapacityBudget(tmp_path)
+    budget.reserve(4096 * 60, 4)
+    assert (budget.available_bytes, budget.available_files) == (4096 * 40, 6)
+    with pytest.raises(InsufficientSpaceError) as excinfo:
+        budget.reserve(4096 * 41)
+    assert excinfo.value.errno == errno.ENOSPC
+    with pytest.raises(InsufficientSpaceError):
+        budget.reserve(nfiles=7)
+    budget.check(4096 * 40, 6)
+    with pytest.raises(InsufficientSpaceError):
+        budget.check(4096 * 41)
+    budget.release(4096 * 60, 4)
+    assert (budget.reserved_bytes, budget.reserved_files) == (0, 0)
+    with pytest.raises(ValueError):
+        budget.release(1)
+    with pytest.raises(ValueError):
+        budget.reserve(-1)
+
+
+def test_reserved_context_manager(tmp_path, statvfs):
+    budget = CapacityBudget(tmp_path)
+    with pytest.raises(RuntimeError):
+        with budget.reserved(4096, 1):
+            assert budget.reserved_bytes == 4096
+            raise RuntimeError
+    assert (budget.reserved_bytes, budget.reserved_files) == (0, 0)
+
+
+def test_reserve_blocking(tmp_path, statvfs):
+    budget = CapacityBudget(tmp_path)
+    budget.reserve(4096 * 80)
+
+    def release():
+        time.sleep(0.2)
+        budget.release(4096 * 80)
+
+    thread = threading.Thread(target=release)
+    thread.start()
+    start = time.monotonic()
+    budget.reserve(4096 * 50, block=True, timeout=5)
+    assert time.monotonic() - start >= 0.1
+    thread.join()
+    assert budget.reserved_bytes == 4096 * 50
+    with pytest.raises(InsufficientSpaceError):
+        budget.reserve(4096 * 60, block=True, timeout=0.1)
+    # never fits, so fails without waiting
+    start = time.monotonic()
+    with pytest.raises(InsufficientSpaceError):
+        budget.reserve(4096 * 101, block=True)
+    assert time.monotonic() - start < 1
+
+
+def test_refresh_and_no_inode_limit(tmp_path, monkeypatch, statvfs):
+    budget = CapacityBudget(tmp_path)
+    monkeypatch.setattr(os, 'statvfs', lambda p: FakeStatvfs(4096 * 200, 0, total_files=0))
+    budget.refresh()
+    assert (budget.free_bytes, budget.free_files, budget.available_files) == (4096 * 200, None, None)
+    budget.reserve(4096 * 150, 1 << 40)
+
+
+def test_prepare_output_dir_preflight(tmp_path, statvfs):
+    p = tmp_path / 'out'
+    with pytest.raises(InsufficientSpaceError):
+        prepare_output_dir(p, expected_bytes=4096 * 101)
+    assert not p.exists()
+    with pytest.raises(InsufficientSpaceError):
+        prepare_output_dir(p, expected_files=11)
+    assert prepare_output_dir(p, expected_bytes=4096 * 100, expected_files=10) == p
+    assert p.is_dir()
+    capacity_budget(p).reserve(4096 * 50)
+    with pytest.raises(InsufficientSpaceError):
+        prepare_output_dir(p, expected_bytes=4096 * 51)
+    # read once for all calls
+    assert len(statvfs) == 1
+
+
+def test_max_age(tmp_path, monkeypatch, mocker, statvfs):
+    mock_time = mocker.patch('pathlib_extensions.capacity.time.monotonic', return_value=0.0)
+    p = prepare_output_dir(tmp_path / 'out', expected_bytes=4096 * 100)
+    # the disk fills up, e.g. by writes of other processes
+    monkeypatch.setattr(os, 'statvfs', lambda p: FakeStatvfs(4096 * 10, 10))
+    mock_time.return_value = 59.0
+    prepare_output_dir(p, expected_bytes=4096 * 100)
+    mock_time.return_value = 60.0
+    with pytest.raises(InsufficientSpaceError):
+        prepare_output_dir(p, expected_bytes=4096 * 100)
+    assert capacity_budget(p).free_bytes == 4096 * 10
+    with pytest.raises(ValueError):
+        CapacityBudget(p, max_age=0)
+    budget = CapacityBudget(p, max_age=None)
+    mock_time.return_value = 1e9
+    monkeypatch.setattr(os, 'statvfs', lambda p: FakeStatvfs(0, 0))
+    budget.check(4096 * 10)
+
+
+def test_real_statvfs(tmp_path):
+    clear_capacity_budgets()
+    budget = capacity_budget(tmp_path)
+    assert budget.free_bytes > 0
+    with pytest.raises(InsufficientSpaceError):
+        prepare_output_dir(tmp_path / 'out', expected_bytes=budget.free_bytes + 1)
+    clear_capacity_budgets()
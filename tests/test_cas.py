@@ -0,0 +1,99 @@
+import errno
+import hashlib
+import os
+
+import pytest
+
+from pathlib_extensions.cas import ContentStore, LinkMode
+from pathlib_extensions.overwrite import OverwriteMode
+
+
+def test_link_mode():
+    assert LinkMode.values() == ('auto', 'hardlink', 'reflink', 'copy')
+
+
+def test_put_dedup(tmp_path):
+    with ContentStore(tmp_path / 'store') as store:
+        digest = store.put(b'content')
+        assert digest == hashlib.sha256(b'content').hexdigest()
+        assert store.put(bytearray(b'content')) == digest
+        assert store.blob_path(digest).read_bytes() == b'content'
+        src = tmp_path / 'src.bin'
+        src.write_bytes(b'content')
+        assert store.put_file(src) == digest
+        assert len(list((tmp_path / 'store' / 'objects').rglob('*.*'))) == 0
+        assert sum(1 for x in (tmp_path / 'store' / 'objects').rglob('*') if x.is_file()) == 1
+        assert list((tmp_path / 'store' / 'tmp').iterdir()) == []
+
+
+@pytest.mark.parametrize('link_mode', [LinkMode.AUTO, LinkMode.HARDLINK, LinkMode.COPY])
+def test_write_bytes(tmp_path, link_mode):
+    with ContentStore(tmp_path / 'store', link_mode) as store:
+        a = store.write_bytes(tmp_path / 'out' / 'a.json', b'{}')
+        b = store.write_bytes(tmp_path / 'out' / 'b.json', b'{}')
+        assert a.read_bytes() == b.read_bytes() == b'{}'
+        shared = os.stat(a).st_ino == os.stat(b).st_ino
+        if link_mode != LinkMode.AUTO:
+            # AUTO shares the inode only if reflinks are not supported by the filesystem
+            assert shared == (link_mode == LinkMode.HARDLINK)
+        assert len(store) == 2
+
+
+def test_reflink_unsupported(tmp_path, mocker):
+    mocker.patch('fcntl.ioctl', side_effect=OSError(errno.EOPNOTSUPP, 'not supported'))
+    with ContentStore(tmp_path / 'store', LinkMode.REFLINK) as store:
+        with pytest.raises(OSError):
+            store.write_bytes(tmp_path / 'a', b'x')
+        assert not (tmp_path / 'a').exists()
+    with ContentStore(tmp_path / 'store', LinkMode.AUTO) as store:
+        assert store.write_bytes(tmp_path / 'a', b'x').read_bytes() == b'x'
+
+
+def test_skip_unchanged(tmp_path, mocker):
+    with ContentStore(tmp_path / 'store') as store:
+        p = store.write_bytes(tmp_path / 'a', b'same')
+        replace = mocker.spy(os, 'replace')
+        assert store.write_bytes(p, b'same', overwrite_mode=OverwriteMode.NEVER) == p
+        assert replace.call_count == 0
+        # modified by other means, so no longer known to have the digest
+        p.unlink()
+        p.write_bytes(b'other')
+        with pytest.raises(FileExistsError):
+            store.write_bytes(p, b'same', overwrite_mode=OverwriteMode.NEVER)
+        store.write_bytes(p, b'same')
+        assert p.read_bytes() == b'same'
+        assert replace.call_count == 1
+
+
+def test_index_persists(tmp_path, mocker):
+    with ContentStore(tmp_path / 'store') as store:
+        p = store.write_bytes(tmp_path / 'a', b'same')
+    replace = mocker.spy(os, 'replace')
+    with ContentStore(tmp_path / 'store') as store:
+        store.write_bytes(p, b'same')
+    assert replace.call_count == 0
+
+
+def test_rename_mode(tmp_path):
+    (tmp_path / 'a.txt').write_bytes(b'old')
+    with ContentStore(tmp_path / 'store') as store:
+        p = store.write_bytes(tmp_path / 'a.txt', b'new', overwrite_mode=OverwriteMode.RENAME)
+    assert p == tmp_path / 'a (1).txt'
+    assert p.read_bytes() == b'new'
+    assert (tmp_path / 'a.txt').read_bytes() == b'old'
+
+
+def test_open(tmp_path):
+    with ContentStore(tmp_path / 'store') as store:
+        with store.open(tmp_path / 'out' / 'a', with_suffix='.bin') as f:
+            f.write(b'chunk1')
+            f.writelines([b'chunk2', memoryview(b'chunk3')])
+        assert (tmp_path / 'out' / 'a.bin').read_bytes() == b'chunk1chunk2chunk3'
+        with pytest.raises(RuntimeError):
+            with store.open(tmp_path / 'out' / 'b') as f:
+                f.write(b'partial')
+                raise RuntimeError
+        assert not (tmp_path / 'out' / 'b').exists()
+        assert list((tmp_path / 'store' / 'tmp').iterdir()) == []
+        with pytest.raises(KeyError):
+            store.place('0' * 64, tmp_path / 'c')
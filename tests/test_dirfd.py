@@ -0,0 +1,107 @@
+import os
+import sys
+
+import pytest
+
+from pathlib_extensions.dirfd import DirHandle
+from pathlib_extensions.instrument import profile
+from pathlib_extensions.prepare import NotAFileError, SuffixError
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason='dir_fd is not supported on Windows')
+
+
+def test_stat_access_mkdir(tmp_path):
+    (tmp_path / 'f.txt').write_text('x')
+    with DirHandle(tmp_path) as d:
+        st = d.stat('f.txt')
+        assert st is not None and st.st_size == 1
+        assert d.stat('missing') is None
+        assert d.stat('f.txt/missing') is None
+        assert d.access('f.txt', os.R_OK)
+        d.mkdir('a/b', parents=True)
+        d.mkdir('a/b', exist_ok=True)
+        with pytest.raises(FileExistsError):
+            d.mkdir('a/b')
+        with pytest.raises(FileExistsError):
+            d.mkdir('f.txt', exist_ok=True)
+        with pytest.raises(FileNotFoundError):
+            d.mkdir('x/y')
+    assert (tmp_path / 'a' / 'b').is_dir()
+    with pytest.raises(ValueError):
+        d.stat('f.txt')
+
+
+def test_stat_missing_like_cache(tmp_path):
+    (tmp_path / 'loop').symlink_to('loop')
+    with DirHandle(tmp_path) as d:
+        assert d.stat('loop') is None
+        assert d.stat('loop', follow_symlinks=False) is not None
+        assert d.stat('nul\0') is None
+
+
+@pytest.mark.parametrize('name', ['/etc/passwd', '../x', 'a/../../x', ''])
+def test_reject_escaping_names(tmp_path, name):
+    with DirHandle(tmp_path) as d:
+        with pytest.raises(ValueError):
+            d.stat(name)
+
+
+def test_survives_rename(tmp_path):
+    (tmp_path / 'src').mkdir()
+    (tmp_path / 'src' / 'f.txt').write_text('content')
+    with DirHandle(tmp_path / 'src') as d:
+        (tmp_path / 'src').rename(tmp_path / 'dst')
+        assert d.stat('f.txt') is not None
+        with d.open('f.txt') as f:
+            assert f.read() == 'content'
+        with d.open('g.bin', 'wb') as f:
+            f.write(b'new')
+    assert (tmp_path / 'dst' / 'g.bin').read_bytes() == b'new'
+
+
+def test_init(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        DirHandle(tmp_path / 'missing')
+    with DirHandle(tmp_path / 'created', create=True) as d:
+        assert d.path == tmp_path / 'created'
+    assert (tmp_path / 'created').is_dir()
+
+
+def test_prepare_input_file(tmp_path):
+    (tmp_path / 'f.txt').touch()
+    (tmp_path / 'sub').mkdir()
+    with DirHandle(tmp_path) as d:
+        assert d.prepare_input_file('f.txt', check_suffix='.txt') == tmp_path / 'f.txt'
+        assert d.prepare_input_file('f', with_suffix='.txt') == tmp_path / 'f.txt'
+        with pytest.raises(SuffixError):
+            d.prepare_input_file('f.txt', check_suffix='.csv')
+        with pytest.raises(FileNotFoundError):
+            d.prepare_input_file('missing.txt')
+        with pytest.raises(NotAFileError):
+            d.prepare_input_file('sub')
+        results = d.prepare_input_files(['f.txt', 'missing.txt', 'sub'], return_exceptions=True)
+        assert results[0] == tmp_path / 'f.txt'
+        assert isinstance(results[1], FileNotFoundError)
+        assert isinstance(results[2], NotAFileError)
+        with pytest.raises(FileNotFoundError):
+            d.prepare_input_files(['f.txt', 'missing.txt'])
+
+
+def test_prepare_output_file(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    with DirHandle(tmp_path) as d:
+        assert d.prepare_output_file('new/deep/f.txt') == tmp_path / 'new' / 'deep' / 'f.txt'
+        assert (tmp_path / 'new' / 'deep').is_dir()
+        assert d.prepare_output_file('other/f', with_suffix='.txt', create=False) == tmp_path / 'other' / 'f.txt'
+        assert not (tmp_path / 'other').exists()
+        results = d.prepare_output_files(['a/f.txt', 'sub'], return_exceptions=True)
+        assert results[0] == tmp_path / 'a' / 'f.txt'
+        assert isinstance(results[1], NotAFileError)
+
+
+def test_profile(tmp_path):
+    (tmp_path / 'f.txt').touch()
+    with DirHandle(tmp_path) as d, profile() as stats:
+        d.prepare_input_files(['f.txt'] * 3)
+    calls = stats.to_dict()['prepare_input_files']['fs_calls']
+    assert calls['stat']['count'] == calls['access']['count'] == 3
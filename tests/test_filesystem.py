@@ -2,7 +2,7 @@ from pathlib import Path
 
 import pytest
 
-from pathlib_extensions.filesystem import replace_os_reserved_chars, truncate_filename
+from pathlib_extensions.filesystem import ReservedCharsProfile, replace_os_reserved_chars, sanitize_many, sanitize_paths, truncate_filename, truncate_filenames
 
 
 def test_remove_os_reserved_chars():
@@ -17,6 +17,37 @@ def test_remove_os_reserved_chars():
     assert replace_os_reserved_chars('file"name') == "file_name"
 
 
+def test_reserved_chars_profile():
+    assert ReservedCharsProfile.values() == ('portable', 'posix', 'windows', 'macos')
+
+
+def test_replace_os_reserved_chars_profiles():
+    text = 'a/b\\c:d*e\0f'
+    assert replace_os_reserved_chars(text, profile=ReservedCharsProfile.POSIX) == 'a_b\\c:d*e_f'
+    assert replace_os_reserved_chars(text, profile=ReservedCharsProfile.MACOS) == 'a_b\\c_d*e_f'
+    assert replace_os_reserved_chars(text, profile=ReservedCharsProfile.WINDOWS) == 'a_b_c_d_e_f'
+    assert replace_os_reserved_chars(text, replacement='', profile=ReservedCharsProfile.PORTABLE) == 'abcde\0f'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('tab\tname', 'tab_name'),
+    ('CON', 'CON_'),
+    ('nul.txt', 'nul_.txt'),
+    ('Com1.tar.gz', 'Com1_.tar.gz'),
+    ('CONSOLE.txt', 'CONSOLE.txt'),
+    ('name. .', 'name___'),
+    ('name.txt', 'name.txt'),
+])
+def test_replace_os_reserved_chars_windows(text, expected):
+    assert replace_os_reserved_chars(text, profile=ReservedCharsProfile.WINDOWS) == expected
+
+
+def test_sanitize_many():
+    texts = ['a?b', 'c|d', 'AUX']
+    assert list(sanitize_many(iter(texts))) == ['a_b', 'c_d', 'AUX']
+    assert list(sanitize_many(texts, replacement='-', profile=ReservedCharsProfile.WINDOWS)) == ['a-b', 'c-d', 'AUX-']
+
+
 def test_truncate_filename_no_change():
     path = Path("short_filename.txt")
     result = truncate_filename(path)
@@ -46,3 +77,76 @@ def test_truncate_filename_with_unicode():
     assert result.suffixes == [".txt"]
     result_bytes_length = len(str(result).encode('utf-8'))
     assert 250 <= result_bytes_length <= 255, result_bytes_length
+
+
+def test_truncate_filename_without_suffix():
+    assert truncate_filename("a" * 300) == Path("a" * 255)
+
+
+def test_truncate_filename_callback():
+    calls = []
+    result = truncate_filename("a" * 300 + ".txt", on_truncate=lambda *args: calls.append(args))
+    assert calls == [(Path("a" * 300 + ".txt"), result)]
+    truncate_filename("short.txt", on_truncate=lambda *args: calls.append(args))
+    assert len(calls) == 1
+
+
+def test_truncate_filename_logging(caplog):
+    with caplog.at_level('INFO', logger='pathlib_extensions.filesystem'):
+        truncate_filename("a" * 300)
+    assert 'Truncated path' in caplog.text
+
+
+def test_truncate_filenames():
+    paths: list[str | Path] = ["short.txt", Path("é" * 200 + ".txt"), "🌟" * 100 + ".tar.gz"]
+    results = truncate_filenames(paths, on_truncate=lambda *args: None)
+    assert results[0] == Path("short.txt")
+    assert results[1] == Path("é" * 125 + ".txt")
+    assert results[2].suffixes == [".tar", ".gz"]
+    for result in results:
+        # no multibyte character is split, so the name round-trips through UTF-8
+        assert len(result.name.encode('utf-8')) <= 255
+        assert result.name.encode('utf-8').decode('utf-8') == result.name
+
+
+def test_sanitize_paths():
+    names = ['a?b', 'a:b', 'A*B', 'c', 'a?b', '..']
+    assert sanitize_paths(names, 'out', workers=1) == {
+        'a?b': Path('out/a_b'),
+        'a:b': Path('out/a_b (1)'),
+        'A*B': Path('out/A_B (2)'),
+        'c': Path('out/c'),
+        '..': Path('out/__'),
+    }
+    posix = sanitize_paths(['a/b', 'A/B'], 'out', profile=ReservedCharsProfile.POSIX, workers=1)
+    assert posix == {'a/b': Path('out/a_b'), 'A/B': Path('out/A_B')}
+    with pytest.raises(ValueError):
+        sanitize_paths([''], 'out', replacement='', workers=1)
+
+
+def test_sanitize_paths_only_dots():
+    assert sanitize_paths(['...', '....', 'ok'], 'out', workers=1) == {
+        '...': Path('out/___'),
+        '....': Path('out/____'),
+        'ok': Path('out/ok'),
+    }
+    with pytest.raises(ValueError):
+        sanitize_paths(['...'], 'out', replacement='.', workers=1)
+
+
+def test_sanitize_paths_truncation_collisions():
+    names = ['é' * 200 + 'x.txt', 'é' * 200 + 'y.txt', 'Mr. ' + 'a' * 300]
+    result = sanitize_paths(names, 'out', max_length=255, workers=1)
+    finals = [p.name for p in result.values()]
+    assert finals[0] == 'é' * 125 + '.txt'
+    assert finals[1] == 'é' * 123 + ' (1).txt'
+    assert len(finals[2].encode()) == 255
+    assert all(len(x.encode()) <= 255 for x in finals)
+
+
+def test_sanitize_paths_process_pool():
+    names = [f'title {i % 50}?' for i in range(200)] + [f'Title {i}:' for i in range(50)]
+    expected = sanitize_paths(names, 'out', workers=1)
+    result = sanitize_paths(names, 'out', workers=2, chunksize=16)
+    assert list(result.items()) == list(expected.items())
+    assert len(set(result.values())) == len(result) == 100
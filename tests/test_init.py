@@ -0,0 +1,46 @@
+import importlib
+import subprocess
+import sys
+
+import pytest
+
+import pathlib_extensions
+from pathlib_extensions import _SUBMODULE_EXPORTS
+
+
+@pytest.mark.parametrize('module', list(_SUBMODULE_EXPORTS))
+def test_submodule_exports_match_all(module):
+    assert _SUBMODULE_EXPORTS[module] == tuple(importlib.import_module(f'pathlib_extensions.{module}').__all__)
+
+
+def test_lazy_attributes():
+    for module, names in _SUBMODULE_EXPORTS.items():
+        for name in names:
+            assert getattr(pathlib_extensions, name) is getattr(importlib.import_module(f'pathlib_extensions.{module}'), name)
+    assert set(pathlib_extensions.__all__) <= set(dir(pathlib_extensions))
+    with pytest.raises(AttributeError):
+        pathlib_extensions.no_such_name
+
+
+def test_import_does_not_load_submodules():
+    code = (
+        'import sys, pathlib_extensions\n'
+        'assert [m for m in sys.modules if m.startswith("pathlib_extensions.")] == [], sys.modules\n'
+        'from pathlib_extensions import NullablePath\n'
+        'assert "pathlib_extensions.nullable" in sys.modules and "pathlib_extensions.overwrite" not in sys.modules\n'
+        'from pathlib_extensions import *\n'
+        'assert prepare_input_dir is sys.modules["pathlib_extensions.prepare"].prepare_input_dir\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+
+
+def test_submodule_attributes():
+    code = (
+        'import sys, pathlib_extensions\n'
+        'assert pathlib_extensions.prepare is sys.modules["pathlib_extensions.prepare"]\n'
+        'assert pathlib_extensions.prepare.prepare_input_dir is pathlib_extensions.prepare_input_dir\n'
+        'assert "walk" in dir(pathlib_extensions)\n'
+    )
+    subprocess.run([sys.executable, '-c', code], check=True)
+    for module in _SUBMODULE_EXPORTS:
+        assert getattr(pathlib_extensions, module) is importlib.import_module(f'pathlib_extensions.{module}')
@@ -0,0 +1,64 @@
+from pathlib import Path
+
+import pathlib_extensions
+from pathlib_extensions.instrument import _timed, instrumented
+from pathlib_extensions.overwrite import OverwriteMode, overwrite_existing_path
+from pathlib_extensions.prepare import prepare_input_files, prepare_output_dir, prepare_output_file
+
+
+def test_profile(tmp_path):
+    d = tmp_path / 'a' / 'b'
+    with pathlib_extensions.profile() as stats:
+        prepare_output_dir(d)
+        prepare_output_dir(d)
+        prepare_output_file(d / 'c.txt')
+    result = stats.to_dict()
+    assert result['prepare_output_dir']['count'] == 2
+    assert result['prepare_output_dir']['seconds'] > 0
+    # the second call finds the directory in the known directories
+    assert result['prepare_output_dir']['fs_calls']['stat']['count'] == 1
+    assert result['prepare_output_dir']['fs_calls']['mkdir']['count'] == 1
+    assert result['prepare_output_dir']['fs_calls']['access']['count'] == 2
+    # the known parent is only checked to still exist
+    assert set(result['prepare_output_file']['fs_calls']) == {'stat', 'access'}
+    # not collected outside of the block
+    prepare_output_dir(d)
+    assert stats.to_dict()['prepare_output_dir']['count'] == 2
+
+
+def test_profile_worker_threads():
+    with pathlib_extensions.profile() as stats:
+        prepare_input_files([__file__] * 10, max_workers=4)
+    assert stats.to_dict()['prepare_input_files']['fs_calls']['stat']['count'] == 10
+
+
+def test_profile_nested_functions(mocker):
+    mocker.patch('pathlib_extensions.overwrite.user_confirms_overwrite', return_value=True)
+
+    @instrumented
+    def outer():
+        _timed('other', lambda: None)
+        return overwrite_existing_path(Path(__file__), OverwriteMode.PROMPT)
+
+    with pathlib_extensions.profile() as stats:
+        assert outer()
+        _timed('stray', lambda: None)
+    result = stats.to_dict()
+    assert set(result['outer']['fs_calls']) == {'other'}
+    assert set(result['overwrite_existing_path']['fs_calls']) == {'exists'}
+    assert result['<unknown>'] == {'count': 0, 'seconds': 0.0, 'fs_calls': {'stray': result['<unknown>']['fs_calls']['stray']}}
+
+
+def test_profile_prometheus():
+    with pathlib_extensions.profile() as stats:
+        prepare_output_dir(Path.cwd())
+    text = stats.to_prometheus()
+    assert '# TYPE pathlib_extensions_calls_total counter' in text
+    assert 'pathlib_extensions_calls_total{function="prepare_output_dir"} 1\n' in text
+    assert 'pathlib_extensions_fs_calls_total{function="prepare_output_dir",op="stat"} 1\n' in text
+    assert 'pathlib_extensions_fs_call_seconds_total{function="prepare_output_dir",op="access"} ' in text
+
+
+def test_instrumented_preserves_metadata():
+    assert prepare_output_dir.__name__ == 'prepare_output_dir'
+    assert (prepare_output_dir.__doc__ or '').startswith('Prepare the target directory path for writing.')
@@ -0,0 +1,96 @@
+import os
+
+import pytest
+
+from pathlib_extensions.manifest import InputManifest, ManifestEntry, prepare_changed_inputs
+from pathlib_extensions.prepare import NotAFileError
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    with InputManifest(tmp_path / 'manifest.sqlite') as m:
+        yield m
+
+
+def test_input_manifest(manifest):
+    entries = [ManifestEntry('a', 1, 2, 3, None), ManifestEntry('b', 4, 5, 6, 'PermissionError')]
+    manifest.record(entries)
+    assert len(manifest) == 2
+    assert manifest.lookup(['a', 'b', 'c']) == {'a': entries[0], 'b': entries[1]}
+    manifest.record([ManifestEntry('a', 7, 8, 9, None)])
+    assert manifest.lookup(['a']) == {'a': ManifestEntry('a', 7, 8, 9, None)}
+
+
+def test_input_manifest_persistent(tmp_path):
+    with InputManifest(tmp_path / 'manifest.sqlite') as m:
+        m.record([ManifestEntry('a', 1, 2, 3, None)])
+    with InputManifest(tmp_path / 'manifest.sqlite') as m:
+        assert len(m) == 1
+
+
+def test_prepare_changed_inputs(tmp_path, manifest):
+    root = tmp_path / 'root'
+    (root / 'sub').mkdir(parents=True)
+    files = [root / f'{i}.txt' for i in range(3)] + [root / 'sub' / f'{i}.txt' for i in range(700)]
+    for p in files:
+        p.write_text('x')
+    (root / 'other.csv').touch()
+    assert sorted(prepare_changed_inputs(root, manifest, check_suffix='.txt'), key=str) == sorted(files, key=str)
+    assert len(manifest) == len(files)
+    assert prepare_changed_inputs(root, manifest, check_suffix='.txt') == []
+    files[0].write_text('modified')
+    new = root / 'sub' / 'new.txt'
+    new.touch()
+    assert sorted(prepare_changed_inputs(str(root), manifest, check_suffix='.txt'), key=str) == sorted([files[0], new], key=str)
+
+
+def test_prepare_changed_inputs_errors(tmp_path, manifest):
+    tmp_path = tmp_path / 'root'
+    tmp_path.mkdir()
+    os.mkfifo(tmp_path / 'fifo')
+    (tmp_path / 'broken').symlink_to(tmp_path / 'missing')
+    with pytest.raises(OSError):
+        prepare_changed_inputs(tmp_path, manifest)
+    results = prepare_changed_inputs(tmp_path, manifest, return_exceptions=True)
+    assert sorted(type(e).__name__ for e in results) == ['FileNotFoundError', 'NotAFileError']
+    # failures are recorded, but checked again on every call
+    assert [e.error for e in manifest.lookup([os.fspath(tmp_path / 'fifo')]).values()] == ['NotAFileError']
+    results = prepare_changed_inputs(tmp_path, manifest, return_exceptions=True)
+    assert any(isinstance(e, NotAFileError) for e in results)
+    with pytest.raises(NotADirectoryError):
+        prepare_changed_inputs(tmp_path / 'fifo', manifest)
+
+
+def test_prepare_changed_inputs_prunes_deleted(tmp_path, manifest):
+    root = tmp_path / 'root'
+    (root / 'd').mkdir(parents=True)
+    files = [root / 'd' / f'{i}.txt' for i in range(5)]
+    for p in files:
+        p.touch()
+    (root / 'link').symlink_to(root / 'd')
+    # recorded for another root, which shares a prefix with this one
+    manifest.record([ManifestEntry(os.fspath(tmp_path / 'root2' / 'a.txt'), 0, 0, 0, None)])
+    assert len(prepare_changed_inputs(root, manifest)) == 5
+    assert len(manifest) == 6
+    files[0].unlink()
+    (root / 'd' / 'other.csv').touch()
+    assert prepare_changed_inputs(root, manifest, check_suffix='.txt') == []
+    assert len(manifest) == 5
+    assert os.fspath(files[0]) not in manifest.lookup(os.fspath(p) for p in files)
+    assert manifest.prune(root, set()) == 4
+    assert len(manifest) == 1
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason='root ignores permissions')
+def test_prepare_changed_inputs_keeps_unscanned(tmp_path, manifest):
+    root = tmp_path / 'root'
+    (root / 'd').mkdir(parents=True)
+    (root / 'd' / 'a.txt').touch()
+    prepare_changed_inputs(root, manifest)
+    (root / 'd').chmod(0)
+    try:
+        results = prepare_changed_inputs(root, manifest, return_exceptions=True)
+    finally:
+        (root / 'd').chmod(0o755)
+    assert [type(e) for e in results] == [PermissionError]
+    assert len(manifest) == 1
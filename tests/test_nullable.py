@@ -1,5 +1,7 @@
-from os import fspath
+import copy
+from os import PathLike, fspath
 from pathlib import Path
+import pickle
 from unittest import mock
 
 import pytest
@@ -81,7 +83,89 @@ def test_repr():
 def test_mkdir():
     np = NullablePath()
     np.mkdir()
-    np.p = mock.MagicMock()
-    np.p.mkdir = mock_mkdir = mock.MagicMock()
-    np.mkdir('a', b='b')
+    with mock.patch.object(Path, 'mkdir') as mock_mkdir:
+        NullablePath('a').mkdir('a', b='b')
     mock_mkdir.assert_called_once_with('a', b='b')
+
+
+def test_slots():
+    np = NullablePath('a/b')
+    assert not hasattr(np, '__dict__')
+    assert isinstance(np, PathLike)
+    with pytest.raises(AttributeError):
+        np.p = Path('c')  # type: ignore
+
+
+def test_null_singleton():
+    assert NullablePath() is NullablePath(None) is NullablePath('') is NullablePath('a') / None
+    assert NullablePath().parent is NullablePath()
+
+    class SubPath(NullablePath):
+        __slots__ = ()
+
+    assert SubPath() is SubPath()
+    assert SubPath() is not NullablePath()
+    assert type(SubPath('a') / None) is SubPath
+
+
+def test_cached_derived_properties():
+    np = NullablePath('a/b/c.tar.gz')
+    assert np.parents is np.parents
+    assert np.parents == (NullablePath('a/b'), NullablePath('a'), NullablePath('.'))
+    np.suffixes.append('.x')
+    assert np.suffixes == ['.tar', '.gz']
+
+
+@pytest.mark.parametrize('np', [NullablePath(), NullablePath('a/b')])
+def test_pickle_copy(np):
+    assert pickle.loads(pickle.dumps(np)) == np
+    assert copy.copy(np) == np
+    assert pickle.loads(pickle.dumps(NullablePath())) is NullablePath()
+
+
+def test_null_path_io():
+    np = NullablePath()
+    assert np.stat() is None
+    assert np.read_bytes() == b''
+    assert np.read_text() == ''
+    assert list(np.iter_bytes()) == []
+    with np.open() as f:
+        assert f.read() == ''
+    with np.open('wb') as f:
+        f.write(b'discarded')
+    for k in ['iterdir', 'glob', 'rglob']:
+        assert list(getattr(np, k)(*(['*'] if k != 'iterdir' else []))) == []
+    np.unlink()
+    assert np.rename('a') is np
+    assert np.resolve() is np
+
+
+def test_valid_path_io(tmp_path):
+    p = tmp_path / 'a.txt'
+    p.write_text('hello')
+    np = NullablePath(p)
+    assert np.stat() == p.stat()
+    assert np.read_bytes() == b'hello'
+    assert np.read_text() == 'hello'
+    assert list(np.iter_bytes(chunk_size=2)) == [b'he', b'll', b'o']
+    with np.open() as f:
+        assert f.read() == 'hello'
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'b.txt').touch()
+    root = NullablePath(tmp_path)
+    assert sorted(root.iterdir(), key=fspath) == [NullablePath(p), NullablePath(tmp_path / 'sub')]
+    assert list(root.glob('*.txt')) == [np]
+    assert sorted(root.rglob('*.txt'), key=fspath) == [np, NullablePath(tmp_path / 'sub' / 'b.txt')]
+    assert NullablePath('.').resolve() == Path('.').resolve()
+    renamed = np.rename(tmp_path / 'c.txt')
+    assert renamed == tmp_path / 'c.txt'
+    assert not np.exists() and renamed.exists()
+    for target in (None, '', NullablePath()):
+        with pytest.raises(ValueError):
+            renamed.rename(target)
+    assert renamed.exists()
+    renamed.unlink()
+    assert not renamed.exists()
+    renamed.unlink(missing_ok=True)
+    with pytest.raises(FileNotFoundError):
+        renamed.unlink()
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+import pytest
+
+from pathlib_extensions.nullable import NullablePath
+from pathlib_extensions.nullable_array import NullablePathArray
+
+CASES = ['a', 'a/b.txt', '/', '.', '', None, 'a//b/', './x', '/abs/y.tar.gz', 'a..b', '.bashrc', 'x/..', 'a.', 'dir/', NullablePath(), Path('p/q.py')]
+REFERENCE = [NullablePath(x) for x in CASES]
+
+
+def test_roundtrip():
+    array = NullablePathArray(CASES)
+    assert len(array) == len(CASES)
+    assert array.to_list() == REFERENCE
+    assert array.to_list()[5] is NullablePath()
+    assert array.null_mask() == [not x for x in REFERENCE]
+    assert array.to_strings()[6] == 'a/b'
+    assert NullablePathArray(array.to_list()) == array
+    assert NullablePathArray.nulls(3).to_list() == [NullablePath()] * 3
+
+
+def test_getitem():
+    array = NullablePathArray(CASES)
+    assert array[1] == NullablePath('a/b.txt')
+    assert array[-1] == NullablePath('p/q.py')
+    assert array[4] is NullablePath()
+    assert array[1:3].to_list() == REFERENCE[1:3]
+    with pytest.raises(IndexError):
+        array[len(CASES)]
+
+
+@pytest.mark.parametrize('component', ['c', 'c/d', '/e', '.', 'f//', '', None, NullablePath(), Path('g')])
+def test_truediv_scalar(component):
+    assert (NullablePathArray(CASES) / component).to_list() == [x / component for x in REFERENCE]
+
+
+def test_truediv_elementwise():
+    components = ['c', None, '/d', '', 'e', '.', 'f', 'g', 'h', 'i', 'j', 'k', 'l', 'm', 'n', 'o']
+    expected = [x / y for x, y in zip(REFERENCE, components)]
+    assert (NullablePathArray(CASES) / components).to_list() == expected
+    assert (NullablePathArray(CASES) / NullablePathArray(components)).to_list() == expected
+    with pytest.raises(ValueError):
+        NullablePathArray(CASES) / ['a']
+
+
+def test_name_stem_suffix():
+    array = NullablePathArray(CASES)
+    assert array.names == [x.name for x in REFERENCE]
+    assert array.stems == [x.stem for x in REFERENCE]
+    assert array.suffixes == [x.suffix for x in REFERENCE]
+
+
+def test_with_suffix():
+    named = [x for x in CASES if NullablePath(x).name or not x]
+    array = NullablePathArray(named)
+    for suffix in ['.z', '']:
+        assert array.with_suffix(suffix).to_list() == [NullablePath(x).with_suffix(suffix) for x in named]
+    with pytest.raises(ValueError):
+        array.with_suffix('z')
+    with pytest.raises(ValueError):
+        NullablePathArray(['/']).with_suffix('.z')
+
+
+@pytest.mark.parametrize('max_workers', [1, None])
+def test_exists_is_file_is_dir(tmp_path, max_workers):
+    (tmp_path / 'f').touch()
+    array = NullablePathArray([tmp_path / 'f', tmp_path, None, tmp_path / 'missing'])
+    assert array.exists(max_workers) == [True, True, False, False]
+    assert array.is_file(max_workers) == [True, False, False, False]
+    assert array.is_dir(max_workers) == [False, True, False, False]
@@ -1,8 +1,14 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
 from pathlib import Path
 
 import pytest
 
-from pathlib_extensions.overwrite import OverwriteMode, overwrite_existing_path, user_confirms_overwrite
+from pathlib_extensions.cache import clear_known_dirs
+from pathlib_extensions.overwrite import (
+    OverwriteMode, RenameIndex, overwrite_existing_path, overwrite_existing_paths, overwrite_if_hash_differs, overwrite_if_older,
+    overwrite_if_size_differs, rename_existing_path, user_confirms_overwrite, user_confirms_overwrite_all,
+)
 
 
 def test_overwrite_mode():
@@ -23,6 +29,12 @@ def test_user_confirms_overwrite_negative(mocker, user_input):
     mock_input.assert_called_once()
 
 
+@pytest.mark.parametrize('user_input, expected', [('y', 'y'), ('A', 'a'), ('s', 's'), ('', 'n'), ('x', 'n')])
+def test_user_confirms_overwrite_all(mocker, user_input, expected):
+    mocker.patch('builtins.input', return_value=user_input)
+    assert user_confirms_overwrite_all(Path("/dummy/file.path")) == expected
+
+
 def test_overwrite_existing_path_path_does_not_exist(mocker):
     mocker.patch.object(Path, 'exists', return_value=False)
     with pytest.raises(FileNotFoundError):
@@ -54,3 +66,107 @@ def test_overwrite_existing_path_prompt_negative(mocker):
 def test_overwrite_existing_path_rename(mocker):
     mocker.patch.object(Path, 'exists', return_value=True)
     assert not overwrite_existing_path(Path("/dummy/file.path"), OverwriteMode.RENAME)
+
+
+def test_rename_existing_path(tmp_path):
+    p = tmp_path / 'file.txt'
+    p.touch()
+    (tmp_path / 'file (1).txt').touch()
+    assert rename_existing_path(p) == tmp_path / 'file (2).txt'
+    assert (tmp_path / 'file (2).txt').is_file()
+    assert rename_existing_path(p) == tmp_path / 'file (3).txt'
+    assert rename_existing_path(tmp_path / 'file (1).txt') == tmp_path / 'file (4).txt'
+
+
+def test_rename_existing_path_cleared(tmp_path):
+    p = tmp_path / 'file.txt'
+    p.touch()
+    assert rename_existing_path(p) == tmp_path / 'file (1).txt'
+    (tmp_path / 'file (1).txt').unlink()
+    # the freed number is not noticed by the shared index until it is cleared
+    assert rename_existing_path(p) == tmp_path / 'file (2).txt'
+    (tmp_path / 'file (2).txt').unlink()
+    clear_known_dirs()
+    assert rename_existing_path(p) == tmp_path / 'file (1).txt'
+
+
+def test_rename_existing_path_directory(tmp_path):
+    d = tmp_path / 'dir'
+    d.mkdir()
+    assert rename_existing_path(d) == tmp_path / 'dir (1)'
+    assert (tmp_path / 'dir (1)').is_dir()
+
+
+def test_rename_existing_path_not_found(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        rename_existing_path(tmp_path / 'missing.txt')
+
+
+def test_rename_index_created_after_listing(tmp_path):
+    index = RenameIndex(tmp_path)
+    # created by another writer after the directory was listed
+    (tmp_path / 'a (1).txt').touch()
+    assert index.claim('a.txt') == tmp_path / 'a (2).txt'
+
+
+def test_rename_index_concurrent(tmp_path):
+    (tmp_path / 'a.txt').touch()
+    indices = [RenameIndex(tmp_path) for _ in range(4)]
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        claimed = list(executor.map(lambda i: indices[i % 4].claim('a.txt'), range(100)))
+    assert len(set(claimed)) == 100
+    assert set(claimed) == {tmp_path / f'a ({n}).txt' for n in range(1, 101)}
+
+
+@pytest.fixture
+def targets(tmp_path):
+    paths = [tmp_path / f'{i}.txt' for i in range(3)]
+    for p in paths:
+        p.write_text('old')
+    return paths + [tmp_path / 'missing.txt']
+
+
+@pytest.mark.parametrize('mode, expected', [
+    (OverwriteMode.ALWAYS, [True, True, True, True]),
+    (OverwriteMode.NEVER, [False, False, False, True]),
+    (OverwriteMode.RENAME, [False, False, False, True]),
+])
+def test_overwrite_existing_paths(targets, mode, expected):
+    assert overwrite_existing_paths(targets, mode) == dict(zip(targets, expected))
+
+
+@pytest.mark.parametrize('answers, expected', [
+    (['y', 'n', 'y'], [True, False, True]),
+    (['n', 'a'], [False, True, True]),
+    (['s'], [False, False, False]),
+])
+def test_overwrite_existing_paths_prompt(mocker, targets, answers, expected):
+    mock_input = mocker.patch('builtins.input', side_effect=answers)
+    assert overwrite_existing_paths(targets, OverwriteMode.PROMPT) == dict(zip(targets, expected + [True]))
+    assert mock_input.call_count == len(answers)
+
+
+def test_overwrite_existing_paths_policies(tmp_path, targets):
+    source = tmp_path / 'source.txt'
+    source.write_text('new')
+    os.utime(source, ns=(10**18, 10**18))
+    os.utime(targets[0], ns=(0, 0))
+    for p in targets[1:3]:
+        os.utime(p, ns=(2 * 10**18, 2 * 10**18))
+    mapping = {p: source for p in targets}
+    assert overwrite_existing_paths(mapping, OverwriteMode.ALWAYS, policy=overwrite_if_older) == dict(zip(targets, [True, False, False, True]))
+    targets[1].write_text('longer')
+    assert overwrite_existing_paths(mapping, OverwriteMode.ALWAYS, policy=overwrite_if_size_differs) == dict(zip(targets, [False, True, False, True]))
+    targets[2].write_text('new')
+    assert overwrite_existing_paths(mapping, OverwriteMode.ALWAYS, policy=overwrite_if_hash_differs) == dict(zip(targets, [True, True, False, True]))
+    # without a source, policies fall back to overwriting
+    assert overwrite_existing_paths(targets, OverwriteMode.ALWAYS, policy=overwrite_if_hash_differs) == dict.fromkeys(targets, True)
+
+
+def test_overwrite_existing_paths_prompt_after_policy(mocker, tmp_path, targets):
+    source = tmp_path / 'source.txt'
+    source.write_text('old')
+    mock_input = mocker.patch('builtins.input')
+    decisions = overwrite_existing_paths({p: source for p in targets}, OverwriteMode.PROMPT, policy=overwrite_if_hash_differs)
+    assert decisions == dict(zip(targets, [False, False, False, True]))
+    mock_input.assert_not_called()
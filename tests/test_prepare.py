@@ -1,8 +1,16 @@
+import mmap
+import os
 from pathlib import Path
+import shutil
+import sys
+import threading
 
 import pytest
 
-from pathlib_extensions.prepare import NotAFileError, SuffixError, prepare_input_dir, prepare_input_file, prepare_output_dir, prepare_output_file
+from pathlib_extensions.prepare import (
+    NotAFileError, SuffixError, ensure_dirs, prepare_input_dir, prepare_input_file, prepare_input_files, prepare_output_dir, prepare_output_file,
+    open_input, prepare_output_files,
+)
 
 
 def test_prepare_input_dir_valid():
@@ -90,3 +98,175 @@ def test_prepare_output_file_invalid_argument(tmp_path):
     p.touch()
     with pytest.raises(ValueError):
         prepare_output_file(p, check_suffix='.txt', with_suffix='.txt')
+
+
+def test_prepare_input_files_valid(tmp_path):
+    paths = [tmp_path / f'{i}.txt' for i in range(20)]
+    for p in paths:
+        p.touch()
+    assert prepare_input_files(paths, check_suffix='.txt', max_workers=4) == paths
+    assert prepare_input_files([str(p.with_suffix('')) for p in paths], with_suffix='.txt') == paths
+
+
+def test_prepare_input_files_raise_first(tmp_path):
+    p = tmp_path / 'a.txt'
+    p.touch()
+    with pytest.raises(NotAFileError):
+        prepare_input_files([p, tmp_path, tmp_path / 'missing.txt'])
+
+
+def test_prepare_input_files_return_exceptions(tmp_path):
+    p = tmp_path / 'a.txt'
+    p.touch()
+    results = prepare_input_files([p, tmp_path, tmp_path / 'missing.txt', tmp_path / 'a.py'], check_suffix='.txt', return_exceptions=True)
+    assert results[0] == p
+    assert [type(x) for x in results[1:]] == [SuffixError, FileNotFoundError, SuffixError]
+
+
+def test_prepare_input_files_invalid_argument():
+    with pytest.raises(ValueError):
+        prepare_input_files([__file__], check_suffix='.txt', with_suffix='.txt')
+
+
+def test_prepare_output_files_create(tmp_path):
+    existing = tmp_path / 'existing.txt'
+    existing.touch()
+    paths = [tmp_path / 'a' / 'b' / '1.txt', tmp_path / 'a' / '2.txt', tmp_path / 'a' / 'b' / '3.txt', existing]
+    assert prepare_output_files(paths) == paths
+    assert (tmp_path / 'a' / 'b').is_dir()
+
+
+def test_prepare_output_files_no_create(tmp_path):
+    p = tmp_path / 'a' / '1.txt'
+    assert prepare_output_files([p], create=False) == [p]
+    assert not p.parent.exists()
+
+
+def test_prepare_output_files_return_exceptions(tmp_path):
+    blocker = tmp_path / 'blocker'
+    blocker.touch()
+    results = prepare_output_files([tmp_path, blocker / 'x.txt', tmp_path / 'ok.txt'], return_exceptions=True)
+    assert isinstance(results[0], NotAFileError)
+    assert isinstance(results[1], OSError)
+    assert results[2] == tmp_path / 'ok.txt'
+
+
+def test_prepare_output_dir_known(tmp_path, mocker):
+    d = tmp_path / 'a' / 'b'
+    prepare_output_dir(d)
+    mock_mkdir = mocker.patch.object(Path, 'mkdir')
+    mock_stat = mocker.patch('pathlib_extensions.prepare._stat', return_value=None)
+    assert prepare_output_dir(d) == d
+    assert prepare_output_dir(d.parent) == d.parent
+    assert prepare_output_file(d / 'c.txt') == d / 'c.txt'
+    mock_mkdir.assert_not_called()
+    assert mock_stat.call_count == 1  # for the file only
+
+
+def test_prepare_output_dir_known_relative(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    prepare_output_dir('a')
+    (tmp_path / 'b').mkdir()
+    monkeypatch.chdir(tmp_path / 'b')
+    # 'a' relative to the new working directory is a different directory
+    prepare_output_dir('a')
+    assert (tmp_path / 'b' / 'a').is_dir()
+
+
+def test_prepare_output_dir_known_removed(tmp_path):
+    d = tmp_path / 'a'
+    prepare_output_dir(d / 'b')
+    shutil.rmtree(d)
+    # known dirs are a hint only, so removed ones are created again
+    assert prepare_output_dir(d / 'b') == d / 'b'
+    assert (d / 'b').is_dir()
+    shutil.rmtree(d)
+    assert prepare_output_file(d / 'b' / 'c.txt') == d / 'b' / 'c.txt'
+    assert (d / 'b').is_dir()
+    shutil.rmtree(d)
+    assert ensure_dirs([d / 'b']) == [d / 'b']
+    assert (d / 'b').is_dir()
+
+
+def test_prepare_output_dir_known_dotdot(tmp_path, monkeypatch):
+    (tmp_path / 'deep' / 'x').mkdir(parents=True)
+    (tmp_path / 'link').symlink_to(tmp_path / 'deep' / 'x')
+    monkeypatch.chdir(tmp_path)
+    # 'link/../y' is deep/y for the kernel, rather than y
+    prepare_output_dir('link/../y')
+    assert (tmp_path / 'deep' / 'y').is_dir()
+    prepare_output_dir('y')
+    assert (tmp_path / 'y').is_dir()
+    prepare_output_dir(tmp_path / 'link' / '..' / 'z')
+    prepare_output_dir(tmp_path / 'z')
+    assert (tmp_path / 'deep' / 'z').is_dir()
+    assert (tmp_path / 'z').is_dir()
+
+
+def test_ensure_dirs(tmp_path, mocker):
+    spy = mocker.spy(Path, 'mkdir')
+    dirs = ensure_dirs([tmp_path / 'a' / 'b', str(tmp_path / 'a'), tmp_path / 'a' / 'b', tmp_path / 'c' / 'd'])
+    assert dirs == [tmp_path / 'a', tmp_path / 'a' / 'b', tmp_path / 'c' / 'd']
+    assert all(d.is_dir() for d in dirs)
+    # a and a/b once each; c/d fails, creates its parent c, then succeeds
+    assert spy.call_count == 5
+    assert ensure_dirs(dirs) == dirs
+    assert spy.call_count == 5
+
+
+def test_ensure_dirs_not_a_directory(tmp_path):
+    (tmp_path / 'f').touch()
+    with pytest.raises(FileExistsError):
+        ensure_dirs([tmp_path / 'f'])
+
+
+def test_open_input_mmap(tmp_path):
+    p = tmp_path / 'data.bin'
+    p.write_bytes(b'0123456789')
+    with open_input(p, check_suffix='.bin') as m:
+        assert isinstance(m, mmap.mmap)
+        assert m[2:5] == b'234'
+        assert bytes(memoryview(m)[-2:]) == b'89'
+        with pytest.raises(TypeError):
+            m[0] = 0
+
+
+def test_open_input_reader(tmp_path):
+    p = tmp_path / 'data.bin'
+    p.write_bytes(b'0123456789')
+    with open_input(p, mmap=False) as f:
+        assert not isinstance(f, mmap.mmap)
+        assert f.read(4) == b'0123'
+        assert f.read() == b'456789'
+    empty = tmp_path / 'empty.bin'
+    empty.touch()
+    with open_input(empty) as f:
+        assert f.read() == b''
+
+
+def test_open_input_invalid(tmp_path, mocker):
+    close = mocker.spy(os, 'close')
+    with pytest.raises(NotAFileError):
+        open_input(tmp_path)
+    assert close.call_count == 1
+    with pytest.raises(FileNotFoundError):
+        open_input(tmp_path / 'missing')
+    with pytest.raises(SuffixError):
+        open_input(tmp_path / 'data.bin', check_suffix='.txt')
+
+
+@pytest.mark.skipif(sys.platform == 'win32', reason='named pipes')
+def test_open_input_fifo(tmp_path):
+    p = tmp_path / 'fifo'
+    os.mkfifo(p)
+
+    def write():
+        with open(p, 'wb') as f:
+            f.write(b'streamed')
+
+    writer = threading.Thread(target=write)
+    writer.start()
+    with open_input(p) as f:
+        assert not isinstance(f, mmap.mmap)
+        assert f.read() == b'streamed'
+    writer.join()
@@ -0,0 +1,75 @@
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+from pathlib_extensions.prepare import NotAFileError, SuffixError
+from pathlib_extensions.sharding import ShardedLayout
+
+
+def test_path():
+    layout = ShardedLayout('out')
+    p = layout.path('report.json')
+    assert p.name == 'report.json'
+    assert p.parent.parent.parent == Path('out')
+    assert all(len(x) == 2 for x in p.relative_to('out').parts[:2])
+    # stable across instances and processes
+    assert ShardedLayout('out').path('report.json') == p
+    assert ShardedLayout('out', fanout=16, depth=3).path('x').relative_to('out').parts[:3] == ShardedLayout('out', 16, 3).shards('x')
+    assert len(ShardedLayout('out', fanout=1000, depth=1).shards('x')[0]) == 3
+
+
+def test_spread():
+    layout = ShardedLayout('out', fanout=16, depth=1)
+    counts = Counter(layout.shards(f'file{i}.txt') for i in range(16_000))
+    assert len(counts) == 16
+    assert max(counts.values()) < 1_200
+
+
+@pytest.mark.parametrize('name', ['', '.', '..', 'a/b'])
+def test_invalid_name(name):
+    with pytest.raises(ValueError):
+        ShardedLayout('out').path(name)
+    with pytest.raises(ValueError):
+        ShardedLayout('out').prepare(name)
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        ShardedLayout('out', fanout=1)
+    with pytest.raises(ValueError):
+        ShardedLayout('out', depth=0)
+    # beyond the 2**64 values of the hash
+    with pytest.raises(ValueError):
+        ShardedLayout('out', fanout=256, depth=9)
+    with pytest.raises(ValueError):
+        ShardedLayout('out', fanout=2, depth=10**9)
+    assert ShardedLayout('out', fanout=256, depth=8).depth == 8
+    assert ShardedLayout('out', fanout=2, depth=64).depth == 64
+
+
+def test_prepare(tmp_path):
+    layout = ShardedLayout(tmp_path, fanout=4, depth=2)
+    p = layout.prepare('a', with_suffix='.txt')
+    assert p == layout.path('a.txt')
+    assert p.parent.is_dir()
+    assert 'a.txt' not in layout
+    p.touch()
+    assert 'a.txt' in layout
+    with pytest.raises(SuffixError):
+        layout.prepare('a.txt', check_suffix='.csv')
+    layout.path('b').mkdir(parents=True)
+    with pytest.raises(NotAFileError):
+        layout.prepare('b')
+
+
+def test_reverse_lookup(tmp_path):
+    layout = ShardedLayout(tmp_path, fanout=4, depth=2)
+    names = {f'file{i}' for i in range(20)}
+    for name in names:
+        layout.prepare(name).touch()
+    (tmp_path / 'stray').touch()
+    assert set(layout.names()) == names
+    assert layout.name_of(layout.path('file3')) == 'file3'
+    with pytest.raises(ValueError):
+        layout.name_of(tmp_path / 'stray')
@@ -0,0 +1,199 @@
+import errno
+import os
+
+import pytest
+
+from pathlib_extensions.overwrite import OverwriteMode, overwrite_if_older
+from pathlib_extensions.prepare import NotAFileError
+from pathlib_extensions.transfer import copy_tree, move_tree
+
+
+@pytest.fixture
+def src(tmp_path):
+    root = tmp_path / 'src'
+    (root / 'a' / 'b').mkdir(parents=True)
+    (root / 'top.txt').write_bytes(b'top')
+    (root / 'a' / 'mid.txt').write_bytes(b'mid' * 1000)
+    (root / 'a' / 'b' / 'deep.bin').write_bytes(os.urandom(100_000))
+    os.chmod(root / 'top.txt', 0o640)
+    return root
+
+
+def _contents(root):
+    return {p.relative_to(root): p.read_bytes() for p in root.rglob('*') if p.is_file()}
+
+
+def test_copy_tree(src, tmp_path):
+    dst = tmp_path / 'dst'
+    results = copy_tree(src, dst)
+    assert results == {dst / p: dst / p for p in _contents(src)}
+    assert _contents(dst) == _contents(src)
+    assert os.stat(dst / 'top.txt').st_mtime_ns == os.stat(src / 'top.txt').st_mtime_ns
+    assert os.stat(dst / 'top.txt').st_mode & 0o777 == 0o640
+    assert not list(dst.rglob('*.part'))
+
+
+def test_copy_tree_multiple_destinations(src, tmp_path):
+    dsts = [tmp_path / 'd1', tmp_path / 'd2']
+    results = copy_tree(src, dsts, workers=2)
+    assert len(results) == 6
+    for dst in dsts:
+        assert _contents(dst) == _contents(src)
+
+
+def test_copy_tree_resume(src, tmp_path, mocker):
+    dst = tmp_path / 'dst'
+    copy_tree(src, dst)
+    (src / 'top.txt').write_bytes(b'changed')
+    replace = mocker.spy(os, 'replace')
+    results = copy_tree(src, dst)
+    assert results[dst / 'top.txt'] == dst / 'top.txt'
+    assert results[dst / 'a' / 'mid.txt'] is None
+    assert replace.call_count == 1
+    assert (dst / 'top.txt').read_bytes() == b'changed'
+
+
+def test_copy_tree_overwrite_modes(src, tmp_path):
+    dst = tmp_path / 'dst'
+    dst.mkdir()
+    (dst / 'top.txt').write_bytes(b'existing')
+    results = copy_tree(src, dst, overwrite_mode=OverwriteMode.NEVER)
+    assert results[dst / 'top.txt'] is None
+    assert (dst / 'top.txt').read_bytes() == b'existing'
+    assert (dst / 'a' / 'mid.txt').exists()
+    results = copy_tree(src, dst, overwrite_mode=OverwriteMode.RENAME)
+    assert results[dst / 'top.txt'] == dst / 'top (1).txt'
+    assert (dst / 'top (1).txt').read_bytes() == b'top'
+    # the target is newer than the source
+    results = copy_tree(src, dst, policy=overwrite_if_older)
+    assert results[dst / 'top.txt'] is None
+
+
+def test_copy_tree_errors(src, tmp_path):
+    dst = tmp_path / 'dst'
+    (dst / 'top.txt').mkdir(parents=True)
+    with pytest.raises(NotAFileError):
+        copy_tree(src, dst)
+    results = copy_tree(src, dst, return_exceptions=True)
+    assert isinstance(results[dst / 'top.txt'], NotAFileError)
+    assert (dst / 'a' / 'b' / 'deep.bin').exists()
+    with pytest.raises(FileNotFoundError):
+        copy_tree(tmp_path / 'missing', dst)
+
+
+def test_copy_tree_fallbacks(src, tmp_path, mocker):
+    unsupported = OSError(errno.EXDEV, 'cross-device')
+    mocker.patch('os.copy_file_range', side_effect=unsupported, create=True)
+    sendfile = mocker.patch('os.sendfile', side_effect=unsupported, create=True)
+    dst = tmp_path / 'dst'
+    copy_tree(src, dst)
+    assert sendfile.called
+    assert _contents(dst) == _contents(src)
+
+
+def test_move_tree(src, tmp_path):
+    expected = _contents(src)
+    dst = tmp_path / 'dst'
+    results = move_tree(src, dst)
+    assert all(v == k for k, v in results.items())
+    assert _contents(dst) == expected
+    assert not src.exists()
+
+
+def test_move_tree_cross_device(src, tmp_path, mocker):
+    expected = _contents(src)
+    real_replace = os.replace
+
+    def replace(a, b):
+        if not str(a).endswith('.part'):
+            raise OSError(errno.EXDEV, 'cross-device')
+        real_replace(a, b)
+
+    mocker.patch('os.replace', side_effect=replace)
+    dst = tmp_path / 'dst'
+    move_tree(src, dst)
+    assert _contents(dst) == expected
+    assert not src.exists()
+
+
+def test_move_tree_resume_and_keep_declined(src, tmp_path):
+    dst = tmp_path / 'dst'
+    copy_tree(src, dst)
+    (dst / 'top.txt').write_bytes(b'newer')
+    results = move_tree(src, dst, overwrite_mode=OverwriteMode.NEVER)
+    assert results[dst / 'top.txt'] is None
+    assert results[dst / 'a' / 'mid.txt'] is None
+    # complete copies are treated as moved; the declined source is kept
+    assert _contents(src) == {(src / 'top.txt').relative_to(src): b'top'}
+    assert (dst / 'top.txt').read_bytes() == b'newer'
+
+
+def test_move_tree_resume_checks_content(src, tmp_path):
+    dst = tmp_path / 'dst'
+    copy_tree(src, dst)
+    # a partial target given the size and modification time of its source
+    st = os.stat(src / 'a' / 'mid.txt')
+    (dst / 'a' / 'mid.txt').write_bytes(b'x' * st.st_size)
+    os.utime(dst / 'a' / 'mid.txt', ns=(st.st_atime_ns, st.st_mtime_ns))
+    expected = _contents(src)
+    results = move_tree(src, dst)
+    assert results[dst / 'a' / 'mid.txt'] == dst / 'a' / 'mid.txt'
+    assert results[dst / 'top.txt'] is None
+    assert _contents(dst) == expected
+    assert not src.exists()
+
+
+def test_move_tree_into_itself(src):
+    with pytest.raises(ValueError):
+        move_tree(src, src / 'a' / 'dst')
+    with pytest.raises(ValueError):
+        move_tree(src, src)
+    assert not (src / 'a' / 'dst').exists()
+
+
+def test_transfer_skips_symlinked_dirs(src, tmp_path):
+    (src / 'link').symlink_to(src / 'a')
+    expected = _contents(src / 'a')
+    dst = tmp_path / 'dst'
+    copy_tree(src, dst)
+    assert not (dst / 'link').exists()
+    move_tree(src, tmp_path / 'moved')
+    assert _contents(tmp_path / 'moved' / 'a') == expected
+
+
+def test_copy_tree_mkdir_errors(src, tmp_path):
+    dst = tmp_path / 'dst'
+    dst.mkdir()
+    (dst / 'a').write_bytes(b'not a directory')
+    with pytest.raises(OSError):
+        copy_tree(src, dst)
+    results = copy_tree(src, dst, return_exceptions=True)
+    assert isinstance(results[dst / 'a' / 'mid.txt'], OSError)
+    assert isinstance(results[dst / 'a' / 'b' / 'deep.bin'], OSError)
+    assert results[dst / 'top.txt'] == dst / 'top.txt'
+
+
+def test_transfer_follows_symlinked_files(src, tmp_path):
+    (tmp_path / 'outside.txt').write_bytes(b'outside')
+    (src / 'link.txt').symlink_to(tmp_path / 'outside.txt')
+    copy_tree(src, tmp_path / 'dst')
+    move_tree(src, tmp_path / 'moved')
+    # copies and moves alike get the content of the linked file rather than the link
+    for dst in (tmp_path / 'dst', tmp_path / 'moved'):
+        assert not (dst / 'link.txt').is_symlink()
+        assert (dst / 'link.txt').read_bytes() == b'outside'
+    assert not src.exists()
+    assert (tmp_path / 'outside.txt').read_bytes() == b'outside'
+
+
+def test_transfer_rename_failure_removes_placeholder(src, tmp_path, mocker):
+    dst = tmp_path / 'dst'
+    dst.mkdir()
+    (dst / 'top.txt').write_bytes(b'existing')
+    mocker.patch('pathlib_extensions.transfer._copy_data', side_effect=OSError(errno.EIO, 'failed'))
+    results = copy_tree(src, dst, overwrite_mode=OverwriteMode.RENAME, return_exceptions=True)
+    assert isinstance(results[dst / 'top.txt'], OSError)
+    with pytest.raises(OSError):
+        copy_tree(src, dst, overwrite_mode=OverwriteMode.RENAME, workers=1)
+    assert [p.name for p in dst.rglob('*') if p.is_file()] == ['top.txt']
+    assert (dst / 'top.txt').read_bytes() == b'existing'
@@ -0,0 +1,77 @@
+import os
+
+import pytest
+
+from pathlib_extensions.prepare import NotAFileError
+from pathlib_extensions.walk import walk_input_files
+
+
+@pytest.fixture
+def tree(tmp_path):
+    files = []
+    for i in range(5):
+        d = tmp_path / f'd{i}' / 'sub'
+        d.mkdir(parents=True)
+        for j in range(5):
+            p = d / f'{j}.txt'
+            p.touch()
+            files.append(p)
+        (d.parent / 'other.csv').touch()
+    return tmp_path, files
+
+
+def test_walk_input_files(tree):
+    root, files = tree
+    assert sorted(walk_input_files(root, check_suffix='.txt', workers=2), key=str) == sorted(files, key=str)
+    assert len(list(walk_input_files(str(root)))) == len(files) + 5
+
+
+def test_walk_input_files_root():
+    with pytest.raises(NotADirectoryError):
+        list(walk_input_files(__file__))
+    with pytest.raises(FileNotFoundError):
+        list(walk_input_files('path/that/does/not/exist'))
+
+
+def test_walk_input_files_not_a_file(tmp_path):
+    os.mkfifo(tmp_path / 'fifo.txt')
+    (tmp_path / 'broken.txt').symlink_to(tmp_path / 'missing')
+    with pytest.raises(OSError):
+        list(walk_input_files(tmp_path))
+    results = sorted(walk_input_files(tmp_path, return_exceptions=True), key=lambda e: type(e).__name__)
+    assert [type(e) for e in results] == [FileNotFoundError, NotAFileError]
+
+
+def test_walk_input_files_symlinked_dir(tree):
+    root, files = tree
+    (root / 'link').symlink_to(root / 'd0')
+    assert len(list(walk_input_files(root, check_suffix='.txt'))) == len(files)
+    assert len(list(walk_input_files(root, check_suffix='.txt', follow_symlinks=True))) == len(files) + 5
+
+
+def test_walk_input_files_symlinked_dir_no_suffix(tmp_path):
+    (tmp_path / 'd').mkdir()
+    (tmp_path / 'd' / 'a.txt').touch()
+    (tmp_path / 'link').symlink_to(tmp_path / 'd')
+    assert list(walk_input_files(tmp_path)) == [tmp_path / 'd' / 'a.txt']
+    assert sorted(walk_input_files(tmp_path, follow_symlinks=True), key=str) == [tmp_path / 'd' / 'a.txt', tmp_path / 'link' / 'a.txt']
+
+
+def test_walk_input_files_symlink_cycle(tmp_path):
+    (tmp_path / 'd').mkdir()
+    (tmp_path / 'd' / 'a.txt').touch()
+    (tmp_path / 'd' / 'up').symlink_to(tmp_path)
+    (tmp_path / 'self').symlink_to('.')
+    assert list(walk_input_files(tmp_path, follow_symlinks=True)) == [tmp_path / 'd' / 'a.txt']
+
+
+@pytest.mark.skipif(os.geteuid() == 0, reason='root ignores permissions')
+def test_walk_input_files_unreadable_dir(tree):
+    root, files = tree
+    (root / 'd0').chmod(0)
+    try:
+        results = list(walk_input_files(root, check_suffix='.txt', return_exceptions=True))
+    finally:
+        (root / 'd0').chmod(0o755)
+    assert sum(isinstance(x, PermissionError) for x in results) == 1
+    assert len(results) == len(files) - 5 + 1
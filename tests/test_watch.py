@@ -0,0 +1,144 @@
+import asyncio
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+
+import pytest
+
+from pathlib_extensions.prepare import NotAFileError
+from pathlib_extensions.watch import _InotifyWatcher, awatch_inputs, watch_inputs
+
+MODES = [
+    pytest.param(True, marks=pytest.mark.skipif(sys.platform != 'linux', reason='inotify')),
+    False,
+]
+
+
+def _write_later(paths, delay=0.2):
+    def write():
+        time.sleep(delay)
+        for p in paths:
+            p.parent.mkdir(parents=True, exist_ok=True)
+            with open(p, 'wb') as f:
+                f.write(b'partial')
+                f.flush()
+                f.write(b' complete')
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    return thread
+
+
+@pytest.mark.parametrize('use_inotify', MODES)
+def test_watch_inputs(tmp_path, use_inotify):
+    (tmp_path / 'old.txt').write_text('old')
+    (tmp_path / 'old.csv').write_text('old')
+    new = [tmp_path / f'new{i}.txt' for i in range(20)] + [tmp_path / 'skip.csv']
+    thread = _write_later(new)
+    found = list(watch_inputs(tmp_path, '.txt', use_inotify=use_inotify, poll_interval=0.1, idle_timeout=1))
+    thread.join()
+    assert sorted(found, key=str) == sorted([tmp_path / 'old.txt', *new[:-1]])
+    assert all(isinstance(p, Path) and p.read_bytes() == b'partial complete' for p in found[1:])
+
+
+@pytest.mark.parametrize('use_inotify', MODES)
+def test_watch_inputs_recursive(tmp_path, use_inotify):
+    new = [tmp_path / 'a' / 'b' / 'x.txt', tmp_path / 'c' / 'y.txt']
+    thread = _write_later(new)
+    found = list(watch_inputs(tmp_path, recursive=True, existing=False, use_inotify=use_inotify, poll_interval=0.1, idle_timeout=1))
+    thread.join()
+    assert sorted(found, key=str) == sorted(new)
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify')
+def test_watch_inputs_moved_in_and_debounced(tmp_path):
+    staging = tmp_path / 'staging'
+    staging.mkdir()
+    landing = tmp_path / 'landing'
+    landing.mkdir()
+
+    def write():
+        time.sleep(0.2)
+        (staging / 'a.txt').write_text('a')
+        os.rename(staging / 'a.txt', landing / 'a.txt')
+        for _ in range(5):
+            (landing / 'b.txt').write_text('b')
+
+    thread = threading.Thread(target=write)
+    thread.start()
+    found = list(watch_inputs(landing, debounce=0.2, idle_timeout=1))
+    thread.join()
+    assert sorted(found, key=str) == [landing / 'a.txt', landing / 'b.txt']
+
+
+def test_watch_inputs_batches_and_errors(tmp_path):
+    for i in range(10):
+        (tmp_path / f'{i}.txt').touch()
+    (tmp_path / 'fifo.txt').touch()
+    found = list(watch_inputs(tmp_path, batch_size=3, use_inotify=False, idle_timeout=0))
+    assert len(found) == 11
+    os.unlink(tmp_path / 'fifo.txt')
+    if sys.platform != 'win32':
+        os.mkfifo(tmp_path / 'fifo.txt')
+        with pytest.raises(NotAFileError):
+            list(watch_inputs(tmp_path, use_inotify=False, idle_timeout=0))
+        found = list(watch_inputs(tmp_path, use_inotify=False, idle_timeout=0, return_exceptions=True))
+        assert sum(isinstance(x, NotAFileError) for x in found) == 1
+
+
+def test_watch_inputs_not_a_directory(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        next(watch_inputs(tmp_path / 'missing'))
+
+
+@pytest.mark.parametrize('use_inotify', MODES)
+def test_awatch_inputs(tmp_path, use_inotify):
+    new = [tmp_path / f'new{i}.txt' for i in range(5)]
+
+    async def main():
+        thread = _write_later(new)
+        found = [p async for p in awatch_inputs(tmp_path, use_inotify=use_inotify, poll_interval=0.1, idle_timeout=1)]
+        thread.join()
+        return found
+
+    assert sorted(asyncio.run(main())) == new
+
+
+def test_awatch_inputs_stop_early(tmp_path):
+    (tmp_path / 'a.txt').touch()
+
+    async def main():
+        async for p in awatch_inputs(tmp_path):
+            return p
+
+    start = time.monotonic()
+    assert asyncio.run(main()) == tmp_path / 'a.txt'
+    assert time.monotonic() - start < 2
+
+
+@pytest.mark.skipif(sys.platform != 'linux', reason='inotify')
+def test_watch_inputs_closes_fd_on_failure(tmp_path, mocker):
+    (tmp_path / 'sub').mkdir()
+    real_add = _InotifyWatcher._add
+
+    def add(self, path):
+        if path != os.fspath(tmp_path):
+            raise PermissionError(path)
+        real_add(self, path)
+
+    mocker.patch.object(_InotifyWatcher, '_add', add)
+    fds = set(os.listdir('/proc/self/fd'))
+    with pytest.raises(PermissionError):
+        next(watch_inputs(tmp_path, recursive=True))
+    assert set(os.listdir('/proc/self/fd')) == fds
+
+
+@pytest.mark.parametrize('use_inotify', MODES)
+def test_watch_inputs_symlinked_dir(tmp_path, use_inotify):
+    (tmp_path / 'd').mkdir()
+    (tmp_path / 'd' / 'a.txt').touch()
+    (tmp_path / 'link').symlink_to(tmp_path / 'd')
+    found = list(watch_inputs(tmp_path, recursive=True, use_inotify=use_inotify, idle_timeout=0))
+    assert found == [tmp_path / 'd' / 'a.txt']